@@ -0,0 +1,61 @@
+import argparse
+import itertools
+import random
+from typing import Dict, List
+
+from benchmark_suite import RssSampler, generate_chainage_projects, history_arguments, record_runs, run_stage, speedup
+from chainage_index import ChainageIndex, chainage_range, classify
+from nh_refs import canonical_refs
+
+# Constants
+NUM_PROJECTS = 100000
+NUM_HIGHWAYS = 2000
+PAIRWISE_SAMPLE = 5000 # Projects on one highway, where comparing all pairs is quadratic
+REPEATS = 1000
+LINEAR_QUERIES = 10
+
+
+def linear_at(projects: List[Dict], nh: str, km: float) -> List[int]:
+    """
+    The lookup without an index: every project's NH and range checked.
+    """
+    refs = set(canonical_refs(nh))
+    matches = []
+    for pos, project in enumerate(projects):
+        if refs & set(canonical_refs(project.get("nh_number"))):
+            span = chainage_range(project)
+            if span and span[0] <= km <= span[1]:
+                matches.append(pos)
+    return matches
+
+def all_pairs(index: ChainageIndex) -> int:
+    """
+    The quadratic baseline: every pair of ranges on each NH classified directly.
+    """
+    return sum(1 for intervals in index.intervals.values() for a, b in itertools.combinations(intervals, 2) if classify(a, b))
+
+def main():
+    args = history_arguments(argparse.ArgumentParser(description="Chainage interval trees and the conflict sweep against brute force.")).parse_args()
+    projects = generate_chainage_projects(NUM_PROJECTS, NUM_HIGHWAYS, args.seed)
+    rng = random.Random(args.seed + 1)
+    queries = [(str(rng.randint(1, NUM_HIGHWAYS)), rng.uniform(0, 1500)) for _ in range(REPEATS)]
+    sample = ChainageIndex(generate_chainage_projects(PAIRWISE_SAMPLE, highways=1, seed=args.seed))
+
+    stages: Dict[str, Dict] = {}
+    with RssSampler() as sampler:
+        index = run_stage(stages, sampler, "build", lambda: ChainageIndex(projects), items=len(projects))
+        results = run_stage(stages, sampler, "at, tree", lambda: [index.at(nh, km) for nh, km in queries])
+        expected = run_stage(stages, sampler, "at, linear scan", lambda: [linear_at(projects, nh, km) for nh, km in queries[:LINEAR_QUERIES]])
+        assert results[:LINEAR_QUERIES] == expected, "tree and linear scan disagree"
+        conflicts = run_stage(stages, sampler, "sweep", index.conflicts, items=len(index))
+        expected_pairs = run_stage(stages, sampler, "one NH, all pairs", lambda: all_pairs(sample), items=len(sample))
+        found_pairs = run_stage(stages, sampler, "one NH, sweep", sample.conflicts, items=len(sample))
+        assert len(found_pairs) == expected_pairs, "sweep and all pairs disagree"
+
+    counts = {kind: sum(1 for c in conflicts if c["kind"] == kind) for kind in ("duplicate", "overlap", "adjacent")}
+    print(f"{len(index)} ranges on {len(index.trees)} highways, {len(conflicts)} conflicts {counts}")
+    print(f"Tree {speedup(stages, 'at, linear scan', 'at, tree'):.0f}x faster than a scan; sweep {speedup(stages, 'one NH, all pairs', 'one NH, sweep'):.0f}x faster than all pairs on {PAIRWISE_SAMPLE} projects")
+    record_runs([{"benchmark": "chainage_index", "scale": 1, "sizes": {"projects": len(projects)}, "stages": stages}], args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import collections
+import itertools
+from typing import Dict, List, Tuple
+
+from benchmark_suite import RssSampler, generate_contractor_names, history_arguments, record_runs, run_stage
+from entity_resolution import ContractorResolver, MATCH_THRESHOLD, blocking_key, is_typo_variant, normalize_name, shingles
+
+# Constants
+NUM_FIRMS = 10000
+PAIRWISE_SAMPLE = 2000
+
+
+def pairwise_scores(names: List[Tuple[str, int]], entities: Dict[str, Dict]) -> Tuple[float, float]:
+    """
+    (precision, recall) of the resolved entities over pairs of spellings, against the firms they were generated from.
+    """
+    by_firm = collections.defaultdict(set)
+    by_entity = collections.defaultdict(set)
+    for name, firm in names:
+        by_firm[firm].add(name.strip())
+        by_entity[entities[name.strip()]["id"]].add(name.strip())
+    def pairs(groups):
+        return {tuple(sorted(p)) for g in groups.values() for p in itertools.combinations(sorted(g), 2)}
+    truth, found = pairs(by_firm), pairs(by_entity)
+    return len(truth & found) / max(1, len(found)), len(truth & found) / max(1, len(truth))
+
+def all_pairs(names: List[str], threshold: float) -> int:
+    """
+    The quadratic baseline: every pair of blocking keys compared directly. Returns the matching pairs.
+    """
+    keys = sorted({blocking_key(normalize_name(n)) for n in names})
+    sets = [shingles(k) for k in keys]
+    return sum(1 for (a, ka), (b, kb) in itertools.combinations(zip(sets, keys), 2) if len(a & b) / len(a | b) >= threshold and is_typo_variant(ka, kb))
+
+def main():
+    args = history_arguments(argparse.ArgumentParser(description="LSH contractor resolution against all-pairs comparison.")).parse_args()
+    names = generate_contractor_names(NUM_FIRMS, args.seed)
+    sample = [n for n, _ in names[:PAIRWISE_SAMPLE]]
+    print(f"{len(names)} spellings of {NUM_FIRMS} firms")
+
+    stages: Dict[str, Dict] = {}
+    resolver = ContractorResolver()
+    with RssSampler() as sampler:
+        entities = run_stage(stages, sampler, "resolve", lambda: resolver.resolve(n for n, _ in names), items=len(names))
+        run_stage(stages, sampler, "sample, all pairs", lambda: all_pairs(sample, MATCH_THRESHOLD), items=len(sample))
+        run_stage(stages, sampler, "sample, LSH", lambda: ContractorResolver().resolve(sample), items=len(sample))
+
+    stats = resolver.stats
+    precision, recall = pairwise_scores(names, entities)
+    print(f"{stats['keys']} blocking keys, {stats['candidate_pairs']} candidate pairs, {stats['entities']} entities")
+    print(f"Pairwise precision {precision:.4f}, recall {recall:.4f}")
+    scale = (len(names) / len(sample)) ** 2
+    print(f"All pairs on the full set would take ~{stages['sample, all pairs']['seconds'] * scale:.0f}s")
+    record_runs([{"benchmark": "entity_resolution", "scale": 1, "sizes": {"names": len(names)}, "stages": stages,
+                  "precision": round(precision, 4), "recall": round(recall, 4)}], args)
+
+if __name__ == "__main__":
+    main()
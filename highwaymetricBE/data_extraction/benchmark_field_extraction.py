@@ -0,0 +1,86 @@
+import argparse
+import random
+import re
+from typing import Dict, List
+
+from benchmark_suite import RssSampler, generate_report_texts, history_arguments, record_runs, run_stage, speedup
+from field_extractor import FieldExtractor
+
+# Constants
+NUM_RECORDS = 100000
+GAZETTEER_TERMS = 3000 # A realistic gazetteer: states plus a few thousand district/contractor names
+MISMATCH_SAMPLE = 1000
+
+
+def gazetteer_names(count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    return ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(5, 12))).title() for _ in range(count)]
+
+def large_extractor(names: List[str]) -> FieldExtractor:
+    third = len(names) // 3
+    return FieldExtractor(districts=names[:third], contractors=[n + " Infra Pvt Ltd" for n in names[third:]])
+
+def legacy_extract(text: str) -> Dict:
+    """
+    The original per-record extraction: ad-hoc re.search calls and a fresh state list every time.
+    """
+    nh_match = re.search(r'NH[-\s]?(\d+[A-Z]?)', text, re.IGNORECASE)
+    states = ["Andhra Pradesh", "Bihar", "Gujarat", "Haryana", "Himachal Pradesh", "Jharkhand", "Karnataka",
+              "Kerala", "Madhya Pradesh", "Maharashtra", "Meghalaya", "Odisha", "Punjab", "Rajasthan",
+              "Tamil Nadu", "Telangana", "Uttar Pradesh", "Uttarakhand", "West Bengal"]
+    found_state = None
+    for state in states:
+        if state in text:
+            found_state = state
+            break
+    start_loc = end_loc = None
+    from_to_match = re.search(r'from\s+([A-Z][a-zA-Z\s]+?)\s+to\s+([A-Z][a-zA-Z\s]+)', text)
+    if not from_to_match:
+        from_to_match = re.search(r'([A-Z][a-zA-Z\s]+)\s?-\s?([A-Z][a-zA-Z\s]+)\s+section', text)
+    if from_to_match:
+        start_loc = from_to_match.group(1).strip()
+        end_loc = from_to_match.group(2).strip()
+    length_match = re.search(r'(\d+\.?\d*)\s*km', text, re.IGNORECASE)
+    chainage_match = re.search(r'from\s+(?:design\s+)?km\.?\s*([\d\+\.]+)\s+to\s+(?:km\.?\s*)?([\d\+\.]+)', text, re.IGNORECASE)
+    return {
+        "nh_number": nh_match.group(1) if nh_match else None,
+        "state": found_state,
+        "start_location": start_loc,
+        "end_location": end_loc,
+        "total_length": length_match.group(1) if length_match else None,
+        "start_chainage": chainage_match.group(1) if chainage_match else None
+    }
+
+def nh_mismatches(records: List[str], extractor: FieldExtractor) -> int:
+    """
+    Records whose NH number the extractor reads differently from the legacy regex.
+    """
+    return sum(1 for text in records if legacy_extract(text)['nh_number'] != extractor.extract(text)['nh_number'])
+
+def main():
+    args = history_arguments(argparse.ArgumentParser(description="FieldExtractor against the legacy per-record regexes.")).parse_args()
+    records = generate_report_texts(NUM_RECORDS, args.seed)
+    names = gazetteer_names(GAZETTEER_TERMS, args.seed + 1)
+    extractor, big = FieldExtractor(), large_extractor(names)
+    print(f"Field extraction over {len(records)} synthetic records")
+
+    def loop_gazetteer(text):
+        for name in names:
+            if name in text:
+                return name
+
+    stages: Dict[str, Dict] = {}
+    with RssSampler() as sampler:
+        run_stage(stages, sampler, "legacy regex", lambda: [legacy_extract(text) for text in records])
+        run_stage(stages, sampler, "FieldExtractor", lambda: [extractor.extract(text) for text in records])
+        run_stage(stages, sampler, "FieldExtractor, 3k terms", lambda: [big.extract(text) for text in records])
+        # Timed on 10% of the records
+        run_stage(stages, sampler, "linear scan of 3k terms", lambda: [loop_gazetteer(text) for text in records[:NUM_RECORDS // 10]])
+
+    print(f"Speedup over legacy: {speedup(stages, 'legacy regex', 'FieldExtractor'):.2f}x; gazetteer over a linear scan: {speedup(stages, 'linear scan of 3k terms', 'FieldExtractor, 3k terms'):.1f}x")
+    mismatches = nh_mismatches(records[:MISMATCH_SAMPLE], extractor)
+    print(f"NH number mismatches vs legacy on {MISMATCH_SAMPLE} records: {mismatches}")
+    record_runs([{"benchmark": "field_extraction", "scale": 1, "sizes": {"records": len(records)}, "stages": stages}], args)
+
+if __name__ == "__main__":
+    main()
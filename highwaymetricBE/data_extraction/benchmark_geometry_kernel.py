@@ -0,0 +1,54 @@
+import argparse
+import math
+from typing import Dict
+
+import numpy as np
+import shapely
+
+from benchmark_suite import RssSampler, generate_segment_queries, generate_state_highways, history_arguments, record_runs, run_stage, speedup
+from geometry_kernel import polyline_lengths_km
+from highway_index import HighwayIndex
+
+# Constants
+NUM_SEGMENTS = 50000
+POINTS_PER_SEGMENT = 60
+NUM_PROJECTS = 20000
+
+
+def calculate_length(coords) -> float:
+    """
+    Line-by-line port of calculateLength in fetch_state_highways.js, one point pair at a time.
+    """
+    total = 0.0
+    for (lon1, lat1), (lon2, lat2) in zip(coords, coords[1:]):
+        d_lat = math.radians(lat2 - lat1)
+        d_lon = math.radians(lon2 - lon1)
+        a = math.sin(d_lat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(d_lon / 2) ** 2
+        total += 6371 * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return total
+
+def kernel_lengths(index: HighwayIndex) -> np.ndarray:
+    coords = shapely.get_coordinates(index.lines)
+    offsets = np.concatenate([[0], np.cumsum(shapely.get_num_coordinates(index.lines))])
+    return polyline_lengths_km(coords, offsets)
+
+def main():
+    args = history_arguments(argparse.ArgumentParser(description="The numpy geometry kernel against per-point loops.")).parse_args()
+    highways = generate_state_highways(NUM_SEGMENTS, POINTS_PER_SEGMENT, args.seed)
+    projects = generate_segment_queries(highways, NUM_PROJECTS, jitter=0.01, seed=args.seed + 1)
+    index = HighwayIndex(highways)
+    print(f"{NUM_SEGMENTS} segments x {POINTS_PER_SEGMENT} points, {NUM_PROJECTS} projects")
+
+    stages: Dict[str, Dict] = {}
+    with RssSampler() as sampler:
+        scalar = run_stage(stages, sampler, "lengths, scalar loop", lambda: [calculate_length(hw['geometry']['coordinates']) for hw in highways])
+        vectorized = run_stage(stages, sampler, "lengths, kernel", lambda: kernel_lengths(index))
+        one_by_one = run_stage(stages, sampler, "match, one by one", lambda: [index.find_best_segment(ref, s, e) for ref, s, e in projects])
+        bulk = run_stage(stages, sampler, "match, bulk", lambda: index.find_best_segments(projects))
+
+    print(f"Lengths {speedup(stages, 'lengths, scalar loop', 'lengths, kernel'):.0f}x faster, max difference {np.max(np.abs(vectorized - scalar)) * 1000:.6f} m")
+    print(f"Bulk matching {speedup(stages, 'match, one by one', 'match, bulk'):.0f}x faster, agrees on {sum(1 for a, b in zip(one_by_one, bulk) if a == b)}/{NUM_PROJECTS}")
+    record_runs([{"benchmark": "geometry_kernel", "scale": 1, "sizes": {"segments": NUM_SEGMENTS, "projects": NUM_PROJECTS}, "stages": stages}], args)
+
+if __name__ == "__main__":
+    main()
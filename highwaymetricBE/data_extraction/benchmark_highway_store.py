@@ -0,0 +1,48 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+from typing import Dict
+
+from benchmark_suite import RssSampler, generate_state_highways, history_arguments, record_runs, run_stage
+from highway_index import HighwayIndex
+from highway_store import HighwayStore, convert, store_path_for
+
+# Constants
+NUM_SEGMENTS = 50000
+POINTS_PER_SEGMENT = 60
+
+
+def main():
+    args = history_arguments(argparse.ArgumentParser(description="Loading highways from the mmap store against json.load.")).parse_args()
+    tmp_dir = tempfile.mkdtemp()
+    json_path = os.path.join(tmp_dir, "state_highways.json")
+    stages: Dict[str, Dict] = {}
+    try:
+        with open(json_path, 'w') as f:
+            json.dump(generate_state_highways(NUM_SEGMENTS, POINTS_PER_SEGMENT, args.seed), f, indent=2)
+        print(f"{NUM_SEGMENTS} segments x {POINTS_PER_SEGMENT} points, JSON file {os.path.getsize(json_path) / 1e6:.1f} MB")
+
+        def load_json():
+            with open(json_path, 'r') as f:
+                return json.load(f)
+
+        with RssSampler() as sampler:
+            highways = run_stage(stages, sampler, "json.load", load_json)
+            run_stage(stages, sampler, "convert to store", lambda: convert(json_path), items=NUM_SEGMENTS)
+            store = run_stage(stages, sampler, "open store (mmap)", lambda: HighwayStore(store_path_for(json_path)))
+            run_stage(stages, sampler, "touch every coordinate", lambda: float(store.coords.sum()), items=NUM_SEGMENTS * POINTS_PER_SEGMENT)
+            run_stage(stages, sampler, "index from JSON list", lambda: HighwayIndex(highways), items=NUM_SEGMENTS)
+            run_stage(stages, sampler, "index from store", lambda: HighwayIndex(store), items=NUM_SEGMENTS)
+
+        # Both sources must describe the same segments
+        sample = random.Random(args.seed).sample(range(NUM_SEGMENTS), 100)
+        assert all(store[i] == highways[i] for i in sample), "store rows differ from the JSON records"
+    finally:
+        shutil.rmtree(tmp_dir)
+    record_runs([{"benchmark": "highway_store", "scale": 1, "sizes": {"segments": NUM_SEGMENTS}, "stages": stages}], args)
+
+if __name__ == "__main__":
+    main()
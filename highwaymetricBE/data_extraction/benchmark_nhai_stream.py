@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+from benchmark_suite import RssSampler, history_arguments, record_runs
+from fetch_nhai_data import build_payload, stream_highway_data, write_records
+
+# Constants
+NUM_RECORDS = 100000
+PORT = 8766
+METHODS = ["legacy", "stream", "ndjson"]
+
+
+def legacy_fetch(url: str, output_file: str) -> int:
+    """
+    The fetch as it was before streaming: the whole body, the 'd' string and the parsed
+    list are all in memory before anything is written.
+    """
+    response = requests.post(url, headers={'Content-Type': 'application/json'}, json=build_payload(), verify=False)
+    response.raise_for_status()
+    data = response.json()
+    project_data = json.loads(data['d'])
+    with open(output_file, 'w') as f:
+        json.dump(project_data, f, indent=4)
+    return len(project_data)
+
+def run_method(method: str, url: str, output_file: str):
+    """
+    Runs one fetch in this (fresh) process and prints its result as JSON, so each
+    method's peak RSS is its own.
+    """
+    with RssSampler() as rss:
+        rss.reset()
+        baseline = rss.current()
+        start = time.perf_counter()
+        if method == "legacy":
+            count = legacy_fetch(url, output_file)
+        else:
+            count = write_records(stream_highway_data(url), output_file, ndjson=method == "ndjson")
+        seconds = time.perf_counter() - start
+        peak = rss.read_peak()
+    print(json.dumps({
+        "method": method,
+        "records": count,
+        "seconds": round(seconds, 3),
+        "peak_rss_mb": round(peak / 2**20, 1), # MiB, like run_stage
+        "baseline_rss_mb": round(baseline / 2**20, 1),
+        "output_mb": round(os.path.getsize(output_file) / 1e6, 1)
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory and time of the buffered and streaming NHAI fetch against the stub server.")
+    parser.add_argument("--records", type=int, nargs="+", default=[NUM_RECORDS // 10, NUM_RECORDS], help="Response sizes to compare")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--run", choices=METHODS, help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = history_arguments(parser).parse_args()
+
+    if args.run:
+        run_method(args.run, args.url, args.output)
+        return
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    url = f"http://127.0.0.1:{args.port}/"
+    tmp_dir = tempfile.mkdtemp()
+    stages = {}
+    print(f"{'records':>9} {'method':<8} {'seconds':>9} {'peak RSS':>10} {'over base':>10} {'output':>9}")
+    for count in args.records:
+        # A streamed stub in its own process, so the server's memory never shows up in ours
+        server = subprocess.Popen([sys.executable, os.path.join(here, "nhai_stub_server.py"), "--records", str(count), "--port", str(args.port), "--stream"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        try:
+            server.stdout.readline() # Serving ...
+            outputs = {}
+            for method in METHODS:
+                output_file = os.path.join(tmp_dir, f"{method}.json")
+                result = subprocess.run([sys.executable, os.path.abspath(__file__), "--run", method, "--url", url, "--output", output_file], capture_output=True, text=True, check=True)
+                r = json.loads(result.stdout.strip().splitlines()[-1])
+                print(f"{r['records']:>9} {method:<8} {r['seconds']:>8.2f}s {r['peak_rss_mb']:>7.1f} MB {r['peak_rss_mb'] - r['baseline_rss_mb']:>7.1f} MB {r['output_mb']:>6.1f} MB")
+                stages[f"{method} {count}"] = {"seconds": r['seconds'], "items": r['records'], "peak_rss_mb": r['peak_rss_mb'],
+                                               "items_per_second": round(r['records'] / r['seconds'], 1) if r['seconds'] else None}
+                outputs[method] = output_file
+            with open(outputs["legacy"], 'rb') as a, open(outputs["stream"], 'rb') as b:
+                assert a.read() == b.read(), "the streamed file differs from the legacy one"
+        finally:
+            server.terminate()
+            server.wait()
+    for name in os.listdir(tmp_dir):
+        os.remove(os.path.join(tmp_dir, name))
+    os.rmdir(tmp_dir)
+    record_runs([{"benchmark": "nhai_stream", "scale": 1, "sizes": {"records": args.records}, "stages": stages}], args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+from benchmark_suite import POINTS_PER_WAY, SEED, RssSampler, generate_network, generate_report, history_arguments, record_runs, run_stage
+from import_data import bulk_import
+from linear_reference import load_km_posts
+from map_renderer import render_map
+from metrics import METRICS
+from process_highway_data import ProjectMatcher, build_geocoder, extract_project_details, geocode_projects, load_state_highways, parse_pdf_text, read_pdf_lines, slice_geometry, write_json_array
+
+# Constants
+# At 1x: 40 NH refs of 25 connected ways x 20 points (1000 ways) and 200 projects
+BASE_REFS = 40
+BASE_PROJECTS = 200
+SCALES = [1, 10, 100]
+
+
+class StubApiHandler(BaseHTTPRequestHandler):
+    """
+    Accepts POST /api/projects/bulk like the Spring Boot bulk endpoint, reporting every row as created.
+    """
+
+    def do_POST(self):
+        rows = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b"[]")
+        body = json.dumps({"created": len(rows) if isinstance(rows, list) else 1, "skipped": 0, "errors": []}).encode('utf-8')
+        self.send_response(201)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_api() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubApiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def run_matching(stages: Dict, sampler: RssSampler, work_dir: str, segments: int):
+    """
+    The stages from the report text to highway_data.json, on the files run_scale wrote to `work_dir`.
+    """
+    raw = run_stage(stages, sampler, "parse", lambda: list(parse_pdf_text(read_pdf_lines(os.path.join(work_dir, "projects.txt")))))
+    projects = run_stage(stages, sampler, "extract", lambda: list(extract_project_details(raw)))
+    matcher = run_stage(stages, sampler, "index", lambda: ProjectMatcher(load_state_highways(os.path.join(work_dir, "state_highways.json")),
+                                                                         load_km_posts(os.path.join(work_dir, "km_posts.json"))), items=segments)
+    geocoded = run_stage(stages, sampler, "geocode", lambda: list(geocode_projects(projects, build_geocoder(os.path.join(work_dir, "stub_geocoder.json")), matcher)))
+
+    queries = [(proj['nh_number'], start, end) for proj, start, end in geocoded if start and end]
+    best = run_stage(stages, sampler, "segment", lambda: matcher.highway_index.find_best_segments(queries))
+    run_stage(stages, sampler, "slice", lambda: [slice_geometry(geom, start, end) for geom, (_, start, end) in zip(best, queries) if geom])
+
+    placed = run_stage(stages, sampler, "match", lambda: [matcher.match(*item)[0] for item in geocoded])
+    run_stage(stages, sampler, "write", lambda: write_json_array(placed, os.path.join(work_dir, "highway_data.json")), items=len(placed))
+
+def run_scale(scale: int, work_dir: str, api_url: str, seed: int = SEED) -> Dict:
+    """
+    Generates the 1x dataset times `scale` and runs every pipeline stage on it in turn.
+    """
+    network_file = os.path.join(work_dir, "state_highways.json")
+    text_file = os.path.join(work_dir, "projects.txt")
+    stub_file = os.path.join(work_dir, "stub_geocoder.json")
+    posts_file = os.path.join(work_dir, "km_posts.json")
+    output_file = os.path.join(work_dir, "highway_data.json")
+
+    highways = generate_network(BASE_REFS * scale, seed)
+    lines, places, km_posts = generate_report(highways, BASE_PROJECTS * scale, seed)
+    for path, data in ((network_file, highways), (stub_file, places), (posts_file, km_posts)):
+        with open(path, 'w') as f:
+            json.dump(data, f)
+    with open(text_file, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+    sizes = {"segments": len(highways), "points": len(highways) * POINTS_PER_WAY, "projects": len(lines)}
+    del highways, lines, places
+
+    print(f"\nScale {scale}x: {sizes['segments']} ways, {sizes['points']} points, {sizes['projects']} projects")
+    stages: Dict[str, Dict] = {}
+    METRICS.drain()
+    with RssSampler() as sampler:
+        # In a function of its own so the records and index are freed before rendering
+        run_matching(stages, sampler, work_dir, sizes['segments'])
+
+        render_layers = [{"kind": "highways", "files": [network_file]}, {"kind": "projects", "files": [output_file]}]
+        run_stage(stages, sampler, "render", lambda: render_map(os.path.join(work_dir, "map.html"), "Benchmark", render_layers), items=sizes['segments'] + sizes['projects'])
+        import_state = os.path.join(work_dir, "import_state.json")
+        run_stage(stages, sampler, "import", lambda: bulk_import(api_url, output_file, state_file=import_state), items=sizes['projects'])
+
+    counters = METRICS.report()["counters"]
+    METRICS.drain()
+    return {"benchmark": "pipeline", "scale": scale, "sizes": sizes, "stages": stages, "counters": counters}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on synthetic data at several scales.")
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES, help="Multiples of the 1x dataset to run")
+    args = history_arguments(parser).parse_args()
+
+    server = start_stub_api()
+    api_url = f"http://127.0.0.1:{server.server_address[1]}/api/projects"
+    runs = []
+    try:
+        for scale in args.scales:
+            work_dir = tempfile.mkdtemp()
+            try:
+                runs.append(run_scale(scale, work_dir, api_url, args.seed))
+            finally:
+                shutil.rmtree(work_dir)
+    finally:
+        server.shutdown()
+    record_runs(runs, args)
+
+if __name__ == "__main__":
+    main()
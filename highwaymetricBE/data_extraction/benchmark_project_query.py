@@ -0,0 +1,65 @@
+import argparse
+from typing import Dict, List
+
+from benchmark_suite import RssSampler, generate_project_records, history_arguments, record_runs, run_stage, speedup
+from nh_refs import canonical_refs
+from project_query import ProjectQuery, parse_date
+
+# Constants
+NUM_PROJECTS = 100000
+REPEATS = 50
+QUERIES = [
+    ("state", {"state": "Telangana"}),
+    ("state + status", {"state": "Telangana", "status": "Completed"}),
+    ("nh", {"nh": "16"}),
+    ("bbox", {"bbox": (78.0, 17.0, 78.5, 17.5)}),
+    ("dates", {"date_from": "01/01/2024", "date_to": "31/03/2024"}),
+    ("all filters", {"state": "Andhra Pradesh", "status": "Under Implementation", "bbox": (76.0, 12.0, 84.0, 20.0), "date_from": "01/01/2020"}),
+]
+
+
+def linear_query(projects: List[Dict], state=None, status=None, nh=None, bbox=None, date_from=None, date_to=None) -> List[int]:
+    """
+    The filter every consumer runs today: a pass over all projects.
+    """
+    lo, hi = parse_date(date_from) if date_from else None, parse_date(date_to) if date_to else None
+    matches = []
+    for pos, proj in enumerate(projects):
+        if state and proj['state'].lower() != state.lower():
+            continue
+        if status and proj['status'].lower() != status.lower():
+            continue
+        if nh and not set(canonical_refs(nh)) & set(canonical_refs(proj['nh_number'])):
+            continue
+        if bbox:
+            coords = (proj.get('geometry') or {}).get('coordinates')
+            if not coords:
+                continue
+            xs, ys = [c[0] for c in coords], [c[1] for c in coords]
+            if max(xs) < bbox[0] or min(xs) > bbox[2] or max(ys) < bbox[1] or min(ys) > bbox[3]:
+                continue
+        if lo is not None or hi is not None:
+            day = parse_date(proj.get('loa_date'))
+            if day is None or (lo is not None and day < lo) or (hi is not None and day > hi):
+                continue
+        matches.append(pos)
+    return matches
+
+def main():
+    args = history_arguments(argparse.ArgumentParser(description="Indexed project queries against a linear scan.")).parse_args()
+    projects = generate_project_records(NUM_PROJECTS, args.seed)
+    print(f"{len(projects)} projects")
+
+    stages: Dict[str, Dict] = {}
+    with RssSampler() as sampler:
+        engine = run_stage(stages, sampler, "build", lambda: ProjectQuery(projects), items=len(projects))
+        for label, filters in QUERIES:
+            expected = run_stage(stages, sampler, f"{label} linear", lambda: linear_query(projects, **filters), items=1)
+            positions = run_stage(stages, sampler, f"{label} indexed", lambda: engine.select(**filters), items=1, repeats=REPEATS)
+            run_stage(stages, sampler, f"{label} page of 50", lambda: engine.query(offset=0, limit=50, order_by="loa_date", descending=True, **filters), items=1, repeats=REPEATS)
+            assert positions.tolist() == expected, f"{label}: index and linear scan disagree"
+            print(f"  {label}: {len(expected)} matches, {speedup(stages, f'{label} linear', f'{label} indexed'):.0f}x faster indexed")
+    record_runs([{"benchmark": "project_query", "scale": 1, "sizes": {"projects": len(projects)}, "stages": stages}], args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import random
+from typing import Dict, List
+
+import numpy as np
+
+from benchmark_suite import STATUSES, RssSampler, generate_project_records, history_arguments, record_runs, run_stage
+from project_rollups import DIMENSIONS, ProjectRollups, dimension_keys, project_km
+
+# Constants
+NUM_PROJECTS = 200000
+NUM_UPDATES = 20000
+REPEATS = 1000
+CONTRACTORS = [f"Contractor {i} Pvt Ltd" for i in range(500)]
+QUERIES = [("state", "Telangana"), ("nh", "NH16"), ("status", "Completed"), ("contractor", CONTRACTORS[0])]
+
+
+def generate_rollup_projects(count: int, seed: int) -> List[Dict]:
+    rng = random.Random(seed)
+    projects = generate_project_records(count, seed)
+    for project in projects:
+        project["concessionaire"] = rng.choice(CONTRACTORS)
+    return projects
+
+def apply_updates(rollups: ProjectRollups, projects: List[Dict], incoming: List[Dict], num_updates: int, seed: int):
+    """
+    Adds `incoming` to the rollups, then moves `num_updates` random projects to a random
+    status, in `projects` and in the rollups alike.
+    """
+    for project in incoming:
+        rollups.add(project)
+    rng = random.Random(seed)
+    for i in rng.sample(range(len(projects)), num_updates):
+        projects[i] = dict(projects[i], status=rng.choice(STATUSES))
+        rollups.set_status(projects[i], projects[i]["status"])
+
+def rollups_agree(ours: ProjectRollups, theirs: ProjectRollups) -> bool:
+    """
+    Whether two rollups hold the same groups, counts and (up to float summation order) km.
+    """
+    agree = ours.records == theirs.records
+    for dimension in DIMENSIONS:
+        a = sorted((r["key"], r["count"], r["km"]) for r in ours.table(dimension))
+        b = sorted((r["key"], r["count"], r["km"]) for r in theirs.table(dimension))
+        agree &= [r[:2] for r in a] == [r[:2] for r in b] and np.allclose([r[2] for r in a], [r[2] for r in b])
+    return agree
+
+def rescan(projects: List[Dict], dimension: str, key: str) -> float:
+    """
+    A total the way it is computed today: one pass over every record.
+    """
+    return sum(project_km(p) for p in projects if key in dimension_keys(p, dimension))
+
+def main():
+    args = history_arguments(argparse.ArgumentParser(description="Incremental rollups against rebuilding and rescanning.")).parse_args()
+    projects = generate_rollup_projects(NUM_PROJECTS, args.seed)
+    history, incoming = projects[:-NUM_UPDATES], projects[-NUM_UPDATES:]
+
+    stages: Dict[str, Dict] = {}
+    with RssSampler() as sampler:
+        rollups = run_stage(stages, sampler, "build", lambda: ProjectRollups.build(history), items=len(history))
+        run_stage(stages, sampler, "add and status changes", lambda: apply_updates(rollups, projects, incoming, NUM_UPDATES, args.seed + 1), items=2 * NUM_UPDATES)
+        assert rollups_agree(rollups, ProjectRollups.build(projects)), "incremental rollups differ from a rebuild"
+        for dimension, key in QUERIES:
+            expected = run_stage(stages, sampler, f"{dimension} rescan", lambda: rescan(projects, dimension, key), items=1)
+            total = run_stage(stages, sampler, f"{dimension} rollup", lambda: rollups.total(dimension, key), items=1, repeats=REPEATS)
+            assert abs(total["km"] - expected) < 1e-3 * max(1.0, expected), f"{dimension} {key}: rollup and rescan disagree"
+    record_runs([{"benchmark": "project_rollups", "scale": 1, "sizes": {"projects": len(projects), "updates": NUM_UPDATES}, "stages": stages}], args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# Check for required libraries
+try:
+    from shapely.geometry import LineString, Point
+except ImportError as e:
+    print(f"Missing required library: {e}")
+    print("Please install them using: pip install shapely")
+    sys.exit(1)
+
+from benchmark_suite import RssSampler, generate_ref_highways, generate_segment_queries, history_arguments, record_runs, run_stage, speedup
+from highway_index import HighwayIndex
+
+# Constants
+NUM_REFS = 200
+SEGMENTS_PER_REF = 500
+POINTS_PER_SEGMENT = 20
+NUM_PROJECTS = 200
+AGREEMENT_SAMPLE = 20
+
+
+def linear_scan_match(state_highways: List[Dict], nh_ref: str, start_coords: Tuple[float, float], end_coords: Tuple[float, float]) -> Optional[Dict]:
+    """
+    The original matching: substring ref scan over every segment, then a fresh
+    LineString and two distances per candidate.
+    """
+    matches = []
+    target_ref = nh_ref.replace(" ", "").lower()
+    for hw in state_highways:
+        hw_ref = hw.get('ref', '').replace(" ", "").lower()
+        if target_ref in hw_ref or hw_ref in target_ref:
+            matches.append(hw['geometry'])
+
+    best_geom = None
+    min_score = float('inf')
+    p1 = Point(start_coords[1], start_coords[0])
+    p2 = Point(end_coords[1], end_coords[0])
+    for geom in matches:
+        if geom['type'] != 'LineString':
+            continue
+        line = LineString(geom['coordinates'])
+        score = line.distance(p1) + line.distance(p2)
+        if score < min_score:
+            min_score = score
+            best_geom = geom
+    return best_geom
+
+def exact_ref_agreement(index: HighwayIndex, projects: List[Tuple[str, Tuple[float, float], Tuple[float, float]]]) -> int:
+    """
+    Projects for which the index picks the same segment as the linear scan over the segments of
+    exactly their ref (the substring scan also matches e.g. "nh1" against "nh12").
+    """
+    return sum(1 for ref, s, e in projects if index.find_best_segment(ref, s, e) is linear_scan_match(index.segments_for_ref(ref), ref, s, e))
+
+def main():
+    args = history_arguments(argparse.ArgumentParser(description="Indexed segment matching against the original linear scan.")).parse_args()
+    highways = generate_ref_highways(NUM_REFS, SEGMENTS_PER_REF, POINTS_PER_SEGMENT, args.seed)
+    projects = generate_segment_queries(highways, NUM_PROJECTS, seed=args.seed + 1)
+    print(f"{len(projects)} projects against {len(highways)} segments")
+
+    stages: Dict[str, Dict] = {}
+    with RssSampler() as sampler:
+        linear_results = run_stage(stages, sampler, "linear scan", lambda: [linear_scan_match(highways, ref, s, e) for ref, s, e in projects])
+        index = run_stage(stages, sampler, "index build", lambda: HighwayIndex(highways), items=len(highways))
+        index_results = run_stage(stages, sampler, "index queries", lambda: [index.find_best_segment(ref, s, e) for ref, s, e in projects])
+
+    agree = exact_ref_agreement(index, projects[:AGREEMENT_SAMPLE])
+    assert agree == AGREEMENT_SAMPLE, f"index and exact-ref scan disagree on {AGREEMENT_SAMPLE - agree} projects"
+    print(f"Speedup (queries only): {speedup(stages, 'linear scan', 'index queries'):.1f}x")
+    print(f"Matched: linear {sum(r is not None for r in linear_results)}, index {sum(r is not None for r in index_results)}")
+    record_runs([{"benchmark": "segment_matching", "scale": 1, "sizes": {"segments": len(highways), "projects": len(projects)}, "stages": stages}], args)
+
+if __name__ == "__main__":
+    main()
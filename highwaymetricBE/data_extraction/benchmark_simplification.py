@@ -0,0 +1,86 @@
+import argparse
+import json
+from typing import Dict
+
+import numpy as np
+
+from benchmark_suite import RssSampler, generate_segments, history_arguments, record_runs, run_stage
+from simplify import encode_records, compact_geometry, delta_decode, tolerance_for_zoom, LOD_BANDS, QUANT_SCALE
+
+# Constants
+NUM_SEGMENTS = 2000
+POINTS_PER_SEGMENT = 400
+ROUND_TRIP_SAMPLE = 200 # Segments whose every level is decoded and compared with the raw vertices
+
+
+def max_deviation(raw: np.ndarray, line: np.ndarray) -> float:
+    """
+    Largest planar distance in degrees from a raw vertex to the decoded polyline.
+    """
+    if len(line) == 1:
+        return float(np.max(np.hypot(*(raw - line[0]).T)))
+    a, b = line[:-1], line[1:]
+    ab = b - a
+    ab_len2 = np.maximum(np.einsum('ij,ij->i', ab, ab), 1e-30)
+    ap = raw[:, None, :] - a[None, :, :]
+    t = np.clip(np.einsum('pij,ij->pi', ap, ab) / ab_len2, 0.0, 1.0)
+    closest = a[None, :, :] + t[..., None] * ab[None, :, :]
+    return float(np.max(np.min(np.linalg.norm(raw[:, None, :] - closest, axis=2), axis=1)))
+
+def round_trip_bound(band: int) -> float:
+    """
+    Worst deviation a level may have from the raw line: each level is simplified from the
+    next finer one, so the tolerances of this and every finer band add up, plus the
+    rounding to the quantization grid at each level.
+    """
+    finer = LOD_BANDS[band:]
+    return sum(tolerance_for_zoom(z) for z in finer) + len(finer) * np.sqrt(2) / QUANT_SCALE
+
+def check_round_trip(segments, encoded, sample: int = ROUND_TRIP_SAMPLE):
+    """
+    Decodes every level of the first `sample` segments and asserts that each stays within its bound.
+    Returns the worst deviation seen per band.
+    """
+    worst = [0.0] * len(LOD_BANDS)
+    for segment, record in zip(segments[:sample], encoded[:sample]):
+        raw = np.asarray(segment['geometry']['coordinates'])
+        for band, (max_zoom, flat) in enumerate(record['lods']):
+            decoded = np.asarray(delta_decode(flat))
+            assert np.allclose(decoded[[0, -1]], raw[[0, -1]], atol=1 / QUANT_SCALE), f"segment {segment['id']} zoom {max_zoom}: endpoints moved"
+            deviation = max_deviation(raw, decoded)
+            assert deviation <= round_trip_bound(band), f"segment {segment['id']} zoom {max_zoom}: {deviation:.2e} > {round_trip_bound(band):.2e}"
+            worst[band] = max(worst[band], deviation)
+    return worst
+
+def main():
+    args = history_arguments(argparse.ArgumentParser(description="Size and fidelity of the delta-encoded levels of detail.")).parse_args()
+    segments = generate_segments(NUM_SEGMENTS, POINTS_PER_SEGMENT, args.seed)
+    print(f"{NUM_SEGMENTS} segments x {POINTS_PER_SEGMENT} points")
+
+    stages: Dict[str, Dict] = {}
+    with RssSampler() as sampler:
+        encoded = run_stage(stages, sampler, "encode LODs", lambda: encode_records(segments))
+        run_stage(stages, sampler, "compact", lambda: [compact_geometry(s['geometry']) for s in segments])
+    raw = json.dumps(segments)
+    packed = json.dumps(encoded, separators=(',', ':'))
+    compacted = json.dumps([compact_geometry(s['geometry']) for s in segments], separators=(',', ':'))
+
+    print(f"Raw GeoJSON payload:     {len(raw) / 1e6:8.2f} MB")
+    print(f"Compacted (~1 m) JSON:   {len(compacted) / 1e6:8.2f} MB")
+    print(f"All LODs, delta-encoded: {len(packed) / 1e6:8.2f} MB")
+
+    # What the page has to turn into polylines at each band vs. the full-resolution vertices
+    total = NUM_SEGMENTS * POINTS_PER_SEGMENT
+    for band, max_zoom in enumerate(LOD_BANDS):
+        vertices = sum(len(r['lods'][band][1]) // 2 for r in encoded)
+        print(f"  zoom <= {max_zoom:2d}: {vertices:8d} vertices ({total / max(vertices, 1):6.1f}x fewer than raw)")
+
+    # Every decoded level stays within its simplification tolerance of the raw line
+    worst = check_round_trip(segments, encoded)
+    for band, max_zoom in enumerate(LOD_BANDS):
+        print(f"  zoom <= {max_zoom:2d}: worst round-trip deviation {worst[band]:.2e} deg (bound {round_trip_bound(band):.2e})")
+    record_runs([{"benchmark": "simplification", "scale": 1, "sizes": {"segments": NUM_SEGMENTS, "points": total},
+                  "stages": stages, "bytes": {"raw": len(raw), "compacted": len(compacted), "lods": len(packed)}}], args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,468 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Check for required libraries
+try:
+    import numpy as np
+except ImportError as e:
+    print(f"Missing required library: {e}")
+    print("Please install them using: pip install numpy")
+    sys.exit(1)
+
+from field_extractor import STATES
+from geometry_kernel import cumulative_km
+
+# Constants
+SEED = 42
+RESULTS_DIR = "benchmark_results"
+HISTORY_FILE = "history.ndjson"
+RSS_SAMPLE_SECONDS = 0.01
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+STATUSES = ["Awarded But Not Started", "Balance For Award", "Completed", "Under Implementation"]
+# Connected network (generate_network): each NH ref is a chain of ways of 20 points
+WAYS_PER_REF = 25
+POINTS_PER_WAY = 20
+CHAINAGE_SHARE = 0.3 # Report rows described by chainage instead of place names
+# Report text (generate_report_texts)
+TOWNS = ["Kadapa", "Kurnool", "Hyderabad", "Nagpur", "Vijayawada", "Gundugolanu", "Kovvuru", "Pileru", "Kalur", "Tuni"]
+TEXT_WORDS = ["Four", "laning", "of", "the", "road", "widening", "bypass", "improvement", "package", "with", "paved", "shoulder", "on", "EPC", "mode", "HAM"]
+# Contractor spellings (generate_contractor_names)
+FIRM_WORDS = ["Sri", "Balaji", "Lakshmi", "Megha", "Sadbhav", "Montecarlo", "Gayatri", "Dilip", "Ashoka", "Ramky", "Navayuga",
+              "Hindustan", "Bharat", "Apco", "Varaha", "Krishna", "Godavari", "Kaveri", "Deccan", "Venkata", "Sai", "Ganesh",
+              "Patel", "Shree", "Om", "Jai", "Maruti", "Tirupati", "Chaitanya", "Sudharma", "Ibha", "Jaabilli", "Rajdeep",
+              "Kalpataru", "Afcons", "Tata", "Vijay", "Surya", "Anand", "Prakash", "Mahalakshmi", "Annapurna", "Coastal"]
+TRADES = ["Constructions", "Infrastructure", "Infratech", "Infraprojects", "Engineering", "Builders", "Projects",
+          "Highways", "Developers", "Buildcon", "Roadways", "Enterprises"]
+FORMS = [("Pvt. Ltd.", "Private Limited", "PVT LTD", "Pvt Ltd"), ("Limited", "Ltd.", "LTD", "Ltd"), ("Co.", "Company", "Co"), ("LLP", "L.L.P.")]
+SPELLINGS_PER_FIRM = 4
+
+
+# Synthetic data
+
+def place_name(i: int) -> str:
+    """
+    A unique letters-only town name, so the extractor's from/to patterns pick it up whole.
+    """
+    suffix = ""
+    while True:
+        suffix += LETTERS[i % 26]
+        i //= 26
+        if not i:
+            break
+    return "Kota" + suffix
+
+def generate_network(num_refs: int, seed: int = SEED) -> List[Dict]:
+    """
+    Synthetic NH network in the fetch_state_highways.js schema. Each ref is a chain of ways
+    that share endpoints, so routing and chainage placement work on it like on OSM data.
+    """
+    rng = random.Random(seed)
+    highways = []
+    for r in range(num_refs):
+        lon, lat = rng.uniform(70.0, 88.0), rng.uniform(9.0, 30.0)
+        heading = rng.uniform(0, 2 * np.pi)
+        for _ in range(WAYS_PER_REF):
+            coords = [[lon, lat]]
+            for _ in range(POINTS_PER_WAY - 1):
+                heading += rng.uniform(-0.3, 0.3)
+                lon += 0.004 * np.cos(heading)
+                lat += 0.004 * np.sin(heading)
+                coords.append([round(lon, 7), round(lat, 7)])
+            highways.append({
+                "id": len(highways) + 1,
+                "type": "way",
+                "ref": f"NH{r + 1}",
+                "name": f"Synthetic NH {r + 1}",
+                "geometry": {"type": "LineString", "coordinates": coords},
+                "length_km": round(float(cumulative_km(np.array(coords))[-1]), 3)
+            })
+    return highways
+
+def generate_report(highways: List[Dict], num_projects: int, seed: int = SEED) -> Tuple[List[str], Dict[str, List[float]], List[Dict]]:
+    """
+    Report rows for projects on a generate_network network, in the layout parse_pdf_text
+    reads, with the stub geocoder table for their places and km-posts at both ends of every NH.
+    Returns (text lines, place -> [lat, lon], km-posts).
+    """
+    rng = random.Random(seed + 1)
+    chains: Dict[str, List[List[float]]] = {}
+    for hw in highways:
+        chain = chains.setdefault(hw['ref'], [])
+        chain.extend(hw['geometry']['coordinates'][1 if chain else 0:])
+
+    km_posts = []
+    chain_km = {}
+    for ref, coords in chains.items():
+        cum = cumulative_km(np.array(coords))
+        chain_km[ref] = cum
+        for i in (0, len(coords) - 1):
+            km_posts.append({"nh_number": ref[2:], "km": round(float(cum[i]), 3), "lat": coords[i][1], "lon": coords[i][0]})
+
+    refs = sorted(chains)
+    lines = []
+    places = {}
+    for sr_no in range(1, num_projects + 1):
+        ref = rng.choice(refs)
+        coords = chains[ref]
+        i, j = sorted(rng.sample(range(len(coords)), 2))
+        state = rng.choice(STATES)
+        length = chain_km[ref][j] - chain_km[ref][i]
+        if rng.random() < CHAINAGE_SHARE:
+            where = f"from km {chain_km[ref][i]:.3f} to km {chain_km[ref][j]:.3f}"
+        else:
+            start, end = place_name(2 * sr_no), place_name(2 * sr_no + 1)
+            places[start] = [coords[i][1] + rng.uniform(-0.001, 0.001), coords[i][0] + rng.uniform(-0.001, 0.001)]
+            places[end] = [coords[j][1] + rng.uniform(-0.001, 0.001), coords[j][0] + rng.uniform(-0.001, 0.001)]
+            where = f"from {start} to {end},"
+        lines.append(f"{sr_no} Four laning of {where} NH-{ref[2:]} in {state} {length:.3f} km on HAM mode")
+    return lines, places, km_posts
+
+def generate_report_texts(count: int, seed: int = SEED) -> List[str]:
+    """
+    Raw project texts shaped like the NHAI report rows, with places, an NH, a chainage range, a state and a length.
+    """
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        words = [rng.choice(TEXT_WORDS) for _ in range(rng.randint(10, 30))]
+        shape = rng.random()
+        if shape < 0.4:
+            words.insert(2, f"from {rng.choice(TOWNS)} to {rng.choice(TOWNS)}")
+        elif shape < 0.7:
+            words.insert(2, f"{rng.choice(TOWNS)} - {rng.choice(TOWNS)} section")
+        words.insert(rng.randint(0, len(words)), f"NH-{rng.randint(1, 999)}")
+        words.insert(rng.randint(0, len(words)), f"from km {rng.uniform(0, 500):.3f} to km {rng.uniform(500, 900):.3f}")
+        words.insert(rng.randint(0, len(words)), f"in {rng.choice(STATES)}")
+        words.append(f"{rng.uniform(0.5, 200):.3f} km")
+        records.append(" ".join(words))
+    return records
+
+def generate_project_records(count: int, seed: int = 7) -> List[Dict]:
+    """
+    Synthetic projects in the merged shape of highway_data.json and projects_metadata.json.
+    """
+    rng = random.Random(seed)
+    projects = []
+    for i in range(count):
+        lon, lat = rng.uniform(72, 88), rng.uniform(10, 28)
+        coords = [[lon + k * 0.01, lat + rng.uniform(-0.01, 0.01)] for k in range(10)]
+        projects.append({
+            "sr_no": str(i + 1),
+            "nh_number": f"NH{rng.randint(1, 999)}",
+            "state": rng.choice(STATES),
+            "status": rng.choice(STATUSES),
+            "total_length": f"{rng.uniform(0.5, 120):.3f}",
+            "loa_date": f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(2015, 2025)}",
+            "geometry": {"type": "LineString", "coordinates": coords} if rng.random() < 0.7 else None
+        })
+    return projects
+
+def generate_chainage_projects(count: int, highways: int = 2000, seed: int = 11) -> List[Dict]:
+    """
+    Synthetic projects spread over `highways` highways of up to 1500 km: packages of a
+    few to 100 km, point works (flyovers, blackspots) and the odd record repeated in another report.
+    """
+    rng = random.Random(seed)
+    projects = []
+    for i in range(count):
+        if projects and rng.random() < 0.02:
+            copy = dict(rng.choice(projects), sr_no=str(i + 1), status=rng.choice(STATUSES))
+            projects.append(copy)
+            continue
+        start = rng.uniform(0, 1500)
+        end = start if rng.random() < 0.2 else start + rng.uniform(2, 100)
+        projects.append({
+            "sr_no": str(i + 1),
+            "nh_number": str(rng.randint(1, highways)),
+            "status": rng.choice(STATUSES),
+            "start_chainage": f"{start:.3f}",
+            "end_chainage": f"{end:.3f}"
+        })
+    return projects
+
+def generate_contractor_names(num_firms: int, seed: int = 5) -> List[Tuple[str, int]]:
+    """
+    (spelling, firm) pairs: each firm is written several ways, varying case, company form,
+    punctuation, an "M/s" prefix, "&"/"and", and the odd typo.
+    """
+    rng = random.Random(seed)
+    firms = {}
+    while len(firms) < num_firms:
+        words = rng.sample(FIRM_WORDS, rng.randint(1, 3)) + [rng.choice(TRADES)]
+        if rng.random() < 0.2:
+            words.insert(-1, "&")
+        firms.setdefault(" ".join(words), rng.randrange(len(FORMS)))
+
+    names = []
+    for firm, (base, form) in enumerate(sorted(firms.items())):
+        for _ in range(SPELLINGS_PER_FIRM):
+            name = base
+            if rng.random() < 0.2:
+                name = name.replace(" & ", " and ") if "&" in name else name.replace(" and ", " & ")
+            if rng.random() < 0.1:
+                words = name.split(" ")
+                i = max(range(len(words)), key=lambda w: len(words[w]))
+                cut = rng.randrange(1, len(words[i]))
+                words[i] = words[i][:cut] + words[i][cut + 1:] # A letter dropped from the longest word
+                name = " ".join(words)
+            name = f"{name} {rng.choice(FORMS[form])}"
+            case = rng.random()
+            if case < 0.2:
+                name = name.upper()
+            elif case < 0.3:
+                name = name.lower()
+            if rng.random() < 0.1:
+                name = "M/s. " + name
+            if rng.random() < 0.2:
+                name += "."
+            names.append((name, firm))
+    rng.shuffle(names)
+    return names
+
+def generate_state_highways(num_segments: int, points: int, seed: int = 11) -> List[Dict]:
+    """
+    Unconnected random-walk segments on random NH refs, in the shape fetch_state_highways.js writes.
+    """
+    rng = random.Random(seed)
+    highways = []
+    for i in range(num_segments):
+        lon, lat = rng.uniform(72, 88), rng.uniform(10, 28)
+        coords = []
+        for _ in range(points):
+            lon += rng.uniform(-0.0005, 0.0005)
+            lat += rng.uniform(-0.0005, 0.0005)
+            coords.append([lon, lat])
+        highways.append({
+            "id": 100000 + i,
+            "type": "way",
+            "ref": f"NH{rng.randint(1, 999)}",
+            "name": f"Synthetic Road {i}",
+            "geometry": {"type": "LineString", "coordinates": coords},
+            "length_km": round(rng.uniform(0.1, 5.0), 3)
+        })
+    return highways
+
+def generate_ref_highways(num_refs: int, segments_per_ref: int, points_per_segment: int, seed: int = SEED) -> List[Dict]:
+    """
+    Many segments per NH ref ("NH 1" ... spelled with a space), drifting north-east across
+    India's bounding box, in shuffled order.
+    """
+    rng = random.Random(seed)
+    highways = []
+    for r in range(num_refs):
+        ref = f"NH {r + 1}"
+        lon, lat = rng.uniform(69.0, 96.0), rng.uniform(8.0, 35.0)
+        for _ in range(segments_per_ref):
+            coords = []
+            for _ in range(points_per_segment):
+                lon += rng.uniform(-0.005, 0.01)
+                lat += rng.uniform(-0.005, 0.01)
+                coords.append([lon, lat])
+            highways.append({
+                "id": len(highways),
+                "type": "way",
+                "ref": ref,
+                "name": "Synthetic",
+                "geometry": {"type": "LineString", "coordinates": coords},
+                "length_km": 0.0
+            })
+    rng.shuffle(highways)
+    return highways
+
+def generate_segment_queries(highways: List[Dict], count: int, jitter: float = 0.0, seed: int = SEED + 1) -> List[Tuple[str, Tuple[float, float], Tuple[float, float]]]:
+    """
+    (nh_ref, start, end) matching queries, (lat, lon) near points of randomly chosen
+    segments: their ends nudged by 0.001 deg, or with `jitter`, two random points moved up to that far.
+    """
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        hw = highways[rng.randrange(len(highways))]
+        coords = hw['geometry']['coordinates']
+        if jitter:
+            s, e = coords[rng.randrange(len(coords))], coords[rng.randrange(len(coords))]
+            queries.append((hw['ref'], (s[1] + rng.uniform(-jitter, jitter), s[0] + rng.uniform(-jitter, jitter)),
+                            (e[1] + rng.uniform(-jitter, jitter), e[0] + rng.uniform(-jitter, jitter))))
+        else:
+            s, e = coords[0], coords[-1]
+            queries.append((hw['ref'], (s[1] + 0.001, s[0]), (e[1] - 0.001, e[0])))
+    return queries
+
+def generate_segments(num_segments: int, points: int, seed: int = 7) -> List[Dict]:
+    """
+    Wiggly synthetic highway ways at OSM-like density (a node every ~20-50 m).
+    """
+    rng = random.Random(seed)
+    segments = []
+    for i in range(num_segments):
+        lon, lat = rng.uniform(72, 88), rng.uniform(10, 28)
+        heading = rng.uniform(0, 2 * np.pi)
+        coords = []
+        for _ in range(points):
+            heading += rng.gauss(0, 0.08)
+            step = rng.uniform(0.0002, 0.0005)
+            lon += step * np.cos(heading)
+            lat += step * np.sin(heading)
+            coords.append([lon, lat])
+        segments.append({"id": i, "ref": f"NH{rng.randint(1, 999)}", "length_km": None,
+                         "geometry": {"type": "LineString", "coordinates": coords}})
+    return segments
+
+
+# Timing
+
+class RssSampler:
+    """
+    Tracks the peak resident set size of this process between reset() calls, from a
+    background thread reading /proc/self/statm. Elsewhere it falls back to ru_maxrss,
+    which is the peak of the whole run so far.
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self.proc = os.path.exists("/proc/self/statm")
+        self.peak = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def current(self) -> int:
+        if self.proc:
+            with open("/proc/self/statm", 'r') as f:
+                return int(f.read().split()[1]) * self.page_size
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, self.current())
+
+    def reset(self):
+        self.peak = self.current()
+
+    def read_peak(self) -> int:
+        self.peak = max(self.peak, self.current())
+        return self.peak
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+
+
+def run_stage(results: Dict, sampler: RssSampler, name: str, func, items: Optional[int] = None, repeats: int = 1):
+    """
+    Runs one stage `repeats` times with its output silenced, recording seconds per run,
+    throughput and peak RSS. `items` may be a number or, if None, the len() of the stage's result.
+    """
+    sampler.reset()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeats):
+            result = func()
+    elapsed = (time.perf_counter() - start) / repeats
+    count = items if items is not None else len(result)
+    results[name] = {
+        "seconds": round(elapsed, 6),
+        "items": count,
+        "items_per_second": round(count / elapsed, 1) if elapsed > 0 else None,
+        "peak_rss_mb": round(sampler.read_peak() / 2**20, 1)
+    }
+    print(f"  {name:<24} {elapsed:11.6f}s  {count:>9} items  {results[name]['items_per_second'] or 0:>12.1f}/s  {results[name]['peak_rss_mb']:>8.1f} MB")
+    return result
+
+def speedup(results: Dict, slow: str, fast: str) -> float:
+    """
+    How many times faster stage `fast` ran than stage `slow`, per item.
+    """
+    return results[fast]["items_per_second"] / results[slow]["items_per_second"]
+
+
+# History
+
+def git_revision() -> Tuple[str, bool]:
+    """
+    Returns (short commit hash, whether tracked files have uncommitted changes).
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+def load_history(results_dir: str) -> List[Dict]:
+    try:
+        with open(os.path.join(results_dir, HISTORY_FILE), 'r') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+def find_baseline(history: List[Dict], run: Dict, commit: str, baseline: Optional[str]) -> Optional[Dict]:
+    """
+    The latest earlier run of the same benchmark at the same scale: of `baseline` if given, else of any other commit.
+    """
+    for entry in reversed(history):
+        if entry.get('benchmark', "pipeline") != run['benchmark'] or entry['scale'] != run['scale']:
+            continue
+        if (baseline and entry['commit'].startswith(baseline)) or (not baseline and entry['commit'] != commit):
+            return entry
+    return None
+
+def print_comparison(run: Dict, base: Dict):
+    print(f"\n{run['benchmark']} {run['scale']}x vs {base['commit']} ({base['timestamp']}):")
+    for name, stage in run['stages'].items():
+        before = base['stages'].get(name)
+        if not before or not before['seconds']:
+            continue
+        change = (stage['seconds'] - before['seconds']) / before['seconds'] * 100
+        print(f"  {name:<24} {before['seconds']:11.6f}s -> {stage['seconds']:11.6f}s  {change:+7.1f}%   {before['peak_rss_mb']:8.1f} -> {stage['peak_rss_mb']:8.1f} MB")
+
+def history_arguments(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--results-dir", default=RESULTS_DIR, help="Where the run history is kept")
+    parser.add_argument("--baseline", help="Commit to compare against (default: the latest run of another commit)")
+    parser.add_argument("--no-save", action="store_true", help="Do not append this run to the history")
+    return parser
+
+def record_runs(runs: List[Dict], args: argparse.Namespace):
+    """
+    Stamps each run ({"benchmark", "scale", "stages", ...}) with the commit and host, prints
+    its change against the baseline run, and appends it to the history unless --no-save.
+    """
+    commit, dirty = git_revision()
+    history = load_history(args.results_dir)
+    for run in runs:
+        run.update({
+            "commit": commit,
+            "dirty": dirty,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "seed": args.seed
+        })
+        base = find_baseline(history, run, commit, args.baseline)
+        if base:
+            print_comparison(run, base)
+
+    if not args.no_save:
+        os.makedirs(args.results_dir, exist_ok=True)
+        with open(os.path.join(args.results_dir, HISTORY_FILE), 'a') as f:
+            for run in runs:
+                f.write(json.dumps(run) + "\n")
+        print(f"\nAppended {len(runs)} runs for {commit}{' (dirty)' if dirty else ''} to {os.path.join(args.results_dir, HISTORY_FILE)}")
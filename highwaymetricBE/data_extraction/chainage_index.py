@@ -0,0 +1,233 @@
+import argparse
+import heapq
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from field_extractor import CHAINAGE_POINT_PATTERN, CHAINAGE_RANGE_PATTERN
+from linear_reference import parse_chainage
+from nh_refs import canonical_refs
+from project_query import load_projects
+
+# Constants
+ADJACENT_GAP_KM = 0.1 # Ranges this close end to start continue each other
+DUPLICATE_OVERLAP = 0.9 # Shared length over combined length at which two ranges are the same stretch
+REPORT_FILE = "data_extraction/chainage_conflicts.json"
+
+Interval = Tuple[float, float, int] # (start km, end km, project position)
+
+
+def chainage_range(project: Dict) -> Optional[Tuple[float, float]]:
+    """
+    The (start, end) km of a project, from its start_chainage/end_chainage fields or,
+    for records without them, from its name ("from km 15.320 to km 85.204", "at km 1023.520").
+    """
+    start = parse_chainage(project.get("start_chainage"))
+    end = parse_chainage(project.get("end_chainage"))
+    if start is None:
+        name = project.get("project_name") or ""
+        match = CHAINAGE_RANGE_PATTERN.search(name)
+        if match:
+            start, end = parse_chainage(match.group(1)), parse_chainage(match.group(2))
+        else:
+            match = CHAINAGE_POINT_PATTERN.search(name)
+            if match:
+                start = parse_chainage(match.group(1))
+    if start is None:
+        return None
+    if end is None:
+        end = start
+    return (start, end) if start <= end else (end, start)
+
+
+class IntervalTree:
+    """
+    Static centered interval tree over one NH's chainage ranges.
+
+    Each node keeps the ranges that contain its center, sorted by start and by end;
+    ranges wholly left or right of it go to the children. Building is O(n log n) and a
+    point or range query is O(log n + k) for k results.
+    """
+
+    def __init__(self, intervals: List[Interval]):
+        self.center = 0.0
+        self.by_start: List[Interval] = []
+        self.by_end: List[Interval] = []
+        self.left: Optional[IntervalTree] = None
+        self.right: Optional[IntervalTree] = None
+        if not intervals:
+            return
+        endpoints = sorted(x for start, end, _ in intervals for x in (start, end))
+        self.center = endpoints[len(endpoints) // 2]
+        left, right, here = [], [], []
+        for interval in intervals:
+            if interval[1] < self.center:
+                left.append(interval)
+            elif interval[0] > self.center:
+                right.append(interval)
+            else:
+                here.append(interval)
+        self.by_start = sorted(here)
+        self.by_end = sorted(here, key=lambda i: -i[1])
+        self.left = IntervalTree(left) if left else None
+        self.right = IntervalTree(right) if right else None
+
+    def overlapping(self, lo: float, hi: float) -> List[int]:
+        """
+        Positions of the ranges that share at least a point with [lo, hi].
+        """
+        found: List[int] = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if hi < node.center:
+                # Ranges here end at or after the center, so they reach lo; check they start by hi
+                for start, _, pos in node.by_start:
+                    if start > hi:
+                        break
+                    found.append(pos)
+                if node.left:
+                    stack.append(node.left)
+            elif lo > node.center:
+                for _, end, pos in node.by_end:
+                    if end < lo:
+                        break
+                    found.append(pos)
+                if node.right:
+                    stack.append(node.right)
+            else:
+                found.extend(pos for _, _, pos in node.by_start)
+                if node.left:
+                    stack.append(node.left)
+                if node.right:
+                    stack.append(node.right)
+        return found
+
+
+def classify(a: Interval, b: Interval, gap_km: float = ADJACENT_GAP_KM) -> Optional[Tuple[str, float]]:
+    """
+    How two ranges on the same NH relate: ("duplicate" | "overlap" | "adjacent", shared km),
+    or None when they are further apart than gap_km.
+    """
+    shared = min(a[1], b[1]) - max(a[0], b[0])
+    if shared < -gap_km:
+        return None
+    is_point = a[0] == a[1] or b[0] == b[1]
+    if shared < 0 or (shared == 0 and not is_point):
+        return "adjacent", 0.0
+    combined = max(a[1], b[1]) - min(a[0], b[0])
+    if combined == 0 or shared / combined >= DUPLICATE_OVERLAP:
+        return "duplicate", shared
+    return "overlap", shared
+
+def union_km(spans: Iterable[Tuple[float, float]]) -> float:
+    """
+    Length of the union of (start, end) km ranges, each stretch counted once however many ranges cover it.
+    """
+    total = 0.0
+    end = None
+    for lo, hi in sorted(spans):
+        if end is None or lo > end:
+            total += hi - lo
+            end = hi
+        elif hi > end:
+            total += hi - end
+            end = hi
+    return total
+
+
+class ChainageIndex:
+    """
+    Chainage ranges of projects grouped by canonical NH (a project on "NH-16/65" is on both),
+    with an interval tree per NH for "which projects touch km X on NH Y".
+    """
+
+    def __init__(self, projects: Iterable[Dict]):
+        self.projects: List[Dict] = list(projects)
+        self.intervals: Dict[str, List[Interval]] = {}
+        for pos, project in enumerate(self.projects):
+            span = chainage_range(project)
+            if span is None:
+                continue
+            for ref in canonical_refs(project.get("nh_number")):
+                self.intervals.setdefault(ref, []).append((span[0], span[1], pos))
+        for intervals in self.intervals.values():
+            intervals.sort()
+        self.trees = {ref: IntervalTree(intervals) for ref, intervals in self.intervals.items()}
+
+    def __len__(self) -> int:
+        return sum(len(intervals) for intervals in self.intervals.values())
+
+    def overlapping(self, nh: str, lo: float, hi: float) -> List[int]:
+        """
+        Positions of the projects on NH `nh` (any spelling) whose range touches [lo, hi], in position order.
+        """
+        found = set()
+        for ref in canonical_refs(nh):
+            if ref in self.trees:
+                found.update(self.trees[ref].overlapping(lo, hi))
+        return sorted(found)
+
+    def at(self, nh: str, km: float) -> List[int]:
+        """
+        Positions of the projects on NH `nh` whose range includes km `km`.
+        """
+        return self.overlapping(nh, km, km)
+
+    def conflicts(self, gap_km: float = ADJACENT_GAP_KM) -> List[Dict]:
+        """
+        Every pair of projects on the same NH whose ranges overlap, duplicate each other or
+        meet within gap_km, found by a sweep over the ranges in start order: O(n log n + k).
+        """
+        conflicts = []
+        for ref, intervals in sorted(self.intervals.items()):
+            active: List[Tuple[float, int, Interval]] = [] # Heap of ranges that may still reach later starts, by end
+            for current in intervals:
+                while active and active[0][0] < current[0] - gap_km:
+                    heapq.heappop(active)
+                for _, _, other in active:
+                    relation = classify(other, current, gap_km)
+                    if relation:
+                        kind, shared = relation
+                        conflicts.append(self._conflict(ref, kind, shared, other, current))
+                heapq.heappush(active, (current[1], current[2], current))
+        return conflicts
+
+    def _conflict(self, ref: str, kind: str, shared: float, a: Interval, b: Interval) -> Dict:
+        first, second = self.projects[a[2]], self.projects[b[2]]
+        return {
+            "nh": ref,
+            "kind": kind,
+            "shared_km": round(shared, 3),
+            # A duplicate whose records come from different reports is the same work listed twice
+            "same_report": first.get("status") == second.get("status"),
+            "projects": [
+                {"position": i[2], "sr_no": p.get("sr_no"), "status": p.get("status"), "start_km": i[0], "end_km": i[1], "project_name": p.get("project_name")}
+                for i, p in ((a, first), (b, second))
+            ]
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find overlapping, adjacent and duplicate projects on the same NH by chainage.")
+    parser.add_argument("input", nargs="+", help="Project JSON arrays (highway_data.json, data_extraction/projects_metadata.json)")
+    parser.add_argument("--at", nargs=2, metavar=("NH", "KM"), help="Only list the projects touching this km of this NH")
+    parser.add_argument("--gap", type=float, default=ADJACENT_GAP_KM, help="Largest gap in km between two ranges that still counts as adjacent")
+    parser.add_argument("--output", default=REPORT_FILE, help="Where to write the conflicts")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = ChainageIndex(load_projects(args.input))
+    print(f"Indexed {len(index)} chainage ranges on {len(index.trees)} highways in {time.perf_counter() - start:.3f}s")
+
+    if args.at:
+        nh, km = args.at[0], parse_chainage(args.at[1])
+        for pos in index.at(nh, km):
+            project = index.projects[pos]
+            print(f"{project.get('sr_no')}\t{project.get('status')}\t{project.get('project_name')}")
+    else:
+        conflicts = index.conflicts(args.gap)
+        with open(args.output, 'w') as f:
+            json.dump(conflicts, f, indent=4)
+        counts = {kind: sum(1 for c in conflicts if c["kind"] == kind) for kind in ("duplicate", "overlap", "adjacent")}
+        print(f"{counts['duplicate']} duplicates, {counts['overlap']} overlaps, {counts['adjacent']} adjacent pairs. Saved to {args.output}")
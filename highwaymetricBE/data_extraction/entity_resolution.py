@@ -0,0 +1,307 @@
+import argparse
+import collections
+import hashlib
+import json
+import re
+import sys
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Check for required libraries
+try:
+    import numpy as np
+except ImportError as e:
+    print(f"Missing required library: {e}")
+    print("Please install them using: pip install numpy")
+    sys.exit(1)
+
+# Constants
+JSON_FILE = "data_extraction/projects_metadata.json"
+REGISTRY_FILE = "data_extraction/contractors.json"
+CONTRACTOR_FIELDS = ["concessionaire", "dpr_name"] # Tried in order, like import_data.build_payload
+SHINGLE_SIZE = 3
+NUM_PERM = 96
+LSH_BANDS = 16 # 16 bands of 6 rows: pairs above ~0.75 Jaccard collide in some band with high probability
+MATCH_THRESHOLD = 0.6 # Jaccard similarity of the shingle sets a candidate pair must reach
+MIN_TYPO_LENGTH = 5 # Shorter words differing by a letter are different words ("Sai", "Sri")
+MINHASH_PRIME = (1 << 31) - 1
+MINHASH_BATCH = 4096 # Names hashed per numpy pass; bounds the (permutations x shingles) matrix
+# Spellings of the same word, reduced to one form before comparing names
+TOKEN_FORMS = {
+    "private": "pvt", "pvt": "pvt", "limited": "ltd", "ltd": "ltd", "company": "co", "co": "co",
+    "corporation": "corp", "corp": "corp", "incorporated": "inc", "and": "&",
+    "constructions": "construction", "infrastructures": "infrastructure", "projects": "project",
+    "engineers": "engineer", "industries": "industry", "enterprises": "enterprise", "developers": "developer"
+}
+# Company-form words; a name's blocking key is what is left without them
+LEGAL_TOKENS = {"pvt", "ltd", "co", "corp", "inc", "llp", "plc"}
+PREFIX_PATTERN = re.compile(r'^\s*(?:m\s*/\s*s\.?|messrs\.?)\s+', re.IGNORECASE)
+INITIALISM_PATTERN = re.compile(r'(?<![a-z])((?:[a-z]\.){2,})') # "l.l.p." -> "llp"
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """
+    Case-, punctuation- and company-form-insensitive form of a firm name, e.g.
+    "M/s. Jaabilli Constructions Private Limited." -> "jaabilli construction pvt ltd".
+    """
+    text = PREFIX_PATTERN.sub("", name or "").lower().replace("&", " & ")
+    text = INITIALISM_PATTERN.sub(lambda m: m.group(1).replace(".", "") + " ", text)
+    tokens = re.sub(r'[^a-z0-9&]+', ' ', text).split()
+    return " ".join(TOKEN_FORMS.get(t, t) for t in tokens if t != "the")
+
+def blocking_key(normalized: str) -> str:
+    """
+    The normalized name without company-form words, so "x pvt ltd", "x ltd" and "x" share a key.
+    """
+    tokens = [t for t in normalized.split() if t not in LEGAL_TOKENS]
+    return " ".join(tokens) or normalized
+
+def shingles(key: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    padded = f" {key} "
+    return {padded[i:i + size] for i in range(max(1, len(padded) - size + 1))}
+
+def within_edits(a: str, b: str, k: int) -> bool:
+    """
+    Whether the Levenshtein distance between a and b is at most k, stopping as soon as it cannot be.
+    """
+    if abs(len(a) - len(b)) > k:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > k:
+            return False
+        previous = current
+    return previous[-1] <= k
+
+def is_typo_variant(key_a: str, key_b: str) -> bool:
+    """
+    Whether two blocking keys differ only by a typo in one long word: the same words
+    in the same order, except one that is a letter (two, for words of 8+) off.
+    """
+    tokens_a, tokens_b = key_a.split(), key_b.split()
+    if len(tokens_a) != len(tokens_b):
+        return False
+    diffs = [(x, y) for x, y in zip(tokens_a, tokens_b) if x != y]
+    if len(diffs) != 1:
+        return not diffs
+    x, y = diffs[0]
+    if min(len(x), len(y)) < MIN_TYPO_LENGTH or any(c.isdigit() for c in x + y):
+        return False
+    return within_edits(x, y, 1 if min(len(x), len(y)) < 8 else 2)
+
+def contractor_id(key: str) -> str:
+    """
+    ID of a new entity, from the blocking key of its most frequent spelling. Once in the
+    registry an ID is reused as is, whatever spellings later join the entity.
+    """
+    return "CTR-" + hashlib.sha1(key.encode('utf-8')).hexdigest()[:10]
+
+def load_registry(path: str) -> List[Dict]:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+class DisjointSet:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+class ContractorResolver:
+    """
+    Clusters spellings of the same firm.
+
+    Names are normalized and grouped by blocking key, which merges spellings that differ
+    only in case, punctuation or company form. The distinct keys are then MinHashed over
+    their character shingles and banded (LSH), so only keys that collide in a band are ever
+    compared. A pair is merged when its shingle Jaccard similarity reaches the threshold and
+    the keys differ only by a typo in one long word ("Constructons"), not by a different
+    word: "Sri Balaji Constructions" is not "Sri Balaji Infrastructure", and "Package 3" is
+    not "Package 4". Work is near-linear in the number of names.
+    """
+
+    def __init__(self, threshold: float = MATCH_THRESHOLD, num_perm: int = NUM_PERM, bands: int = LSH_BANDS, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, MINHASH_PRIME, size=num_perm, dtype=np.int64)
+        self.b = rng.integers(0, MINHASH_PRIME, size=num_perm, dtype=np.int64)
+        self.stats: Dict[str, int] = {}
+
+    def signatures(self, shingle_sets: List[Set[str]]) -> np.ndarray:
+        """
+        MinHash signature (num_perm values) of each shingle set, computed a batch of sets at a time.
+        """
+        signatures = np.empty((len(shingle_sets), len(self.a)), dtype=np.int64)
+        for start in range(0, len(shingle_sets), MINHASH_BATCH):
+            batch = shingle_sets[start:start + MINHASH_BATCH]
+            hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for shingle_set in batch for s in shingle_set), dtype=np.int64)
+            offsets = np.cumsum([0] + [len(s) for s in batch[:-1]])
+            values = (self.a[:, None] * (hashes[None, :] & MINHASH_PRIME) + self.b[:, None]) % MINHASH_PRIME
+            signatures[start:start + len(batch)] = np.minimum.reduceat(values, offsets, axis=1).T
+        return signatures
+
+    def candidate_pairs(self, signatures: np.ndarray) -> Set[Tuple[int, int]]:
+        """
+        Pairs of rows whose signatures agree on every row of at least one band.
+        """
+        pairs = set()
+        for band in np.split(signatures, self.bands, axis=1):
+            # Rows as opaque byte strings, so equal band values sort next to each other
+            rows = np.ascontiguousarray(band).view(np.dtype((np.void, band.shape[1] * band.itemsize))).ravel()
+            order = np.argsort(rows, kind='stable')
+            starts = np.flatnonzero(np.r_[True, rows[order][1:] != rows[order][:-1]])
+            sizes = np.diff(np.r_[starts, len(order)])
+            for start in starts[sizes > 1]:
+                end = start + 1
+                while end < len(order) and rows[order[end]] == rows[order[start]]:
+                    end += 1
+                members = order[start:end].tolist()
+                for x in range(len(members)):
+                    for y in range(x + 1, len(members)):
+                        pairs.add((members[x], members[y]) if members[x] < members[y] else (members[y], members[x]))
+        return pairs
+
+    def resolve(self, names: Iterable[Optional[str]], registry: Iterable[Dict] = ()) -> Dict[str, Dict]:
+        """
+        Maps every distinct raw name to its entity {"id", "name", "aliases", "keys", "count"}.
+
+        An entity keeps the ID and name that `registry` (the entities of an earlier run) gave
+        most of its projects' spellings, so neither changes when new spellings join; only
+        entities with no registered spelling get a new ID, named by their most frequent spelling.
+        """
+        registered: Dict[str, str] = {} # Blocking key -> registered ID
+        registered_names: Dict[str, str] = {}
+        for entity in registry:
+            registered_names.setdefault(entity["id"], entity["name"])
+            for key in entity.get("keys") or [blocking_key(normalize_name(raw)) for raw in entity["aliases"]]:
+                registered.setdefault(key, entity["id"])
+
+        counts = collections.Counter(n.strip() for n in names if n and n.strip())
+        by_key: Dict[str, List[str]] = {}
+        for raw in counts:
+            by_key.setdefault(blocking_key(normalize_name(raw)), []).append(raw)
+        keys = sorted(by_key)
+
+        shingle_sets = [shingles(k) for k in keys]
+        pairs = self.candidate_pairs(self.signatures(shingle_sets)) if keys else set()
+        groups = DisjointSet(len(keys))
+        merged = 0
+        for i, j in pairs:
+            a, b = shingle_sets[i], shingle_sets[j]
+            if len(a & b) / len(a | b) >= self.threshold and is_typo_variant(keys[i], keys[j]):
+                groups.union(i, j)
+                merged += 1
+
+        clusters: Dict[int, List[int]] = {}
+        for i in range(len(keys)):
+            clusters.setdefault(groups.find(i), []).append(i)
+        weights = [sum(counts[raw] for raw in by_key[key]) for key in keys]
+        entities: Dict[str, Dict] = {}
+        claimed: Set[str] = set()
+        # Largest entities first, so when an entity has split the bigger part keeps its ID
+        for members in sorted(clusters.values(), key=lambda m: (-sum(weights[i] for i in m), m[0])):
+            votes = collections.Counter()
+            for i in members:
+                if keys[i] in registered and registered[keys[i]] not in claimed:
+                    votes[registered[keys[i]]] += weights[i]
+            if votes:
+                entity_id = min(votes, key=lambda e: (-votes[e], e))
+            else:
+                entity_id = contractor_id(keys[min(members, key=lambda i: (-weights[i], keys[i]))])
+                if entity_id in claimed: # That key's old entity has split and kept its ID elsewhere
+                    entity_id = contractor_id("|".join(keys[i] for i in members))
+            claimed.add(entity_id)
+            aliases = sorted((raw for i in members for raw in by_key[keys[i]]), key=lambda raw: (-counts[raw], raw))
+            entity = {
+                "id": entity_id,
+                "name": registered_names[entity_id] if votes else aliases[0],
+                "aliases": aliases,
+                "keys": [keys[i] for i in members],
+                "count": sum(counts[raw] for raw in aliases)
+            }
+            for raw in aliases:
+                entities[raw] = entity
+
+        self.stats = {"names": len(counts), "keys": len(keys), "candidate_pairs": len(pairs), "merged_pairs": merged, "entities": len(clusters)}
+        return entities
+
+
+def contractor_of(project: Dict) -> Optional[str]:
+    for field in CONTRACTOR_FIELDS:
+        if project.get(field) and project[field].strip():
+            return project[field].strip()
+    return None
+
+def annotate_projects(projects: List[Dict], resolver: Optional[ContractorResolver] = None, registry: Iterable[Dict] = ()) -> List[Dict]:
+    """
+    Adds "contractor_id" and the canonical "contractor_name" to every project with a
+    contractor, and returns the registry of entities (id, name, aliases, blocking keys,
+    project count). IDs already in `registry` are kept, and its entities without projects
+    this time are carried over with a count of 0 so their IDs are not lost.
+    """
+    resolver = resolver or ContractorResolver()
+    previous = list(registry)
+    entities = resolver.resolve((contractor_of(p) for p in projects), previous)
+    for project in projects:
+        raw = contractor_of(project)
+        if raw:
+            project["contractor_id"] = entities[raw]["id"]
+            project["contractor_name"] = entities[raw]["name"]
+    current = {entity["id"]: entity for entity in entities.values()}
+    for entity in previous:
+        if entity["id"] not in current:
+            current[entity["id"]] = dict(entity, count=0)
+    return sorted(current.values(), key=lambda e: (-e["count"], e["name"]))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve contractor and concessionaire spellings to canonical contractor IDs.")
+    parser.add_argument("input", nargs="*", default=[JSON_FILE], help="Project JSON files (projects_metadata.json from each monthly report)")
+    parser.add_argument("--output", help="Where to write the annotated projects (default: rewrite each input in place)")
+    parser.add_argument("--registry", default=REGISTRY_FILE, help="Entities with their IDs and aliases; IDs already in it are kept")
+    parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD, help="Shingle Jaccard similarity needed to merge two spellings")
+    args = parser.parse_args()
+
+    files = []
+    for file_path in args.input:
+        with open(file_path, 'r') as f:
+            files.append((file_path, json.load(f)))
+    all_projects = [p for _, projects in files for p in projects]
+
+    start = time.perf_counter()
+    resolver = ContractorResolver(threshold=args.threshold)
+    registry = annotate_projects(all_projects, resolver, load_registry(args.registry))
+    elapsed = time.perf_counter() - start
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(all_projects, f, indent=4)
+    else:
+        for file_path, projects in files:
+            with open(file_path, 'w') as f:
+                json.dump(projects, f, indent=4)
+    with open(args.registry, 'w') as f:
+        json.dump(registry, f, indent=4)
+
+    stats = resolver.stats
+    print(f"Resolved {stats['names']} spellings ({stats['keys']} blocking keys, {stats['candidate_pairs']} candidate pairs) "
+          f"to {stats['entities']} contractors in {elapsed:.2f}s. Registry saved to {args.registry}")
@@ -1,14 +1,33 @@
-import requests
+import argparse
+import collections
+import hashlib
+import itertools
 import json
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+from json_stream import CHUNK_SIZE, iter_nested_array
 
-def fetch_highway_data():
+# Constants
+NHAI_URL = "https://datalakeg.nhai.gov.in/nhai/mISC/OOM/Get_Adv_UPC_Wise_Alignments_WFS"
+RAW_OUTPUT_FILE = "data_extraction/nhai_projects_raw.json"
+SYNC_STATE_FILE = "data_extraction/nhai_sync_state.sqlite"
+CHANGES_FILE = "data_extraction/nhai_changes.ndjson"
+WRITE_BATCH = 1000
+# Fields tried in order to identify a project across runs; falls back to the content hash
+RECORD_KEY_FIELDS = ["UPC", "Prj_Code", "PKG_Code", "id"]
+
+def build_payload(st_code: str = "0", st_name: str = "ALL") -> Dict:
     """
-    Fetches highway project data from the NHAI API.
+    The WFS query body. St_Code "0" / St_Name "ALL" is the catch-all query.
     """
-    url = "https://datalakeg.nhai.gov.in/nhai/mISC/OOM/Get_Adv_UPC_Wise_Alignments_WFS"
-    payload = {
-        "St_Code": "0",
-        "St_Name": "ALL",
+    return {
+        "St_Code": st_code,
+        "St_Name": st_name,
         "D_Code": "0",
         "D_Name": "ALL",
         "PIA_Code": "0",
@@ -24,38 +43,267 @@ def fetch_highway_data():
         "Consult_Code": "0",
         "Consult_Name": "ALL"
     }
-    headers = {
-        'Content-Type': 'application/json'
-    }
-    
+
+def stream_highway_data(url: str = NHAI_URL, session: Optional[requests.Session] = None, st_code: str = "0", st_name: str = "ALL") -> Iterator[Dict]:
+    """
+    Yields the projects of a query one at a time as the response arrives. The body is read
+    in chunks and the JSON string in its 'd' key is unescaped and decoded incrementally, so
+    memory stays flat however many projects the query returns.
+    """
+    session = session or requests.Session()
+    with session.post(url, headers={'Content-Type': 'application/json'}, json=build_payload(st_code, st_name), verify=False, stream=True) as response:
+        response.raise_for_status()
+        yield from iter_nested_array(response.iter_content(CHUNK_SIZE), "d", url)
+
+def write_records(records: Iterator[Dict], file_path: str, ndjson: bool = False) -> int:
+    """
+    Writes records as they arrive, as NDJSON or as the indented JSON array json.dump(indent=4)
+    produces, and returns how many were written. The indented form is encoded a batch at a
+    time, since setting up the pure-Python indenting encoder costs more than a small record.
+    """
+    count = 0
+    with open(file_path, 'w') as f:
+        if ndjson:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+                count += 1
+            return count
+        f.write("[")
+        for batch in iter(lambda: list(itertools.islice(records, WRITE_BATCH)), []):
+            # json.dumps(batch, indent=4) is "[\n" + the indented records + "\n]"
+            f.write(("," if count else "") + "\n" + json.dumps(batch, indent=4)[2:-2])
+            count += len(batch)
+        f.write("\n]" if count else "]")
+    return count
+
+def fetch_highway_data(url: str = NHAI_URL, output_file: str = RAW_OUTPUT_FILE, ndjson: bool = False) -> Optional[int]:
+    """
+    Fetches highway project data from the NHAI API, streaming it to `output_file`.
+    Returns the number of projects saved, or None if the fetch failed (the previous
+    file is then left in place).
+    """
+    tmp_file = output_file + ".tmp"
     try:
-        response = requests.post(url, headers=headers, json=payload, verify=False) # Using verify=False to bypass SSL issues if any
-        response.raise_for_status()  # Raises an HTTPError for bad responses (4xx or 5xx)
-        
-        try:
-            data = response.json()
-        except json.JSONDecodeError:
-            print("Failed to decode JSON. Response content:")
-            print(response.text)
-            return None
-
-        # The actual data is a JSON string within the 'd' key
-        if 'd' in data:
-            project_data = json.loads(data['d'])
-            
-            # Save the raw data to a file
-            with open('data_extraction/nhai_projects_raw.json', 'w') as f:
-                json.dump(project_data, f, indent=4)
-            print(f"Successfully fetched and saved {len(project_data)} projects to nhai_projects_raw.json")
-            
-            return project_data
-        else:
-            print("Error: 'd' key not found in the response.")
-            return None
-
-    except requests.exceptions.RequestException as e:
+        count = write_records(stream_highway_data(url), tmp_file, ndjson)
+    except (requests.exceptions.RequestException, ValueError) as e:
         print(f"An error occurred: {e}")
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
         return None
+    os.replace(tmp_file, output_file)
+    print(f"Successfully fetched and saved {count} projects to {output_file}")
+    return count
+
+def record_hash(record: Dict) -> str:
+    """
+    Content fingerprint of a project record, independent of key order.
+    """
+    body = json.dumps(record, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+def record_key(record: Dict, fingerprint: str) -> str:
+    for field in RECORD_KEY_FIELDS:
+        if record.get(field) not in (None, ""):
+            return f"{field}:{record[field]}"
+    return f"hash:{fingerprint}"
+
+
+class SyncState:
+    """
+    Local SQLite store of the last seen fingerprint of every project, per state partition,
+    plus the validators (ETag / Last-Modified) of the last response for each partition.
+
+    Records are keyed by (partition, key): partitions are diffed one at a time, so a
+    project that moves between states is a delete in one and an insert in the other,
+    and neither may touch the other's row.
+    """
+
+    def __init__(self, path: str = SYNC_STATE_FILE):
+        self.conn = sqlite3.connect(path)
+        self._migrate()
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS records (
+                partition TEXT NOT NULL,
+                key TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                PRIMARY KEY (partition, key)
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS partitions (
+                partition TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                synced_at REAL
+            )
+        """)
+        self.conn.commit()
+
+    def _migrate(self):
+        """
+        Moves a state file from before records were keyed per partition to the current schema.
+        """
+        columns = {row[1]: row[5] for row in self.conn.execute("PRAGMA table_info(records)")}
+        if columns and not columns.get("partition"):
+            with self.conn:
+                self.conn.execute("DROP INDEX IF EXISTS records_partition")
+                self.conn.execute("ALTER TABLE records RENAME TO records_old")
+                self.conn.execute("""
+                    CREATE TABLE records (
+                        partition TEXT NOT NULL,
+                        key TEXT NOT NULL,
+                        hash TEXT NOT NULL,
+                        PRIMARY KEY (partition, key)
+                    )
+                """)
+                self.conn.execute("INSERT INTO records (partition, key, hash) SELECT partition, key, hash FROM records_old")
+                self.conn.execute("DROP TABLE records_old")
+
+    def validators(self, partition: str) -> Tuple[Optional[str], Optional[str]]:
+        row = self.conn.execute("SELECT etag, last_modified FROM partitions WHERE partition = ?", (partition,)).fetchone()
+        return row if row else (None, None)
+
+    def hashes(self, partition: str) -> Dict[str, str]:
+        return dict(self.conn.execute("SELECT key, hash FROM records WHERE partition = ?", (partition,)))
+
+    def apply(self, partition: str, changes: List[Dict], etag: Optional[str], last_modified: Optional[str]):
+        """
+        Records a partition's changes and validators in one transaction.
+        """
+        with self.conn:
+            for change in changes:
+                if change['op'] == 'delete':
+                    self.conn.execute("DELETE FROM records WHERE partition = ? AND key = ?", (partition, change['key']))
+                else:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO records (partition, key, hash) VALUES (?, ?, ?)",
+                        (partition, change['key'], change['hash'])
+                    )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO partitions (partition, etag, last_modified, synced_at) VALUES (?, ?, ?, ?)",
+                (partition, etag, last_modified, time.time())
+            )
+
+    def close(self):
+        self.conn.close()
+
+
+def diff_records(records: Iterable[Dict], previous: Dict[str, str]) -> Iterator[Dict]:
+    """
+    Compares fetched records with the stored fingerprints and yields insert/update/delete changes
+    as the records arrive; only the keys seen so far are kept, for the deletes at the end.
+    """
+    seen = set()
+    for record in records:
+        fingerprint = record_hash(record)
+        key = record_key(record, fingerprint)
+        if key in seen:
+            continue
+        seen.add(key)
+        old = previous.get(key)
+        if old is None:
+            yield {"op": "insert", "key": key, "hash": fingerprint, "record": record}
+        elif old != fingerprint:
+            yield {"op": "update", "key": key, "hash": fingerprint, "record": record}
+    for key in previous.keys() - seen:
+        yield {"op": "delete", "key": key}
+
+def fetch_partition(session: requests.Session, url: str, st_code: str, st_name: str, etag: Optional[str], last_modified: Optional[str]) -> Tuple[Optional[Iterator[Dict]], Optional[str], Optional[str]]:
+    """
+    Fetches one state's projects, sending the stored validators as a conditional request.
+    Returns (records, etag, last_modified); records is None when the server answered 304 Not Modified,
+    and otherwise an iterator that decodes the projects as the body arrives and closes the response
+    once read.
+    """
+    headers = {'Content-Type': 'application/json'}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+
+    response = session.post(url, headers=headers, json=build_payload(st_code, st_name), verify=False, stream=True)
+    if response.status_code == 304:
+        response.close()
+        return None, etag, last_modified
+    if not response.ok:
+        response.close()
+        response.raise_for_status()
+
+    def records() -> Iterator[Dict]:
+        with response:
+            yield from iter_nested_array(response.iter_content(CHUNK_SIZE), "d", url)
+
+    return records(), response.headers.get('ETag'), response.headers.get('Last-Modified')
+
+def parse_partitions(states: Optional[List[str]]) -> List[Tuple[str, str]]:
+    """
+    Turns ["28", "36:Telangana"] into [(St_Code, St_Name), ...]; no states means the single "ALL" partition.
+    """
+    if not states:
+        return [("0", "ALL")]
+    partitions = []
+    for state in states:
+        code, _, name = state.partition(":")
+        partitions.append((code, name or "ALL"))
+    return partitions
+
+def sync_highway_data(url: str = NHAI_URL, states: Optional[List[str]] = None, state_file: str = SYNC_STATE_FILE, changes_file: str = CHANGES_FILE) -> Dict[str, int]:
+    """
+    Incremental sync: fetches each state partition, compares record fingerprints with the
+    local state store, and appends only inserts, updates and deletes to `changes_file` (NDJSON).
+
+    Changes are written as the records stream in; if a partition's fetch fails part way, what
+    was written for it is cut off again and its state is left as it was.
+    """
+    state = SyncState(state_file)
+    session = requests.Session()
+    totals = {"insert": 0, "update": 0, "delete": 0, "unchanged_partitions": 0}
+
+    with open(changes_file, 'a') as out:
+        for st_code, st_name in parse_partitions(states):
+            partition = st_code
+            etag, last_modified = state.validators(partition)
+            previous = state.hashes(partition)
+            start = out.tell()
+            changes = [] # Without the records: keys and hashes only
+            try:
+                records, etag, last_modified = fetch_partition(session, url, st_code, st_name, etag, last_modified)
+                if records is None:
+                    totals["unchanged_partitions"] += 1
+                    print(f"Partition St_Code={st_code}: not modified.")
+                    continue
+                for change in diff_records(records, previous):
+                    out.write(json.dumps({"op": change['op'], "key": change['key'], "partition": partition, "record": change.get('record')}) + "\n")
+                    changes.append({"op": change['op'], "key": change['key'], "hash": change.get('hash')})
+            except (requests.exceptions.RequestException, ValueError) as e:
+                out.truncate(start)
+                print(f"Partition St_Code={st_code}: fetch failed: {e}")
+                continue
+
+            out.flush()
+            state.apply(partition, changes, etag, last_modified)
+            ops = collections.Counter(change['op'] for change in changes)
+            for op in ("insert", "update", "delete"):
+                totals[op] += ops[op]
+            print(f"Partition St_Code={st_code}: {len(previous) + ops['insert'] - ops['delete']} records, {len(changes)} changes.")
+
+    state.close()
+    print(f"Sync complete: {totals['insert']} inserts, {totals['update']} updates, {totals['delete']} deletes "
+          f"({totals['unchanged_partitions']} partitions not modified). Changes appended to {changes_file}")
+    return totals
 
 if __name__ == "__main__":
-    fetch_highway_data()
+    parser = argparse.ArgumentParser(description="Fetch NHAI project alignments.")
+    parser.add_argument("--url", default=NHAI_URL)
+    parser.add_argument("--incremental", action="store_true", help="Emit only changes since the last run instead of rewriting the raw file")
+    parser.add_argument("--states", nargs="*", help="St_Code partitions to sync, optionally as CODE:NAME (default: the single ALL query)")
+    parser.add_argument("--state-file", default=SYNC_STATE_FILE)
+    parser.add_argument("--changes-file", default=CHANGES_FILE)
+    parser.add_argument("--output", default=RAW_OUTPUT_FILE, help="Where a full fetch saves the projects")
+    parser.add_argument("--ndjson", action="store_true", help="Save a full fetch as one JSON project per line")
+    args = parser.parse_args()
+
+    if args.incremental:
+        sync_highway_data(args.url, args.states, args.state_file, args.changes_file)
+    else:
+        fetch_highway_data(args.url, args.output, args.ndjson)
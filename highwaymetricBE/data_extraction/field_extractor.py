@@ -0,0 +1,146 @@
+import re
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Constants
+STATES = ["Andhra Pradesh", "Bihar", "Gujarat", "Haryana", "Himachal Pradesh", "Jharkhand", "Karnataka",
+          "Kerala", "Madhya Pradesh", "Maharashtra", "Meghalaya", "Odisha", "Punjab", "Rajasthan",
+          "Tamil Nadu", "Telangana", "Uttar Pradesh", "Uttarakhand", "West Bengal"]
+
+# Regex patterns, compiled once per process
+NH_PATTERN = re.compile(r'NH[-\s]?(\d+[A-Z]?)', re.IGNORECASE)
+FROM_TO_PATTERN = re.compile(r'from\s+([A-Z][a-zA-Z\s]+?)\s+to\s+([A-Z][a-zA-Z\s]+)')
+DASH_SECTION_PATTERN = re.compile(r'([A-Z][a-zA-Z\s]+)\s?-\s?([A-Z][a-zA-Z\s]+)\s+section')
+LENGTH_PATTERN = re.compile(r'(\d+\.?\d*)\s*km', re.IGNORECASE)
+CHAINAGE_RANGE_PATTERN = re.compile(r'from\s+(?:design\s+)?km\.?\s*([\d\+\.]+)\s+to\s+(?:km\.?\s*)?([\d\+\.]+)', re.IGNORECASE)
+CHAINAGE_POINT_PATTERN = re.compile(r'at\s+(?:design\s+)?km\.?\s*([\d\+\.]+)', re.IGNORECASE)
+
+
+def _trie_pattern(node: Dict) -> str:
+    """
+    Renders a character trie as a regex with shared prefixes factored out.
+    """
+    alternatives = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not alternatives:
+        return ''
+    pattern = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+    if '' in node:
+        pattern = '(?:' + pattern + ')?'
+    return pattern
+
+
+class Gazetteer:
+    """
+    Matches any of a set of terms (states, districts, contractors...) in one scan of the text.
+
+    The terms are compiled into a single prefix-factored alternation, so the cost
+    of a search stays flat as the term list grows instead of scanning the text
+    once per term.
+    """
+
+    def __init__(self, terms: Iterable[str], ignore_case: bool = False):
+        self.ignore_case = ignore_case
+        self.canonical: Dict[str, str] = {}
+        trie: Dict = {}
+        for term in terms:
+            key = term.lower() if ignore_case else term
+            if not key or key in self.canonical:
+                continue
+            self.canonical[key] = term
+            node = trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[''] = {}
+
+        # Terms may start or end with punctuation ("... Pvt. Ltd."), where \b would never match,
+        # so the guards only require no word character next to the term. For case-sensitive
+        # terms a leading lookbehind would disable re's first-character skip, so the start
+        # boundary is checked in iter_matches instead
+        flags = re.IGNORECASE if ignore_case else 0
+        prefix = r'(?<!\w)' if ignore_case else ''
+        self.pattern = re.compile(prefix + r'(?:' + _trie_pattern(trie) + r')(?!\w)', flags) if trie else None
+
+    def iter_matches(self, text: str) -> Iterator[str]:
+        """
+        Yields the canonical spelling of each whole-word term occurrence, left to right.
+        """
+        if self.pattern is None:
+            return
+        pos = 0
+        while True:
+            match = self.pattern.search(text, pos)
+            if not match:
+                return
+            start = match.start()
+            if start and (text[start - 1].isalnum() or text[start - 1] == '_'):
+                pos = start + 1
+                continue
+            found = match.group(0)
+            yield self.canonical[found.lower() if self.ignore_case else found]
+            pos = match.end()
+
+    def find_first(self, text: str) -> Optional[str]:
+        """
+        Returns the first term that occurs in the text, in its canonical spelling.
+        """
+        return next(self.iter_matches(text), None)
+
+    def find_all(self, text: str) -> List[str]:
+        """
+        Returns every distinct term found in the text, in order of appearance.
+        """
+        found = []
+        for term in self.iter_matches(text):
+            if term not in found:
+                found.append(term)
+        return found
+
+
+class FieldExtractor:
+    """
+    Pulls NH number, state, from/to, length and chainage out of a project's raw text.
+
+    Patterns are compiled once at import time and gazetteers once per extractor,
+    so per-record work is only the searches themselves.
+    """
+
+    def __init__(self, states: Iterable[str] = STATES, districts: Iterable[str] = (), contractors: Iterable[str] = ()):
+        self.states = Gazetteer(states)
+        self.districts = Gazetteer(districts)
+        self.contractors = Gazetteer(contractors, ignore_case=True)
+
+    def extract(self, text: str) -> Dict:
+        nh_match = NH_PATTERN.search(text)
+
+        start_loc = None
+        end_loc = None
+        from_to_match = FROM_TO_PATTERN.search(text) if 'from' in text else None
+        # The dash pattern backtracks heavily, so only run it when it can possibly match
+        if not from_to_match and 'section' in text and '-' in text:
+            from_to_match = DASH_SECTION_PATTERN.search(text)
+        if from_to_match:
+            start_loc = from_to_match.group(1).strip()
+            end_loc = from_to_match.group(2).strip()
+
+        length_match = LENGTH_PATTERN.search(text)
+
+        start_chainage = None
+        end_chainage = None
+        chainage_match = CHAINAGE_RANGE_PATTERN.search(text)
+        if chainage_match:
+            start_chainage, end_chainage = chainage_match.group(1), chainage_match.group(2)
+        else:
+            at_km_match = CHAINAGE_POINT_PATTERN.search(text)
+            if at_km_match:
+                start_chainage = end_chainage = at_km_match.group(1)
+
+        return {
+            "nh_number": nh_match.group(1) if nh_match else None,
+            "state": self.states.find_first(text),
+            "district": self.districts.find_first(text),
+            "contractor": self.contractors.find_first(text),
+            "start_location": start_loc,
+            "end_location": end_loc,
+            "total_length": length_match.group(1) if length_match else None,
+            "start_chainage": start_chainage,
+            "end_chainage": end_chainage
+        }
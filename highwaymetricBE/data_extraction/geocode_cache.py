@@ -0,0 +1,256 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from metrics import METRICS
+
+# Constants
+GEOCODE_CACHE_FILE = "geocode_cache.sqlite"
+USER_AGENT = "highway_metric_explorer"
+DEFAULT_TTL_SECONDS = 90 * 24 * 3600
+NEGATIVE_TTL_SECONDS = 7 * 24 * 3600
+MIN_DELAY_SECONDS = 1.0 # Nominatim usage policy: at most 1 request per second
+
+Coords = Tuple[float, float]
+PlaceKey = Tuple[str, str]
+
+
+class GeocodingError(Exception):
+    """
+    A geocoding request that failed (timeout, connection error, server error), as opposed
+    to one that succeeded and found nothing. Failures are never cached.
+    """
+
+def normalize_place(place_name: Optional[str], state: Optional[str] = None) -> PlaceKey:
+    """
+    Normalizes a place name and state into a cache key, e.g. (" Kadapa ", "Andhra Pradesh") -> ("kadapa", "andhra pradesh").
+    """
+    def norm(value):
+        value = re.sub(r'[^\w\s]', ' ', (value or "").lower())
+        return re.sub(r'\s+', ' ', value).strip()
+
+    state_key = norm(state)
+    if state_key == "unknown":
+        state_key = ""
+    return (norm(place_name), state_key)
+
+
+class GeocodeCache:
+    """
+    Persistent SQLite cache of geocoding results.
+
+    Misses are stored too (as negative entries with a shorter TTL) so places
+    Nominatim cannot resolve are not retried on every run.
+    """
+
+    def __init__(self, path: str = GEOCODE_CACHE_FILE, ttl_seconds: int = DEFAULT_TTL_SECONDS, negative_ttl_seconds: int = NEGATIVE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocodes (
+                place TEXT NOT NULL,
+                state TEXT NOT NULL,
+                lat REAL,
+                lon REAL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (place, state)
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, key: PlaceKey) -> Tuple[bool, Optional[Coords]]:
+        """
+        Returns (hit, coords). coords is None for a cached negative result.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT lat, lon, fetched_at FROM geocodes WHERE place = ? AND state = ?", key
+            ).fetchone()
+        if row is None:
+            return (False, None)
+
+        lat, lon, fetched_at = row
+        ttl = self.ttl_seconds if lat is not None else self.negative_ttl_seconds
+        if time.time() - fetched_at > ttl:
+            return (False, None)
+        return (True, (lat, lon) if lat is not None else None)
+
+    def put(self, key: PlaceKey, coords: Optional[Coords]):
+        lat, lon = coords if coords else (None, None)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO geocodes (place, state, lat, lon, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (key[0], key[1], lat, lon, time.time())
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class NominatimGeocoder:
+    """
+    Geocodes place names through Nominatim, reusing a single client.
+    """
+    remote = True # Each lookup is a rate-limited request
+
+    def __init__(self, user_agent: str = USER_AGENT, timeout: int = 10):
+        from geopy.geocoders import Nominatim
+        self.client = Nominatim(user_agent=user_agent)
+        self.timeout = timeout
+
+    def geocode(self, place_name: str, state: Optional[str] = None) -> Optional[Coords]:
+        """
+        Coordinates of a place, or None when Nominatim has no result. Raises GeocodingError when the request fails.
+        """
+        query = f"{place_name}, {state}, India" if state and state != "Unknown" else f"{place_name}, India"
+        try:
+            location = self.client.geocode(query, timeout=self.timeout)
+        except Exception as e:
+            raise GeocodingError(f"Geocoding error for {place_name}: {e}") from e
+        return (location.latitude, location.longitude) if location else None
+
+
+class StubGeocoder:
+    """
+    Offline geocoder backed by a lookup table, for tests and runs without network.
+
+    The table maps place names (optionally "place, state") to [lat, lon].
+    """
+    remote = False
+
+    def __init__(self, table: Optional[Dict[str, List[float]]] = None):
+        self.table: Dict[PlaceKey, Coords] = {}
+        for name, coords in (table or {}).items():
+            place, _, state = name.partition(",")
+            self.table[normalize_place(place, state)] = (coords[0], coords[1])
+
+    @classmethod
+    def from_file(cls, file_path: str) -> "StubGeocoder":
+        with open(file_path, 'r') as f:
+            return cls(json.load(f))
+
+    def geocode(self, place_name: str, state: Optional[str] = None) -> Optional[Coords]:
+        key = normalize_place(place_name, state)
+        return self.table.get(key) or self.table.get((key[0], ""))
+
+
+class RateLimiter:
+    """
+    Spaces out calls so that at most one starts every `min_interval` seconds.
+    """
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class BatchGeocoder:
+    """
+    Resolves place names through the cache first and the geocoder only for misses.
+    """
+
+    def __init__(self, geocoder, cache: Optional[GeocodeCache] = None, min_delay_seconds: float = MIN_DELAY_SECONDS, workers: int = 1):
+        self.geocoder = geocoder
+        self.cache = cache
+        self.workers = workers
+        self.rate_limiter = RateLimiter(min_delay_seconds)
+        self.results: Dict[PlaceKey, Optional[Coords]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, places: Iterable[Tuple[Optional[str], Optional[str]]]) -> Dict[PlaceKey, Optional[Coords]]:
+        """
+        Deduplicates (place, state) pairs and geocodes the ones not yet cached.
+
+        With more than one worker, misses are fetched on a thread pool so request
+        latency overlaps; the shared rate limiter still caps the request rate.
+        """
+        pending = {}
+        for place_name, state in places:
+            if not place_name:
+                continue
+            key = normalize_place(place_name, state)
+            if key in self.results or key in pending:
+                continue
+            if self.cache:
+                hit, coords = self.cache.get(key)
+                if hit:
+                    self.hits += 1
+                    METRICS.count("geocode.cache_hits")
+                    self.results[key] = coords
+                    continue
+            pending[key] = (place_name, state)
+
+        self.misses += len(pending)
+        METRICS.count("geocode.cache_misses", len(pending))
+        if self.workers > 1 and len(pending) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = {key: executor.submit(self.fetch, key, place_name, state) for key, (place_name, state) in pending.items()}
+                for key, future in futures.items():
+                    self.results[key] = future.result()
+        else:
+            for key, (place_name, state) in pending.items():
+                self.results[key] = self.fetch(key, place_name, state)
+
+        return self.results
+
+    def fetch(self, key: PlaceKey, place_name: str, state: Optional[str]) -> Optional[Coords]:
+        """
+        Geocodes a single cache miss under the rate limit and records the result. A failed
+        request gives None for this run only; it is not cached, so the next run retries it.
+        """
+        self.rate_limiter.wait()
+        start = time.perf_counter()
+        try:
+            coords = self.geocoder.geocode(place_name, state)
+        except GeocodingError as e:
+            print(e)
+            METRICS.count("geocode.errors")
+            return None
+        METRICS.observe("geocode.latency_ms", (time.perf_counter() - start) * 1000)
+        METRICS.count("geocode.resolved" if coords else "geocode.not_found")
+        if self.cache:
+            self.cache.put(key, coords)
+        return coords
+
+    def cached(self, place_name: Optional[str], state: Optional[str] = None) -> Tuple[bool, Optional[Coords]]:
+        """
+        (hit, coords) for a place from this run's results or the cache, without ever sending a
+        request; an expired cache entry is a miss. A missing place name is a hit on None, and
+        a local geocoder (no requests involved) is simply asked.
+        """
+        if not place_name:
+            return (True, None)
+        if not getattr(self.geocoder, "remote", True):
+            return (True, self.lookup(place_name, state))
+        key = normalize_place(place_name, state)
+        if key in self.results:
+            return (True, self.results[key])
+        return self.cache.get(key) if self.cache else (False, None)
+
+    def lookup(self, place_name: Optional[str], state: Optional[str] = None) -> Optional[Coords]:
+        """
+        Returns the coordinates for a place, resolving it on demand if it was not part of a batch.
+        """
+        if not place_name:
+            return None
+        key = normalize_place(place_name, state)
+        if key not in self.results:
+            self.resolve([(place_name, state)])
+        return self.results.get(key)
@@ -0,0 +1,107 @@
+import sys
+from typing import Tuple
+
+# Check for required libraries
+try:
+    import numpy as np
+except ImportError as e:
+    print(f"Missing required library: {e}")
+    print("Please install them using: pip install numpy")
+    sys.exit(1)
+
+# Constants
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = np.radians(1.0) * EARTH_RADIUS_KM
+
+# Polylines are held flat, the way HighwayStore keeps them: `coords` is every [lon, lat]
+# back to back and polyline i is coords[offsets[i]:offsets[i + 1]].
+
+
+def haversine_km(lon1, lat1, lon2, lat2) -> np.ndarray:
+    """
+    Great-circle distance in km between arrays of [lon, lat] points, element-wise.
+    """
+    lon1, lat1, lon2, lat2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lon1, lat1, lon2, lat2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def step_lengths_km(coords: np.ndarray) -> np.ndarray:
+    """
+    Haversine length of each step between consecutive vertices.
+    """
+    return haversine_km(coords[:-1, 0], coords[:-1, 1], coords[1:, 0], coords[1:, 1])
+
+def cumulative_km(coords: np.ndarray) -> np.ndarray:
+    """
+    Haversine distance in km from the first vertex to every vertex of a [lon, lat] polyline.
+    """
+    return np.concatenate([[0.0], np.cumsum(step_lengths_km(coords))])
+
+def polyline_lengths_km(coords: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    Haversine length of every polyline at once: one pass over all the steps, and the steps
+    that would bridge two polylines cancel out of the running sum.
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if len(coords) == 0:
+        return np.zeros(len(offsets) - 1)
+    cum = cumulative_km(np.asarray(coords, dtype=np.float64))
+    starts = np.minimum(offsets[:-1], len(cum) - 1)
+    ends = np.minimum(np.maximum(offsets[1:] - 1, offsets[:-1]), len(cum) - 1)
+    return np.where(offsets[1:] - offsets[:-1] >= 2, cum[ends] - cum[starts], 0.0)
+
+def _pair_segments(coords: np.ndarray, offsets: np.ndarray, polylines: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Expands (query k, polyline polylines[k]) pairs to one row per polyline segment.
+    Returns (pair index, segment start, segment end, first row of each pair).
+    """
+    first = offsets[polylines]
+    counts = offsets[polylines + 1] - first
+    nseg = np.maximum(counts - 1, 1)
+    pair_start = np.concatenate([[0], np.cumsum(nseg)[:-1]])
+    pair = np.repeat(np.arange(len(polylines)), nseg)
+    a_idx = np.repeat(first, nseg) + (np.arange(int(nseg.sum())) - np.repeat(pair_start, nseg))
+    b_idx = np.minimum(a_idx + 1, np.repeat(first + counts - 1, nseg)) # Single-vertex polylines are a point
+    return pair, coords[a_idx], coords[b_idx], pair_start
+
+def point_polyline_distance(points: np.ndarray, coords: np.ndarray, offsets: np.ndarray, polylines: np.ndarray, geodesic: bool = False) -> np.ndarray:
+    """
+    Distance from points[k] to polyline polylines[k], for every k in one call.
+
+    Planar distances are in coordinate units (degrees), like shapely.distance. With `geodesic`
+    they are km, measured in a local equirectangular frame around each point.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    polylines = np.asarray(polylines, dtype=np.int64)
+    if len(polylines) == 0:
+        return np.zeros(0)
+    pair, a, b, pair_start = _pair_segments(coords, np.asarray(offsets, dtype=np.int64), polylines)
+    p = points[pair]
+    ab = b - a
+    ap = p - a
+    if geodesic:
+        scale = np.stack([np.cos(np.radians(p[:, 1])), np.ones(len(p))], axis=1)
+        ab = ab * scale
+        ap = ap * scale
+    seg_len2 = np.einsum('ij,ij->i', ab, ab)
+    t = np.clip(np.einsum('ij,ij->i', ap, ab) / np.where(seg_len2 > 0, seg_len2, 1), 0, 1)
+    dist = np.hypot(*(ap - t[:, None] * ab).T)
+    dist = np.minimum.reduceat(dist, pair_start)
+    return dist * KM_PER_DEGREE if geodesic else dist
+
+def locate_on_polyline(coords: np.ndarray, cum_km: np.ndarray, lon: float, lat: float) -> Tuple[float, float]:
+    """
+    Returns (measure along the polyline in km, approximate offset from it in km) of a point.
+    """
+    a = coords[:-1]
+    b = coords[1:]
+    # Work in a local equirectangular frame so offsets are roughly isotropic
+    scale = np.array([np.cos(np.radians(lat)), 1.0])
+    ab = (b - a) * scale
+    ap = (np.array([lon, lat]) - a) * scale
+    seg_len2 = np.einsum('ij,ij->i', ab, ab)
+    t = np.clip(np.einsum('ij,ij->i', ap, ab) / np.where(seg_len2 > 0, seg_len2, 1), 0, 1)
+    offsets = np.hypot(*(ap - ab * t[:, None]).T)
+    i = int(np.argmin(offsets))
+    measure = cum_km[i] + t[i] * (cum_km[i + 1] - cum_km[i])
+    return float(measure), float(offsets[i] * KM_PER_DEGREE)
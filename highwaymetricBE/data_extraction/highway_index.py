@@ -0,0 +1,174 @@
+import sys
+from typing import List, Dict, Tuple, Optional, Union
+
+# Check for required libraries
+try:
+    import numpy as np
+    import shapely
+    from shapely.geometry import LineString, Point
+    from shapely.strtree import STRtree
+except ImportError as e:
+    print(f"Missing required library: {e}")
+    print("Please install them using: pip install shapely")
+    sys.exit(1)
+
+from highway_store import HighwayStore
+from metrics import METRICS
+from nh_refs import RefIndex, canonical_refs
+
+
+class HighwayIndex:
+    """
+    Lookup structures over the state highway segments, built once per run.
+
+    Refs are kept in an inverted index of canonical ref ID -> segment positions, and the
+    geometries of each ref group are held in their own STRtree so a project only
+    ever looks at nearby segments of its own highway.
+    """
+
+    def __init__(self, state_highways: Union[List[Dict], HighwayStore]):
+        self.segments: List[Dict] = []
+        self.lines: List[LineString] = []
+        self.ref_map = RefIndex()
+
+        if isinstance(state_highways, HighwayStore):
+            self._load_store(state_highways)
+        else:
+            for hw in state_highways:
+                geom = hw.get('geometry')
+                if not geom or geom.get('type') != 'LineString' or len(geom['coordinates']) < 2:
+                    continue
+                pos = len(self.segments)
+                self.segments.append(hw)
+                self.lines.append(LineString(geom['coordinates']))
+                self.ref_map.add(pos, hw.get('ref'))
+
+        self.trees: Dict[str, STRtree] = {
+            key: STRtree([self.lines[i] for i in positions])
+            for key, positions in self.ref_map.items()
+        }
+        self.ref_positions: Dict[str, np.ndarray] = {
+            key: np.asarray(positions, dtype=np.int64) for key, positions in self.ref_map.items()
+        }
+        self.line_array = np.asarray(self.lines, dtype=object)
+
+    def _load_store(self, store: HighwayStore):
+        """
+        Builds every LineString in one call from the store's flat coordinate array;
+        segment dicts are only materialized when a lookup returns one.
+        """
+        counts = np.diff(store.offsets)
+        rows = np.flatnonzero(counts >= 2)
+        points = np.repeat(counts >= 2, counts)
+        self.lines = list(shapely.linestrings(store.coords[points], indices=np.repeat(np.arange(len(rows)), counts[rows])))
+        self.segments = store.rows(rows)
+        for pos, row in enumerate(rows):
+            self.ref_map.add(pos, store.ref(int(row)))
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def segments_for_ref(self, nh_ref: str) -> List[Dict]:
+        """
+        Returns every segment whose ref matches the NH number.
+        """
+        return [self.segments[i] for i in self.ref_map.lookup(nh_ref)]
+
+    def find_best_segment(self, nh_ref: str, start_coords: Tuple[float, float], end_coords: Tuple[float, float]) -> Optional[Dict]:
+        """
+        Finds the segment of the given NH closest to the start and end coordinates.
+
+        Scores are the same as the linear scan (distance to start + distance to
+        end), but only segments within reach of the nearest neighbour are scored.
+        """
+        p1 = Point(start_coords[1], start_coords[0])
+        p2 = Point(end_coords[1], end_coords[0])
+
+        best_pos = None
+        min_score = float('inf')
+
+        for key in canonical_refs(nh_ref):
+            tree = self.trees.get(key)
+            if tree is None:
+                continue
+            positions = self.ref_map[key]
+
+            # Any segment beating the nearest neighbour of p1 must lie within its score of p1
+            nearest = int(tree.query_nearest(p1)[0])
+            bound = shapely.distance(tree.geometries[nearest], p1) + shapely.distance(tree.geometries[nearest], p2)
+            candidates = tree.query(p1, predicate='dwithin', distance=min(bound, min_score))
+            if len(candidates) == 0:
+                candidates = [nearest]
+
+            geoms = tree.geometries.take(candidates)
+            scores = shapely.distance(geoms, p1) + shapely.distance(geoms, p2)
+            METRICS.count("shapely.strtree_query", 2)
+            METRICS.count("shapely.distance", 2 * len(candidates) + 2)
+            for local, score in zip(candidates, scores):
+                if score < min_score:
+                    min_score = score
+                    best_pos = positions[int(local)]
+
+        if best_pos is None:
+            return None
+        return self.segments[best_pos]['geometry']
+
+    def _scores(self, positions: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        Distance to start + distance to end for each (segment, start, end) row, in degrees.
+        """
+        geoms = self.line_array[positions]
+        return shapely.distance(geoms, shapely.points(starts)) + shapely.distance(geoms, shapely.points(ends))
+
+    def find_best_segments(self, queries: List[Tuple[str, Tuple[float, float], Tuple[float, float]]]) -> List[Optional[Dict]]:
+        """
+        find_best_segment for many (nh_ref, start, end) queries at once: each ref's tree is
+        queried with all of its points in one call, and the candidates of every query are
+        scored together in one vectorized distance call.
+        """
+        starts = np.array([[s[1], s[0]] for _, s, _ in queries], dtype=np.float64).reshape(-1, 2)
+        ends = np.array([[e[1], e[0]] for _, _, e in queries], dtype=np.float64).reshape(-1, 2)
+
+        by_key: Dict[str, List[Tuple[int, int]]] = {}
+        for i, (nh_ref, _, _) in enumerate(queries):
+            for rank, key in enumerate(canonical_refs(nh_ref)):
+                if key in self.trees:
+                    by_key.setdefault(key, []).append((i, rank))
+        groups = [(key, np.asarray(members, dtype=np.int64)) for key, members in by_key.items()]
+
+        # Nearest neighbour of each start in each of its refs bounds how far a better segment can be
+        nearest_pos = []
+        for key, members in groups:
+            q, nearest = self.trees[key].query_nearest(shapely.points(starts[members[:, 0]]))
+            nearest_pos.append(nearest[np.unique(q, return_index=True)[1]])
+        flat_members = np.concatenate([members for _, members in groups]) if groups else np.zeros((0, 2), dtype=np.int64)
+        flat_nearest = np.concatenate([self.ref_positions[key][nearest] for (key, _), nearest in zip(groups, nearest_pos)]) if groups else np.zeros(0, dtype=np.int64)
+        bounds = self._scores(flat_nearest, starts[flat_members[:, 0]], ends[flat_members[:, 0]])
+
+        pair_query, pair_rank, pair_pos = [], [], []
+        offset = 0
+        for (key, members), nearest in zip(groups, nearest_pos):
+            bound = bounds[offset:offset + len(members)]
+            offset += len(members)
+            q, candidates = self.trees[key].query(shapely.points(starts[members[:, 0]]), predicate='dwithin', distance=bound)
+            missing = np.setdiff1d(np.arange(len(members)), q)
+            q = np.concatenate([q, missing])
+            candidates = np.concatenate([candidates, nearest[missing]])
+            pair_query.append(members[q, 0])
+            pair_rank.append(members[q, 1])
+            pair_pos.append(self.ref_positions[key][candidates])
+
+        best = [None] * len(queries)
+        if not groups:
+            return best
+        pair_query = np.concatenate(pair_query)
+        pair_rank = np.concatenate(pair_rank)
+        pair_pos = np.concatenate(pair_pos)
+        scores = self._scores(pair_pos, starts[pair_query], ends[pair_query])
+
+        # Lowest score per query; ties go to the earlier ref, then the earlier candidate, as in find_best_segment
+        order = np.lexsort((np.arange(len(scores)), pair_rank, scores, pair_query))
+        won, first = np.unique(pair_query[order], return_index=True)
+        for i, pos in zip(won, pair_pos[order[first]]):
+            best[int(i)] = self.segments[int(pos)]['geometry']
+        return best
@@ -0,0 +1,216 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Sequence
+
+# Check for required libraries
+try:
+    import numpy as np
+except ImportError as e:
+    print(f"Missing required library: {e}")
+    print("Please install them using: pip install numpy")
+    sys.exit(1)
+
+from geometry_kernel import polyline_lengths_km
+from json_stream import iter_json_array
+
+# Constants
+STORE_SUFFIX = ".store"
+STRING_COLUMNS = ["type", "ref", "name"]
+
+
+def store_path_for(json_path: str) -> str:
+    """
+    Where the columnar copy of a highway JSON file lives, e.g. state_highways.json -> state_highways.store.
+    """
+    return os.path.splitext(json_path)[0] + STORE_SUFFIX
+
+def is_store(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, "offsets.npy"))
+
+
+class StringColumn:
+    """
+    Variable-length strings as one UTF-8 byte array plus offsets. Missing values are stored as "".
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        value = bytes(self.data[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+        return value or None
+
+    @staticmethod
+    def save(path: str, name: str, values: List[Optional[str]]):
+        encoded = [(v if v is not None else "").encode('utf-8') for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(b) for b in encoded])
+        np.save(os.path.join(path, f"{name}_offsets.npy"), offsets)
+        np.save(os.path.join(path, f"{name}_bytes.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+    @classmethod
+    def load(cls, path: str, name: str, mmap_mode: Optional[str]) -> "StringColumn":
+        return cls(np.load(os.path.join(path, f"{name}_bytes.npy"), mmap_mode=mmap_mode),
+                   np.load(os.path.join(path, f"{name}_offsets.npy"), mmap_mode=mmap_mode))
+
+
+class HighwayStore:
+    """
+    Columnar copy of a highway segment file, opened with mmap.
+
+    coords.npy holds every [lon, lat] of every segment back to back (float64, N x 2), and
+    offsets.npy the start of each segment in it; ids, lengths, types, refs and names are
+    their own columns. Opening only maps the files, so it is near-instant, and processes
+    that open the same store share its pages.
+
+    Indexing and iteration give the same dicts as the JSON file, built on demand.
+    """
+
+    def __init__(self, path: str, mmap: bool = True):
+        self.path = path
+        mode = 'r' if mmap else None
+        self.coords = np.load(os.path.join(path, "coords.npy"), mmap_mode=mode)
+        self.offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode=mode)
+        self.ids = np.load(os.path.join(path, "ids.npy"), mmap_mode=mode)
+        self.length_km = np.load(os.path.join(path, "length_km.npy"), mmap_mode=mode)
+        self.strings = {name: StringColumn.load(path, name, mode) for name in STRING_COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __reduce__(self):
+        # Pool workers reopen the mapping instead of receiving a pickled copy of the arrays
+        return (HighwayStore, (self.path,))
+
+    def coords_of(self, i: int) -> np.ndarray:
+        return self.coords[self.offsets[i]:self.offsets[i + 1]]
+
+    def ref(self, i: int) -> Optional[str]:
+        return self.strings["ref"][i]
+
+    def __getitem__(self, i: int) -> Dict:
+        length = float(self.length_km[i])
+        return {
+            "id": int(self.ids[i]),
+            "type": self.strings["type"][i],
+            "ref": self.strings["ref"][i],
+            "name": self.strings["name"][i],
+            "geometry": {"type": "LineString", "coordinates": self.coords_of(i).tolist()},
+            "length_km": None if np.isnan(length) else length
+        }
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def rows(self, rows: Sequence[int]) -> "StoreRows":
+        return StoreRows(self, rows)
+
+
+class StoreRows:
+    """
+    A list-like view of selected store rows.
+    """
+
+    def __init__(self, store: HighwayStore, rows: Sequence[int]):
+        self.store = store
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, pos: int) -> Dict:
+        return self.store[int(self.rows[pos])]
+
+
+def convert(json_path: str, store_path: Optional[str] = None, recompute_lengths: bool = False) -> HighwayStore:
+    """
+    Writes the columnar store for a highway JSON file. The file is streamed twice (once to
+    size the arrays, once to fill them), so the conversion never holds it whole.
+    With `recompute_lengths`, length_km is recomputed from the geometry in one vectorized pass.
+    """
+    store_path = store_path or store_path_for(json_path)
+    os.makedirs(store_path, exist_ok=True)
+
+    num_segments = 0
+    num_points = 0
+    for record in iter_json_array(json_path):
+        num_segments += 1
+        num_points += len(((record.get('geometry') or {}).get('coordinates')) or [])
+
+    coords = np.lib.format.open_memmap(os.path.join(store_path, "coords.npy"), mode='w+', dtype=np.float64, shape=(num_points, 2))
+    offsets = np.zeros(num_segments + 1, dtype=np.int64)
+    ids = np.zeros(num_segments, dtype=np.int64)
+    length_km = np.full(num_segments, np.nan)
+    strings = {name: [] for name in STRING_COLUMNS}
+
+    pos = 0
+    for i, record in enumerate(iter_json_array(json_path)):
+        points = ((record.get('geometry') or {}).get('coordinates')) or []
+        if points:
+            coords[pos:pos + len(points)] = points
+        pos += len(points)
+        offsets[i + 1] = pos
+        ids[i] = record.get('id') or 0
+        if record.get('length_km') is not None:
+            length_km[i] = record['length_km']
+        for name in STRING_COLUMNS:
+            strings[name].append(record.get(name))
+    if recompute_lengths:
+        length_km = np.round(polyline_lengths_km(coords, offsets), 3)
+    coords.flush()
+    del coords
+
+    np.save(os.path.join(store_path, "offsets.npy"), offsets)
+    np.save(os.path.join(store_path, "ids.npy"), ids)
+    np.save(os.path.join(store_path, "length_km.npy"), length_km)
+    for name, values in strings.items():
+        StringColumn.save(store_path, name, values)
+    return HighwayStore(store_path)
+
+def find_store(path: str) -> Optional[str]:
+    """
+    The store to read for `path`: the path itself if it is a store, or the store next to a
+    JSON file when it exists and is not older than the JSON.
+    """
+    if is_store(path):
+        return path
+    store_path = store_path_for(path)
+    if is_store(store_path) and (not os.path.exists(path) or os.path.getmtime(os.path.join(store_path, "offsets.npy")) >= os.path.getmtime(path)):
+        return store_path
+    return None
+
+def open_highways(path: str):
+    """
+    The highway segments at `path` as a HighwayStore when one is available, else the parsed JSON list.
+    """
+    store_path = find_store(path)
+    if store_path:
+        return HighwayStore(store_path)
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def iter_highways(path: str) -> Iterator[Dict]:
+    """
+    Streams segment dicts from the store for `path` if there is one, else from the JSON file.
+    """
+    store_path = find_store(path)
+    return iter(HighwayStore(store_path)) if store_path else iter_json_array(path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert highway segment JSON to the columnar mmap store.")
+    parser.add_argument("input", nargs="+", help="Highway JSON files (e.g. state_highways.json)")
+    parser.add_argument("--recompute-lengths", action="store_true", help="Recompute length_km from the geometry")
+    args = parser.parse_args()
+
+    for json_path in args.input:
+        start = time.perf_counter()
+        store = convert(json_path, recompute_lengths=args.recompute_lengths)
+        print(f"Converted {len(store)} segments ({len(store.coords)} points) from {json_path} to {store.path} in {time.perf_counter() - start:.2f}s")
@@ -1,75 +1,265 @@
+import argparse
+import hashlib
 import json
-import requests
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from metrics import METRICS, PROFILE_MODES, profiled
+from nh_refs import canonical_refs
+
+# Constants
+API_URL = "http://localhost:8080/api/projects"
+JSON_FILE = "data_extraction/projects_metadata.json"
+STATE_FILE = "data_extraction/import_state.json"
+BATCH_SIZE = 200
+CONCURRENCY = 4
+MAX_RETRIES = 5
+BACKOFF_FACTOR = 0.5
+
+def build_session(pool_size: int = CONCURRENCY) -> requests.Session:
+    """
+    Creates a session whose connections are pooled and reused, with retry and
+    exponential backoff on connection errors and 429/5xx responses.
+    """
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["POST"]
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({'Content-Type': 'application/json'})
+    return session
+
+def build_payload(project: Dict) -> Dict:
+    """
+    Maps a snake_case project record to the JSON names ProjectDTO expects.
+    """
+    payload = {
+        "name": project.get("project_name"),
+        "highwayNo": canonical_refs(project.get("nh_number")), # "16", "NH-16" and "NH 16" all become "NH16"
+        "totalLength": float(project.get("total_length")) if project.get("total_length") else None,
+        "State": project.get("state"),
+        "status": project.get("status").upper().replace(" ", "_") if project.get("status") else None, # Enum matching
+        "Contractor": project.get("contractor_name") or project.get("concessionaire") or project.get("dpr_name"), # Canonical spelling when resolved
+    }
 
-def import_data():
+    # The API parses dates as dd/MM/yyyy, the format the source data already uses
+    loa_date_str = project.get("loa_date")
+    if loa_date_str:
+        payload["LOAdate"] = loa_date_str
+    start_date_str = project.get("appointed_date")
+    if start_date_str:
+        payload["StartDate"] = start_date_str
+
+    return payload
+
+def idempotency_key(payloads: List[Dict]) -> str:
+    """
+    Content hash of a payload (or batch of payloads); identical content always gets the same key.
     """
-    Reads the processed project data from the JSON file and sends it to the 
-    Spring Boot application's project endpoint one by one.
+    body = json.dumps(payloads, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+def timed_post(session: requests.Session, url: str, rows: int, **kwargs) -> requests.Response:
+    """
+    session.post, recording its latency (retries included), status code and row count.
     """
-    api_url = "http://localhost:8080/api/projects"
-    json_file = "data_extraction/projects_metadata.json"
+    start = time.perf_counter()
+    try:
+        response = session.post(url, **kwargs)
+    except requests.exceptions.RequestException:
+        METRICS.count("http.errors")
+        raise
+    finally:
+        METRICS.observe("http.latency_ms", (time.perf_counter() - start) * 1000)
+        METRICS.count("http.requests")
+    METRICS.count(f"http.status.{response.status_code}")
+    METRICS.count("http.rows_sent", rows)
+    return response
 
+def load_projects(json_file: str) -> Optional[List[Dict]]:
     try:
         with open(json_file, 'r') as f:
-            projects = json.load(f)
+            return json.load(f)
     except FileNotFoundError:
         print(f"Error: {json_file} not found.")
-        return
     except json.JSONDecodeError:
         print(f"Error: Could not decode JSON from {json_file}.")
+    return None
+
+def load_import_state(state_file: str) -> set:
+    try:
+        with open(state_file, 'r') as f:
+            return set(json.load(f))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return set()
+
+def save_import_state(state_file: str, keys: set):
+    with open(state_file, 'w') as f:
+        json.dump(sorted(keys), f)
+
+def resolve_contractors(projects: List[Dict]):
+    """
+    Replaces every spelling of a contractor with its entity's canonical name, so the
+    API's name-based dedupe sees one contractor per firm. The updated registry is saved
+    so the next import gives the same contractors the same IDs and names.
+    """
+    from entity_resolution import REGISTRY_FILE, ContractorResolver, annotate_projects, load_registry
+    resolver = ContractorResolver()
+    with METRICS.stage("resolve_contractors", items=len(projects)):
+        registry = annotate_projects(projects, resolver, load_registry(REGISTRY_FILE))
+    with open(REGISTRY_FILE, 'w') as f:
+        json.dump(registry, f, indent=4)
+    print(f"Resolved {resolver.stats['names']} contractor spellings to {resolver.stats['entities']} contractors.")
+
+def import_data(api_url: str = API_URL, json_file: str = JSON_FILE, resolve: bool = False):
+    """
+    Reads the processed project data from the JSON file and posts each project to the
+    Spring Boot application's project endpoint in its own request; bulk_import sends
+    batches instead. With `resolve`, contractors are sent under their canonical names.
+    """
+    with METRICS.stage("load"):
+        projects = load_projects(json_file)
+    if projects is None:
         return
+    if resolve:
+        resolve_contractors(projects)
 
     print(f"Found {len(projects)} projects to import.")
 
-    headers = {'Content-Type': 'application/json'}
-    
+    session = build_session(pool_size=1)
+    start = time.perf_counter()
     success_count = 0
     for project in projects:
+        with METRICS.stage("build_payloads", items=1):
+            payload = build_payload(project)
         try:
-            # Map Python keys to Java Entity keys if necessary.
-            # Based on extract_project_metadata.py, keys are snake_case (e.g. project_name)
-            # Based on Project.java, keys are camelCase (e.g. projectName)
-            # We need to convert snake_case to camelCase for the API to accept it automatically 
-            # OR ensure the API handles snake_case (usually requires @JsonProperty or config).
-            # Let's assume standard Spring Boot default which is camelCase.
-            
-            payload = {
-                "projectName": project.get("project_name"),
-                "nhNumber": project.get("nh_number"),
-                "totalLength": float(project.get("total_length")) if project.get("total_length") else None,
-                "state": project.get("state"),
-                "status": project.get("status").upper().replace(" ", "_") if project.get("status") else None, # Enum matching
-                "concessionaire": project.get("concessionaire") or project.get("dpr_name"),
-                # Date handling: API expects "yyyy-MM-dd" usually for LocalDate. 
-                # Source data has "dd/MM/yyyy".
-            }
-            
-            # Handle date conversion
-            loa_date_str = project.get("loa_date") or project.get("appointed_date")
-            if loa_date_str:
-                try:
-                    parts = loa_date_str.split('/')
-                    if len(parts) == 3:
-                        payload["loaDate"] = f"{parts[2]}-{parts[1]}-{parts[0]}"
-                except Exception:
-                     pass # Leave as None if parsing fails
-
-            response = requests.post(api_url, headers=headers, json=payload)
-            
+            with METRICS.stage("send", items=1):
+                response = timed_post(session, api_url, 1, json=payload)
+
             if response.status_code in [200, 201]:
                 success_count += 1
-                print(f"Imported: {payload['projectName']}")
+                print(f"Imported: {payload['name']}")
             else:
-                print(f"Failed to import {payload['projectName']}: {response.status_code} - {response.text}")
+                print(f"Failed to import {payload['name']}: {response.status_code} - {response.text}")
 
         except requests.exceptions.RequestException as e:
             print(f"An error occurred while sending data to the API: {e}")
-            
+
+    elapsed = time.perf_counter() - start
+    METRICS.gauge("rows.imported", success_count)
+    METRICS.gauge("rows.total", len(projects))
     print(f"Import process completed. {success_count}/{len(projects)} projects imported.")
+    print(f"Throughput: {len(projects) / elapsed:.1f} rows/s")
+
+def bulk_import(api_url: str = API_URL, json_file: str = JSON_FILE, batch_size: int = BATCH_SIZE, concurrency: int = CONCURRENCY, state_file: str = STATE_FILE, resolve: bool = False):
+    """
+    Posts projects in batches to the bulk endpoint over a pooled session, with at most
+    `concurrency` batches in flight.
+
+    Every project has a content-hash idempotency key. Keys of rows the server has
+    accepted are kept in `state_file`, so a re-run only sends new or changed rows,
+    and each batch carries an Idempotency-Key header so a retried batch is not applied twice.
+    """
+    with METRICS.stage("load"):
+        projects = load_projects(json_file)
+    if projects is None:
+        return
+    if resolve:
+        resolve_contractors(projects)
+
+    imported_keys = load_import_state(state_file)
+    pending = []
+    with METRICS.stage("build_payloads", items=len(projects)):
+        for project in projects:
+            payload = build_payload(project)
+            key = idempotency_key([payload])
+            if key not in imported_keys:
+                pending.append((key, payload))
+
+    print(f"Found {len(projects)} projects, {len(projects) - len(pending)} already imported, {len(pending)} to send.")
+    if not pending:
+        return
+
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+    session = build_session(pool_size=concurrency)
+    lock = threading.Lock()
+    totals = {"created": 0, "skipped": 0, "failed": 0}
+
+    def send(batch):
+        payloads = [payload for _, payload in batch]
+        response = timed_post(session, f"{api_url}/bulk", len(payloads), json=payloads, headers={"Idempotency-Key": idempotency_key(payloads)})
+        response.raise_for_status()
+        return batch, response.json()
+
+    start = time.perf_counter()
+    with METRICS.stage("send", items=len(pending)), ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(send, batch) for batch in batches]
+        for future in as_completed(futures):
+            try:
+                batch, result = future.result()
+            except requests.exceptions.RequestException as e:
+                print(f"Batch failed after retries: {e}")
+                continue
+            except ValueError as e:
+                # A success status with a body that is not JSON (a proxy page, a truncated response)
+                print(f"Batch response was not valid JSON: {e}")
+                continue
+            with lock:
+                totals["created"] += result.get("created", 0)
+                totals["skipped"] += result.get("skipped", 0)
+                totals["failed"] += len(result.get("errors", []))
+                for error in result.get("errors", []):
+                    print(f"Failed: {error}")
+                # Rows that errored are retried on the next run; the rest are done
+                if not result.get("errors"):
+                    imported_keys.update(key for key, _ in batch)
+
+    elapsed = time.perf_counter() - start
+    save_import_state(state_file, imported_keys)
+    METRICS.gauge("rows.created", totals["created"])
+    METRICS.gauge("rows.skipped", totals["skipped"])
+    METRICS.gauge("rows.failed", totals["failed"])
+    print(f"Bulk import completed in {elapsed:.2f}s: {totals['created']} created, {totals['skipped']} already present, {totals['failed']} failed.")
+    print(f"Throughput: {len(pending) / elapsed:.1f} rows/s")
 
 if __name__ == "__main__":
-    # Wait a few seconds for the Spring Boot app to be fully ready
-    print("Waiting for the application to start (5s)...")
-    time.sleep(5) 
-    import_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Import processed projects into the Highwaymetric API.")
+    parser.add_argument("--api-url", default=API_URL)
+    parser.add_argument("--input", default=JSON_FILE)
+    parser.add_argument("--bulk", action="store_true", help="Send batches to the bulk endpoint instead of one request per project")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Batches in flight at once")
+    parser.add_argument("--state-file", default=STATE_FILE, help="Keys of already imported rows (bulk mode)")
+    parser.add_argument("--resolve-contractors", action="store_true", help="Send each contractor under its canonical name (see entity_resolution.py)")
+    parser.add_argument("--no-wait", action="store_true", help="Skip the start-up delay")
+    parser.add_argument("--metrics-report", help="Write per-stage timings, counters and the HTTP latency histogram to this JSON file")
+    parser.add_argument("--profile", choices=PROFILE_MODES, help="Profile the import with cProfile or the low-overhead stack sampler")
+    parser.add_argument("--profile-output", help="Where to save the profile (default profile.prof / profile.folded)")
+    args = parser.parse_args()
+
+    if not args.no_wait:
+        # Wait a few seconds for the Spring Boot app to be fully ready
+        print("Waiting for the application to start (5s)...")
+        time.sleep(5)
+
+    with profiled(args.profile, args.profile_output):
+        if args.bulk:
+            bulk_import(args.api_url, args.input, args.batch_size, args.concurrency, args.state_file, args.resolve_contractors)
+        else:
+            import_data(args.api_url, args.input, args.resolve_contractors)
+
+    METRICS.print_summary()
+    if args.metrics_report:
+        METRICS.write_report(args.metrics_report)
+        print(f"Metrics report written to {args.metrics_report}")
@@ -0,0 +1,190 @@
+import codecs
+import json
+from json.decoder import scanstring
+from typing import Iterable, Iterator
+
+# Constants
+CHUNK_SIZE = 1 << 16
+VALUE_END = " \t\r\n,:]}" # What may follow a complete value; a number cut at "12" or "1." may go on
+
+
+def iter_json_array(file_path: str, chunk_size: int = CHUNK_SIZE) -> Iterator:
+    """
+    Yields the elements of a top-level JSON array one at a time, reading the file in
+    chunks, so a large input never has to be held in memory as a whole.
+    """
+    with open(file_path, 'r') as f:
+        yield from iter_array_chunks(iter(lambda: f.read(chunk_size), ""), file_path)
+
+def iter_array_chunks(chunks: Iterable[str], source: str = "input") -> Iterator:
+    """
+    Yields the elements of a JSON array whose text arrives as a sequence of string chunks.
+    Only the element being decoded (and the rest of its chunk) is ever buffered.
+    """
+    decoder = json.JSONDecoder()
+    chunks = iter(chunks)
+    buf = ""
+    pos = 0
+    eof = False
+    started = False
+    while True:
+        # Skip whitespace and separators, refilling the buffer as needed
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            buf, pos = next(chunks, ""), 0
+            eof = not buf
+        if pos >= len(buf):
+            raise ValueError(f"{source}: unexpected end of JSON array")
+        if not started:
+            if buf[pos] != '[':
+                raise ValueError(f"{source}: expected a JSON array")
+            started = True
+            pos += 1
+            continue
+        if buf[pos] == ']':
+            return
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+            # A number at the end of the buffer may go on in the next chunk ("123" + "45")
+            complete = eof or end < len(buf) and buf[end] in VALUE_END
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if not complete:
+            more = next(chunks, "")
+            eof = not more
+            buf = buf[pos:] + more
+            pos = 0
+            continue
+        yield value
+        pos = end
+
+def iter_text(byte_chunks: Iterable[bytes], encoding: str = "utf-8") -> Iterator[str]:
+    """
+    Decodes a byte stream chunk by chunk; a character split across chunks is held back until complete.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for chunk in byte_chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+def _escape_boundary(buf: str) -> int:
+    """
+    The length of the longest prefix of JSON string content that does not end inside an
+    escape: a lone backslash, a \\u escape missing digits, or a high surrogate whose low
+    half may be in the next chunk are all left for the next chunk.
+    """
+    cut = len(buf)
+    while True:
+        escape = buf.rfind('\\', max(0, cut - 6), cut)
+        if escape < 0:
+            return cut
+        start = escape
+        while start > 0 and buf[start - 1] == '\\':
+            start -= 1
+        if (escape - start) % 2:
+            return cut # The second half of an escaped backslash
+        tail = buf[escape:cut]
+        if len(tail) == 1 or tail.startswith('\\u') and (len(tail) < 6 or tail[2] in 'dD' and tail[3] in '89abAB'):
+            cut = escape
+        else:
+            return cut
+
+def _unescape_chunks(buf: str, chunks: Iterator[str], source: str) -> Iterator[str]:
+    """
+    Yields the decoded content of a JSON string literal whose opening quote has been read;
+    `buf` is the text already read after the quote. Each chunk is decoded by the C string
+    scanner in one call, which also finds the closing quote if the chunk holds it.
+    """
+    while True:
+        cut = _escape_boundary(buf)
+        text, end = scanstring(buf[:cut] + '"', 0)
+        if text:
+            yield text
+        if end <= cut:
+            return # The closing quote was inside this chunk
+        more = next(chunks, "")
+        if not more:
+            raise ValueError(f"{source}: unexpected end of JSON string")
+        buf = buf[cut:] + more
+
+def iter_nested_array(byte_chunks: Iterable[bytes], key: str = "d", source: str = "response") -> Iterator:
+    """
+    Yields the elements of the array held in `key` of a JSON envelope, streaming, for
+    ASP.NET-style responses like {"d": "[{...}, ...]"} where the array is itself JSON
+    encoded into a string. The string is unescaped chunk by chunk straight into the array
+    decoder, so neither the body, the escaped string nor the full list is ever in memory.
+    A `key` holding a plain array is streamed the same way.
+    """
+    decoder = json.JSONDecoder()
+    chunks = iter_text(byte_chunks)
+    buf = ""
+    pos = 0
+
+    def skip_space():
+        nonlocal buf, pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf):
+                return
+            buf, pos = next(chunks, ""), 0
+            if not buf:
+                raise ValueError(f"{source}: '{key}' key not found in the response")
+
+    def decode_value():
+        nonlocal buf, pos
+        eof = False
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                if eof or end < len(buf) and buf[end] in VALUE_END:
+                    pos = end
+                    return value
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            more = next(chunks, "")
+            eof = not more
+            buf = buf[pos:] + more
+            pos = 0
+
+    skip_space()
+    if buf[pos] != '{':
+        raise ValueError(f"{source}: expected a JSON object")
+    pos += 1
+    while True:
+        skip_space()
+        if buf[pos] == '}':
+            raise ValueError(f"{source}: '{key}' key not found in the response")
+        if buf[pos] == ',':
+            pos += 1
+            continue
+        name = decode_value()
+        skip_space()
+        if buf[pos] != ':':
+            raise ValueError(f"{source}: expected ':' after {name!r}")
+        pos += 1
+        skip_space()
+        if name != key:
+            decode_value() # Other members are small; decode and drop them
+            continue
+        if buf[pos] == '"':
+            yield from iter_array_chunks(_unescape_chunks(buf[pos + 1:], chunks, source), source)
+        elif buf[pos] == '[':
+            yield from iter_array_chunks(_prepend(buf[pos:], chunks), source)
+        else:
+            raise ValueError(f"{source}: '{key}' holds neither an array nor a JSON string")
+        return
+
+def _prepend(first: str, chunks: Iterator[str]) -> Iterator[str]:
+    yield first
+    yield from chunks
@@ -0,0 +1,248 @@
+import bisect
+import json
+import sys
+from typing import List, Dict, Tuple, Optional
+
+# Check for required libraries
+try:
+    import numpy as np
+except ImportError as e:
+    print(f"Missing required library: {e}")
+    print("Please install them using: pip install numpy")
+    sys.exit(1)
+
+from geometry_kernel import cumulative_km, locate_on_polyline, point_polyline_distance
+from nh_refs import canonical_refs
+from route_graph import RouteGraph, RefGraph
+
+# Constants
+MAX_POST_SNAP_KM = 2.0 # km-posts further than this from a chain are ignored
+MAX_TURN_RADIANS = np.pi / 2 # Sharpest turn a chain may take through a junction
+CHAINAGE_TOLERANCE_KM = 0.5 # How far past the outermost km-posts a chainage may still be extrapolated
+
+
+def parse_chainage(value: Optional[str]) -> Optional[float]:
+    """
+    Converts a chainage string to km, e.g. "629+860" -> 629.86, "15.320" -> 15.32.
+    """
+    if not value:
+        return None
+    value = value.strip().rstrip('.')
+    try:
+        if '+' in value:
+            km, metres = value.split('+', 1)
+            return float(km) + float(metres) / 1000.0
+        return float(value)
+    except ValueError:
+        return None
+
+
+class Chain:
+    """
+    One stitched run of ways along an NH, with cumulative distances and an optional
+    chainage calibration (pairs of km-post chainage -> measured distance along the chain).
+    """
+
+    def __init__(self, coords: np.ndarray):
+        self.coords = coords
+        self.cum_km = cumulative_km(coords)
+        self.cal_chainage: List[float] = []
+        self.cal_measure: List[float] = []
+
+    @property
+    def length_km(self) -> float:
+        return float(self.cum_km[-1])
+
+    @property
+    def calibrated(self) -> bool:
+        return len(self.cal_chainage) >= 2
+
+    def project(self, lon: float, lat: float) -> Tuple[float, float]:
+        """
+        Returns (measure along the chain in km, approximate offset from the chain in km) of a point.
+        """
+        return locate_on_polyline(self.coords, self.cum_km, lon, lat)
+
+    def measure_at(self, chainage: float) -> float:
+        """
+        Maps a chainage to a distance along the chain by piecewise-linear interpolation
+        between km-posts (linear extrapolation past the ends; identity if uncalibrated).
+        """
+        ks, ms = self.cal_chainage, self.cal_measure
+        if not self.calibrated:
+            return chainage
+        i = bisect.bisect_left(ks, chainage)
+        i = min(max(i, 1), len(ks) - 1)
+        k0, k1, m0, m1 = ks[i - 1], ks[i], ms[i - 1], ms[i]
+        return m0 + (chainage - k0) * (m1 - m0) / (k1 - k0)
+
+    def point_at(self, measure: float) -> List[float]:
+        measure = min(max(measure, 0.0), self.length_km)
+        i = min(int(np.searchsorted(self.cum_km, measure, side='right')) - 1, len(self.cum_km) - 2)
+        seg = self.cum_km[i + 1] - self.cum_km[i]
+        t = (measure - self.cum_km[i]) / seg if seg > 0 else 0.0
+        return (self.coords[i] + t * (self.coords[i + 1] - self.coords[i])).tolist()
+
+    def slice(self, m1: float, m2: float) -> List[List[float]]:
+        """
+        Coordinates of the chain between two measures, in the order given.
+        """
+        lo, hi = sorted((min(max(m1, 0.0), self.length_km), min(max(m2, 0.0), self.length_km)))
+        inner_lo = int(np.searchsorted(self.cum_km, lo, side='right'))
+        inner_hi = int(np.searchsorted(self.cum_km, hi, side='left'))
+        coords = [self.point_at(lo)] + self.coords[inner_lo:inner_hi].tolist() + [self.point_at(hi)]
+        return coords if m1 <= m2 else coords[::-1]
+
+
+def build_chains(graph: RefGraph) -> List[Chain]:
+    """
+    Stitches the ways of a ref graph into long runs. At a junction the walk carries on
+    along the unused way that turns least, so a spur does not cut the main line in two.
+    """
+    degree = np.diff(graph.indptr)
+    used = np.zeros(len(graph.lines), dtype=bool)
+    chains = []
+
+    def heading(a, b) -> float:
+        return np.arctan2(b[1] - a[1], b[0] - a[0])
+
+    def walk(node: int) -> List:
+        coords = []
+        while True:
+            step = None
+            best_turn = MAX_TURN_RADIANS
+            for e in range(graph.indptr[node], graph.indptr[node + 1]):
+                way = int(graph.edge_way[e])
+                if used[way]:
+                    continue
+                forward = bool(graph.edge_forward[e])
+                way_coords = graph.lines[way].coords
+                first, second = (way_coords[0], way_coords[1]) if forward else (way_coords[-1], way_coords[-2])
+                if not coords:
+                    step = (way, forward, int(graph.edge_to[e]))
+                    break
+                turn = abs((heading(first, second) - heading(coords[-2], coords[-1]) + np.pi) % (2 * np.pi) - np.pi)
+                if turn <= best_turn:
+                    best_turn = turn
+                    step = (way, forward, int(graph.edge_to[e]))
+            if step is None:
+                return coords
+            way, forward, node = step
+            used[way] = True
+            way_coords = list(graph.lines[way].coords)
+            if not forward:
+                way_coords.reverse()
+            coords.extend(way_coords if not coords else way_coords[1:])
+
+    # Start at dead ends first so runs span end to end, then junctions, then closed loops
+    starts = sorted(range(graph.num_nodes), key=lambda n: (degree[n] != 1, degree[n] == 2))
+    for node in starts:
+        while True:
+            coords = walk(node)
+            if not coords:
+                break
+            if len(coords) >= 2:
+                chains.append(Chain(np.array(coords, dtype=np.float64)))
+    return chains
+
+
+class LinearReferenceIndex:
+    """
+    Per-NH linear referencing over the stitched route graph.
+
+    Once chains are calibrated from km-posts, a project's chainage range becomes a
+    geometry with two binary searches and interpolations, no geocoding needed.
+    """
+
+    def __init__(self, route_graph: RouteGraph):
+        self.chains: Dict[str, List[Chain]] = {
+            key: build_chains(graph) for key, graph in route_graph.graphs.items()
+        }
+        self._flat: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def calibrate(self, km_posts: List[Dict]) -> int:
+        """
+        Snaps km-posts ({"nh_number", "km", "lat", "lon"}) to their nearest chain of the same NH.
+        Returns the number of posts used.
+        """
+        used = 0
+        for post in km_posts:
+            best = None
+            for key in canonical_refs(str(post['nh_number'])):
+                chains = self.chains.get(key, [])
+                if not chains:
+                    continue
+                # Offsets to every chain of the ref in one call; only the closest is projected onto
+                coords, offsets = self._flat_chains(key)
+                distances = point_polyline_distance(np.full((len(chains), 2), [post['lon'], post['lat']]), coords, offsets, np.arange(len(chains)), geodesic=True)
+                i = int(np.argmin(distances))
+                if distances[i] <= MAX_POST_SNAP_KM and (best is None or distances[i] < best[1]):
+                    best = (chains[i], distances[i])
+            if best is None:
+                continue
+            chain = best[0]
+            measure, _ = chain.project(post['lon'], post['lat'])
+            if float(post['km']) in chain.cal_chainage:
+                continue
+            i = bisect.bisect_left(chain.cal_chainage, float(post['km']))
+            chain.cal_chainage.insert(i, float(post['km']))
+            chain.cal_measure.insert(i, measure)
+            used += 1
+        return used
+
+    def _flat_chains(self, key: str) -> Tuple[np.ndarray, np.ndarray]:
+        if key not in self._flat:
+            chains = self.chains[key]
+            self._flat[key] = (np.concatenate([chain.coords for chain in chains]),
+                               np.concatenate([[0], np.cumsum([len(chain.coords) for chain in chains])]))
+        return self._flat[key]
+
+    def covering_chain(self, nh_ref: str, k1: float, k2: float) -> Optional[Chain]:
+        """
+        The calibrated chain whose km-post span (give or take CHAINAGE_TOLERANCE_KM) contains
+        the whole range k1..k2, preferring the one covering most of it; None if there is none.
+        """
+        lo_k, hi_k = min(k1, k2), max(k1, k2)
+        best = None
+        for key in canonical_refs(nh_ref):
+            for chain in self.chains.get(key, []):
+                if not chain.calibrated:
+                    continue
+                lo, hi = chain.cal_chainage[0], chain.cal_chainage[-1]
+                if lo_k < lo - CHAINAGE_TOLERANCE_KM or hi_k > hi + CHAINAGE_TOLERANCE_KM:
+                    continue
+                coverage = min(hi_k, hi) - max(lo_k, lo)
+                if best is None or coverage > best[0]:
+                    best = (coverage, chain)
+        return best[1] if best else None
+
+    def can_place(self, nh_ref: str, start_chainage: Optional[str], end_chainage: Optional[str]) -> bool:
+        k1, k2 = parse_chainage(start_chainage), parse_chainage(end_chainage)
+        return k1 is not None and k2 is not None and self.covering_chain(nh_ref, k1, k2) is not None
+
+    def place(self, nh_ref: str, start_chainage: Optional[str], end_chainage: Optional[str]) -> Optional[Dict]:
+        """
+        Returns the GeoJSON LineString for a chainage range on an NH, using the calibrated chain
+        that covers most of the range, or None if no calibrated chain's km-posts span it (the
+        range would only be extrapolated and clamped to the chain end).
+        """
+        k1 = parse_chainage(start_chainage)
+        k2 = parse_chainage(end_chainage)
+        if k1 is None or k2 is None:
+            return None
+
+        chain = self.covering_chain(nh_ref, k1, k2)
+        if chain is None:
+            return None
+        m1, m2 = chain.measure_at(k1), chain.measure_at(k2)
+        if k1 == k2:
+            return {"type": "Point", "coordinates": chain.point_at(m1)}
+        return {"type": "LineString", "coordinates": chain.slice(m1, m2)}
+
+
+def load_km_posts(file_path: str) -> List[Dict]:
+    """
+    Loads known km-posts: a JSON list of {"nh_number", "km", "lat", "lon"}.
+    """
+    with open(file_path, 'r') as f:
+        return json.load(f)
@@ -0,0 +1,198 @@
+import argparse
+import json
+import os
+import time
+from typing import Dict, List, Optional, TextIO
+
+from highway_store import iter_highways, store_path_for
+from simplify import encode_records, LOD_DECODER_JS
+
+# Constants
+ENCODE_BATCH_SIZE = 500 # Records simplified together; bounds memory while amortizing the numpy passes
+DEFAULT_CENTER = [20.5937, 78.9629]
+DEFAULT_ZOOM = 5
+# Per layer kind: the record fields the popups use (everything else is dropped) and the default look
+LAYER_KINDS = {
+    "highways": {
+        "properties": ["id", "ref", "name", "length_km"],
+        "style": {"colors": ["#E0DFDF"], "weight": 4, "opacity": 0.8}
+    },
+    "projects": {
+        "properties": ["nh_number", "project_name", "start_location", "end_location", "total_length", "state"],
+        "style": {"colors": ["#FF0000", "#0000FF", "#008000", "#800080", "#FFA500"], "weight": 5, "opacity": 0.7}
+    }
+}
+
+RENDER_JS = """
+        function popupFor(kind, record) {
+            if (kind === 'projects') {
+                return "<b>" + record.nh_number + "</b><br>" +
+                       "<b>Project:</b> " + record.project_name + "<br>" +
+                       "<b>Route:</b> " + record.start_location + " -> " + record.end_location + "<br>" +
+                       "<b>Length:</b> " + (record.total_length ? record.total_length + " km" : "N/A") + "<br>" +
+                       "<b>State:</b> " + record.state;
+            }
+            return "<b>" + (record.ref || "Unknown") + "</b><br>" +
+                   "<b>Name:</b> " + (record.name || "Unknown") + "<br>" +
+                   "<b>Length:</b> " + (record.length_km || "N/A") + " km<br>" +
+                   "<b>ID:</b> " + record.id;
+        }
+
+        function renderLayers(data) {
+            var bounds = L.latLngBounds();
+            var entries = [];
+            data.layers.forEach(function(layer) {
+                var style = layer.style;
+                layer.records.forEach(function(record, index) {
+                    var color = style.colors[index % style.colors.length];
+                    if (record.point) {
+                        var latlng = L.latLng(record.point[1], record.point[0]);
+                        L.circleMarker(latlng, {color: color, weight: style.weight, opacity: style.opacity, radius: style.weight + 2})
+                            .addTo(map).bindPopup(popupFor(layer.kind, record));
+                        bounds.extend(latlng);
+                        return;
+                    }
+                    if (!record.lods) return;
+                    var polyline = L.polyline(lodLatLngs(record, map.getZoom()), {color: color, weight: style.weight, opacity: style.opacity}).addTo(map);
+                    polyline.bindPopup(popupFor(layer.kind, record));
+                    bounds.extend(polyline.getBounds());
+                    entries.push({record: record, polyline: polyline});
+                });
+            });
+            trackLods(map, entries);
+            if (bounds.isValid()) {
+                map.fitBounds(bounds);
+            }
+        }
+"""
+
+def write_layer_data(out: TextIO, layers: List[Dict]) -> Dict[str, int]:
+    """
+    Streams {"layers": [{"kind", "style", "records": [...]}, ...]} to `out`, one encoded record
+    at a time. Returns the number of records written per input file (or records source).
+    """
+    counts = {}
+    out.write('{"layers":[')
+    for i, layer in enumerate(layers):
+        kind = LAYER_KINDS[layer['kind']]
+        style = dict(kind['style'], **{k: layer[k] for k in ("colors", "weight", "opacity") if k in layer})
+        if i:
+            out.write(',')
+        out.write(f'{{"kind":{json.dumps(layer["kind"])},"style":{json.dumps(style, separators=(",", ":"))},"records":[')
+        first = True
+        batch = []
+
+        def flush():
+            nonlocal first
+            for encoded in encode_records(batch):
+                if not first:
+                    out.write(',')
+                out.write(json.dumps(encoded, separators=(',', ':')))
+                first = False
+            batch.clear()
+
+        sources = []
+        for file_path in layer.get('files', []):
+            if not os.path.exists(file_path) and not os.path.exists(store_path_for(file_path)):
+                print(f"Error: {file_path} not found.")
+                continue
+            sources.append((file_path, iter_highways(file_path)))
+        if 'records' in layer:
+            sources.append((f"{layer['kind']} records", layer['records']))
+        for source, records in sources:
+            count = 0
+            for record in records:
+                if not record.get('geometry'):
+                    continue
+                slim = {k: record.get(k) for k in kind['properties']}
+                slim['geometry'] = record['geometry']
+                batch.append(slim)
+                count += 1
+                if len(batch) >= ENCODE_BATCH_SIZE:
+                    flush()
+            counts[source] = count
+        flush()
+        out.write(']}')
+    out.write(']}')
+    return counts
+
+def render_map(output_file: str, title: str, layers: List[Dict], center: Optional[List[float]] = None, zoom: int = DEFAULT_ZOOM, external: bool = False) -> Dict[str, int]:
+    """
+    Writes a Leaflet page for any number of layers ({"kind", "files" and/or an iterable of
+    "records", optional "colors"/"weight"/"opacity"}).
+
+    Records are streamed from the inputs straight into the output, so memory stays flat however
+    large the data is. With `external`, the data goes to a sidecar <output>.data.json that the
+    page fetches after it loads (serve both over HTTP; browsers block fetch() from file://).
+    """
+    center = center or DEFAULT_CENTER
+    head = f"""<!DOCTYPE html>
+<html>
+<head>
+    <title>{title}</title>
+    <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" />
+    <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
+    <style>
+        #map {{ height: 100vh; width: 100%; }}
+        .info {{ padding: 6px 8px; font: 14px/16px Arial, Helvetica, sans-serif; background: white; background: rgba(255,255,255,0.8); box-shadow: 0 0 15px rgba(0,0,0,0.2); border-radius: 5px; }}
+    </style>
+</head>
+<body>
+    <div id="map"></div>
+    <script>
+        var map = L.map('map').setView([{center[0]}, {center[1]}], {zoom});
+        L.tileLayer('https://{{s}}.tile.openstreetmap.org/{{z}}/{{x}}/{{y}}.png', {{
+            attribution: '© OpenStreetMap contributors'
+        }}).addTo(map);
+{LOD_DECODER_JS}{RENDER_JS}
+"""
+    tail = """
+    </script>
+</body>
+</html>"""
+
+    with open(output_file, 'w') as f:
+        f.write(head)
+        if external:
+            data_file = os.path.splitext(output_file)[0] + ".data.json"
+            f.write(f"""        fetch({json.dumps(os.path.basename(data_file))})
+            .then(function(res) {{ return res.json(); }})
+            .then(renderLayers);""")
+            with open(data_file, 'w') as data_out:
+                counts = write_layer_data(data_out, layers)
+        else:
+            f.write("        renderLayers(")
+            counts = write_layer_data(f, layers)
+            f.write(");")
+        f.write(tail)
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Render highway and project layers to a Leaflet map page.")
+    parser.add_argument("--layer", nargs="+", action="append", required=True, metavar=("KIND", "FILE"),
+                        help=f"A layer kind ({', '.join(LAYER_KINDS)}) followed by its input files; repeatable")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--title", default="Highway Visualization")
+    parser.add_argument("--center", nargs=2, type=float, metavar=("LAT", "LON"))
+    parser.add_argument("--zoom", type=int, default=DEFAULT_ZOOM)
+    parser.add_argument("--color", action="append", help="Override colours of the layers in order")
+    parser.add_argument("--external", action="store_true", help="Write the data to a sidecar file fetched by the page")
+    args = parser.parse_args()
+
+    layers = []
+    for i, spec in enumerate(args.layer):
+        if spec[0] not in LAYER_KINDS or len(spec) < 2:
+            parser.error(f"--layer needs a kind ({', '.join(LAYER_KINDS)}) and at least one file")
+        layer = {"kind": spec[0], "files": spec[1:]}
+        if args.color and i < len(args.color):
+            layer["colors"] = [args.color[i]]
+        layers.append(layer)
+
+    start = time.perf_counter()
+    counts = render_map(args.output, args.title, layers, args.center, args.zoom, args.external)
+    for file_path, count in counts.items():
+        print(f"Loaded {count} records from {file_path}.")
+    print(f"Generated {args.output} in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+import bisect
+import collections
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Constants
+# Upper bounds of the histogram buckets, roughly log-spaced (ms for latencies)
+HISTOGRAM_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000, float('inf')]
+PROFILE_MODES = ["cprofile", "sample"]
+SAMPLE_INTERVAL_SECONDS = 0.005
+PROFILE_TOP_N = 25
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram; percentiles are reported as the upper bound of their bucket.
+    """
+
+    def __init__(self):
+        self.buckets = [0] * len(HISTOGRAM_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def observe(self, value: float):
+        self.buckets[bisect.bisect_left(HISTOGRAM_BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: Dict):
+        for i, n in enumerate(other["buckets"]):
+            self.buckets[i] += n
+        self.count += other["count"]
+        self.total += other["sum"]
+        if other["count"]:
+            self.min = min(self.min, other["min"])
+            self.max = max(self.max, other["max"])
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(HISTOGRAM_BUCKETS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "buckets": self.buckets
+        }
+
+
+class Metrics:
+    """
+    Per-run instrumentation: stage timers, counters, gauges and histograms, all thread-safe.
+
+    Stages nest, and each records its own time only: time spent in a stage entered inside
+    it (or in an upstream generator pulled through timed_iter) is charged to that stage.
+    This keeps the stages of a streaming pipeline, which run interleaved, apart.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.started = time.time()
+        self.start = time.perf_counter()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, float] = collections.defaultdict(float)
+        self.gauges: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+
+    def _stage_entry(self, name: str) -> Dict[str, float]:
+        return self.stages.setdefault(name, {"seconds": 0.0, "calls": 0, "items": 0})
+
+    @contextlib.contextmanager
+    def stage(self, name: str, items: int = 0):
+        """
+        Times a block as stage `name`, excluding time spent in stages nested inside it.
+        """
+        stack = self.local.__dict__.setdefault("stack", [])
+        frame = [0.0] # Time taken by nested stages
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][0] += elapsed
+            with self.lock:
+                entry = self._stage_entry(name)
+                entry["seconds"] += elapsed - frame[0]
+                entry["calls"] += 1
+                entry["items"] += items
+
+    def timed_iter(self, name: str, iterable: Iterable) -> Iterator:
+        """
+        Wraps an iterator so the time taken to produce each item is charged to stage `name`,
+        and every item counts towards its records/s.
+        """
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            with self.lock:
+                self.stages[name]["items"] += 1
+            yield item
+
+    def count(self, name: str, n: float = 1):
+        with self.lock:
+            self.counters[name] += n
+
+    def gauge(self, name: str, value: float):
+        with self.lock:
+            self.gauges[name] = value
+
+    def observe(self, name: str, value: float):
+        with self.lock:
+            self.histograms.setdefault(name, Histogram()).observe(value)
+
+    def drain(self) -> Dict:
+        """
+        Returns and clears everything recorded so far. Pool workers send this back to the
+        parent, which folds it in with merge().
+        """
+        with self.lock:
+            snapshot = {
+                "stages": self.stages,
+                "counters": dict(self.counters),
+                "histograms": {name: h.to_dict() for name, h in self.histograms.items()}
+            }
+            self.stages = {}
+            self.counters = collections.defaultdict(float)
+            self.histograms = {}
+        return snapshot
+
+    def merge(self, snapshot: Dict):
+        with self.lock:
+            for name, other in snapshot["stages"].items():
+                entry = self._stage_entry(name)
+                for field in entry:
+                    entry[field] += other[field]
+            for name, n in snapshot["counters"].items():
+                self.counters[name] += n
+            for name, other in snapshot["histograms"].items():
+                self.histograms.setdefault(name, Histogram()).merge(other)
+
+    def report(self) -> Dict:
+        """
+        The metrics of the run so far as a JSON-serializable dict.
+        """
+        wall = time.perf_counter() - self.start
+        with self.lock:
+            stages = {
+                name: {
+                    "seconds": round(entry["seconds"], 4),
+                    "calls": int(entry["calls"]),
+                    "items": int(entry["items"]),
+                    "items_per_second": round(entry["items"] / entry["seconds"], 1) if entry["items"] and entry["seconds"] > 0 else None,
+                    "share": round(entry["seconds"] / wall, 4) if wall > 0 else None
+                }
+                for name, entry in self.stages.items()
+            }
+            return {
+                "script": os.path.basename(sys.argv[0]),
+                "argv": sys.argv[1:],
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.started)),
+                "wall_seconds": round(wall, 4),
+                "stages": stages,
+                "counters": {name: (int(n) if float(n).is_integer() else n) for name, n in sorted(self.counters.items())},
+                "gauges": dict(sorted(self.gauges.items())),
+                "histograms": {name: h.to_dict() for name, h in sorted(self.histograms.items())}
+            }
+
+    def write_report(self, file_path: str) -> Dict:
+        report = self.report()
+        with open(file_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        return report
+
+    def print_summary(self):
+        report = self.report()
+        print(f"\nStage timings ({report['wall_seconds']:.2f}s wall):")
+        for name, entry in sorted(report["stages"].items(), key=lambda kv: -kv[1]["seconds"]):
+            rate = f"  {entry['items_per_second']:.1f}/s" if entry["items_per_second"] else ""
+            print(f"  {name:<24} {entry['seconds']:9.3f}s  {entry['calls']:>7} calls{rate}")
+
+
+# Process-wide instance the pipeline modules record into
+METRICS = Metrics()
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread every `interval` seconds from a background thread and
+    counts each stack, for a profile with far less overhead than cProfile. Output is in the
+    collapsed-stack format flamegraph.pl and speedscope read.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL_SECONDS, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks: Dict[str, int] = collections.Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def write(self, file_path: str):
+        with open(file_path, 'w') as f:
+            for stack, n in self.stacks.most_common():
+                f.write(f"{stack} {n}\n")
+
+    def print_top(self, limit: int = PROFILE_TOP_N):
+        """
+        Prints the functions seen most often at the top of the stack.
+        """
+        leaves = collections.Counter()
+        for stack, n in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += n
+        total = sum(leaves.values()) or 1
+        print(f"\nTop of stack in {total} samples:")
+        for leaf, n in leaves.most_common(limit):
+            print(f"  {100 * n / total:5.1f}%  {leaf}")
+
+
+@contextlib.contextmanager
+def profiled(mode: Optional[str], output_file: Optional[str] = None):
+    """
+    Runs the block under cProfile or the sampling profiler when `mode` is set, then prints
+    the hottest functions and saves the profile (a .prof for cProfile, collapsed stacks for sample).
+    """
+    if not mode:
+        yield
+        return
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            output_file = output_file or "profile.prof"
+            profiler.dump_stats(output_file)
+            print(f"\ncProfile written to {output_file}")
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+    elif mode == "sample":
+        profiler = SamplingProfiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            output_file = output_file or "profile.folded"
+            profiler.write(output_file)
+            print(f"\nSampled stacks written to {output_file}")
+            profiler.print_top()
+    else:
+        raise ValueError(f"Unknown profile mode: {mode}")
@@ -0,0 +1,123 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Constants
+# Route series a ref can name, by the spellings seen in OSM tags and NHAI reports
+SERIES = {"NH": "NH", "NATIONALHIGHWAY": "NH", "NHNO": "NH", "NE": "NE", "NATIONALEXPRESSWAY": "NE", "AH": "AH", "SH": "SH"}
+DEFAULT_SERIES = "NH"
+# Separators between the refs of a multi-valued tag or cell ("NH16;NH65", "44/48", "NH-16 & 65")
+REF_SEPARATORS = re.compile(r'[;,/&+]|\bAND\b')
+# Pre-2010 numbers quoted next to the current one ("NH-16 (Old NH-5)") name no current road
+OLD_REF_PATTERN = re.compile(r'\(?\s*\bOLD\s*(?:NH|NATIONAL\s*HIGHWAY)?[\s.:-]*(?:NO\.?)?\s*\d+[A-Z]?\s*\)?', re.IGNORECASE)
+REF_TOKEN_PATTERN = re.compile(r'([A-Z]*?)(\d+)([A-Z]{0,2})')
+# A ref inside free text; the suffix letters (up to two, as in REF_TOKEN_PATTERN) must end
+# the word so "NH16in" is NH16, not NH16I
+REF_TEXT_PATTERN = re.compile(r'(?<![A-Za-z])(?i:(NH|NE))[-\s]?(\d+)([A-Z]{1,2}(?![A-Za-z]))?')
+
+
+def leading_ref(part: str) -> Optional[re.Match]:
+    """
+    The ref at the start of a cell, which may go on with other words, e.g. "NH-71 (Package-II)" -> NH71:
+    the longest run of leading words that reads as a ref, ends in the word with its number and is not
+    followed by a number. Suffix letters count only when attached to the digits, so "NH 44 km" is NH44.
+    """
+    words = re.findall(r'[A-Z0-9]+', part)
+    found = None
+    for i in range(1, len(words) + 1):
+        if not any(c.isdigit() for c in words[i - 1]):
+            continue
+        match = REF_TOKEN_PATTERN.fullmatch("".join(words[:i]))
+        if match and (i == len(words) or not words[i][0].isdigit()):
+            found = match
+    return found
+
+def canonical_refs(ref: Optional[str]) -> List[str]:
+    """
+    Tokenizes a ref into canonical IDs, e.g. "NH 16;NH-65" -> ["NH16", "NH65"],
+    "NE-7" -> ["NE7"], "16" -> ["NH16"], "NH 44/48" -> ["NH44", "NH48"],
+    "NH-71 (Package-II)" -> ["NH71"].
+
+    IDs are compared whole, so NH16 never matches NH163 or NH716. A bare number takes the
+    series of the ref before it in the same tag, or NH; text with no number gives no IDs.
+    """
+    ids: List[str] = []
+    series = DEFAULT_SERIES
+    text = OLD_REF_PATTERN.sub(" ", str(ref or "").upper())
+    for part in REF_SEPARATORS.split(text):
+        token = re.sub(r'[^A-Z0-9]', '', part)
+        match = leading_ref(part)
+        if match:
+            prefix, number, suffix = match.groups()
+            if prefix and prefix not in SERIES:
+                ref_id = match.group(0) # An unknown series (MDR, ODR, ...) is kept verbatim
+            else:
+                series = SERIES.get(prefix, series)
+                ref_id = f"{series}{int(number)}{suffix}"
+        elif any(c.isdigit() for c in token):
+            ref_id = token
+        else:
+            continue
+        if ref_id not in ids:
+            ids.append(ref_id)
+    return ids
+
+def canonical_ref(ref: Optional[str]) -> Optional[str]:
+    """
+    The first canonical ID of a ref, or None when it names no road.
+    """
+    ids = canonical_refs(ref)
+    return ids[0] if ids else None
+
+def find_refs(text: str) -> List[str]:
+    """
+    Canonical IDs of the NH/NE refs mentioned in free text, in order of first mention.
+    """
+    ids: List[str] = []
+    for match in REF_TEXT_PATTERN.finditer(OLD_REF_PATTERN.sub(" ", text or "")):
+        ref_id = f"{match.group(1).upper()}{int(match.group(2))}{match.group(3) or ''}"
+        if ref_id not in ids:
+            ids.append(ref_id)
+    return ids
+
+
+class RefIndex:
+    """
+    Inverted index of canonical ref ID -> positions of the segments that carry it.
+
+    A segment tagged with several refs is listed under each of them, and a lookup for a
+    multi-valued ref returns the union, so finding a highway's segments is one dict access
+    per ID rather than a scan of every segment.
+    """
+
+    def __init__(self, refs: Iterable[Optional[str]] = ()):
+        self.positions: Dict[str, List[int]] = {}
+        for pos, ref in enumerate(refs):
+            self.add(pos, ref)
+
+    def add(self, pos: int, ref: Optional[str]):
+        for ref_id in canonical_refs(ref):
+            self.positions.setdefault(ref_id, []).append(pos)
+
+    def lookup(self, ref: Optional[str]) -> List[int]:
+        """
+        Positions of the segments of every ID in `ref`, in index order, without duplicates.
+        """
+        ids = canonical_refs(ref)
+        if len(ids) == 1:
+            return list(self.positions.get(ids[0], []))
+        return sorted({pos for ref_id in ids for pos in self.positions.get(ref_id, [])})
+
+    def items(self) -> Iterable[Tuple[str, List[int]]]:
+        return self.positions.items()
+
+    def get(self, ref_id: str, default: Optional[List[int]] = None) -> Optional[List[int]]:
+        return self.positions.get(ref_id, default)
+
+    def __getitem__(self, ref_id: str) -> List[int]:
+        return self.positions[ref_id]
+
+    def __contains__(self, ref_id: str) -> bool:
+        return ref_id in self.positions
+
+    def __len__(self) -> int:
+        return len(self.positions)
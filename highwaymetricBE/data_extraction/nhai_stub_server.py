@@ -0,0 +1,140 @@
+import argparse
+import hashlib
+import json
+import random
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional
+
+# Constants
+HOST = "127.0.0.1"
+PORT = 8765
+STREAM_BATCH = 500 # Records per chunk of a streamed body
+STATES = [("28", "Andhra Pradesh"), ("36", "Telangana"), ("27", "Maharashtra"), ("29", "Karnataka"), ("33", "Tamil Nadu")]
+
+def generate_records(count: int, version: int = 0, seed: int = 42) -> List[Dict]:
+    """
+    Synthetic records shaped like the datalake's alignment rows. Bumping `version`
+    changes the length of ~1% of projects and drops ~0.5%, so syncs see real deltas.
+    """
+    return list(iter_records(count, version, seed))
+
+def iter_records(count: int, version: int = 0, seed: int = 42) -> Iterator[Dict]:
+    """
+    generate_records one record at a time, for responses too large to build in memory.
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        st_code, st_name = STATES[i % len(STATES)]
+        lon, lat = rng.uniform(72.0, 88.0), rng.uniform(10.0, 28.0)
+        record = {
+            "UPC": f"UPC{i:07d}",
+            "St_Code": st_code,
+            "St_Name": st_name,
+            "Prj_Name": f"4-laning of synthetic section {i} of NH-{rng.randint(1, 999)}",
+            "PKG_Name": f"Package-{rng.randint(1, 9)}",
+            "Cont_Name": f"Contractor {rng.randint(1, 500)} Pvt. Ltd.",
+            "Length": round(rng.uniform(1, 120), 3),
+            "Alignment": "LINESTRING(" + ", ".join(f"{lon + k * 0.01:.5f} {lat + k * 0.01:.5f}" for k in range(10)) + ")"
+        }
+        change = random.Random(f"{seed}:{version}:{i}").random() if version else 1.0
+        if change < 0.005:
+            continue
+        if change < 0.015:
+            record["Length"] = round(record["Length"] + version, 3)
+        yield record
+
+def iter_body(records: Iterator[Dict], batch: int = STREAM_BATCH) -> Iterator[bytes]:
+    """
+    The bytes of {"d": "<JSON string of records>"} in chunks, escaping one batch of records at a time.
+    """
+    yield b'{"d": "['
+    first = True
+    pending = []
+    for record in records:
+        pending.append(json.dumps(record))
+        if len(pending) == batch:
+            text = ("" if first else ", ") + ", ".join(pending)
+            yield json.dumps(text)[1:-1].encode('utf-8')
+            first = False
+            pending = []
+    if pending:
+        text = ("" if first else ", ") + ", ".join(pending)
+        yield json.dumps(text)[1:-1].encode('utf-8')
+    yield b']"}'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Answers every POST like Get_Adv_UPC_Wise_Alignments_WFS: {"d": "<JSON string of records>"},
+    filtered by St_Code, with an ETag so conditional requests get 304 Not Modified.
+
+    With `stream_count` set, the records are generated while the body is written, in
+    chunked encoding and without an ETag, so a response of any size costs the server no memory.
+    """
+    protocol_version = "HTTP/1.1"
+    records: List[Dict] = []
+    stream_count: Optional[int] = None
+    version = 0
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        query = json.loads(self.rfile.read(length) or b"{}")
+        st_code = str(query.get("St_Code", "0"))
+        if self.stream_count is not None:
+            self._stream(st_code)
+            return
+        rows = self.records if st_code == "0" else [r for r in self.records if r["St_Code"] == st_code]
+
+        body = json.dumps({"d": json.dumps(rows)}).encode('utf-8')
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, st_code: str):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        records = iter_records(self.stream_count, self.version)
+        if st_code != "0":
+            records = (r for r in records if r["St_Code"] == st_code)
+        for chunk in iter_body(records):
+            self.wfile.write(f"{len(chunk):x}\r\n".encode('ascii') + chunk + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(records: List[Dict], host: str = HOST, port: int = PORT, stream_count: Optional[int] = None, version: int = 0) -> ThreadingHTTPServer:
+    """
+    Creates the stand-in server (call serve_forever() on it, e.g. from a thread). With
+    `stream_count`, `records` is ignored and that many records are generated per request.
+    """
+    handler = type("Handler", (StubHandler,), {"records": records, "stream_count": stream_count, "version": version})
+    return ThreadingHTTPServer((host, port), handler)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the NHAI datalake WFS endpoint.")
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--version", type=int, default=0, help="Data version; each bump changes a few records")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--stream", action="store_true", help="Generate each response while sending it (chunked, no ETag), for responses too large to hold")
+    args = parser.parse_args()
+
+    if args.stream:
+        server = serve([], port=args.port, stream_count=args.records, version=args.version)
+    else:
+        server = serve(generate_records(args.records, args.version), port=args.port)
+    print(f"Serving {args.records} synthetic projects on http://{HOST}:{args.port}/ (version {args.version}{', streamed' if args.stream else ''})", flush=True)
+    server.serve_forever()
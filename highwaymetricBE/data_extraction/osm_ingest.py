@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# Check for required libraries
+try:
+    import numpy as np
+    import osmium
+    import osmium.filter
+    import shapely
+    from shapely.geometry import shape
+except ImportError as e:
+    print(f"Missing required library: {e}")
+    print("Please install them using: pip install osmium numpy shapely")
+    sys.exit(1)
+
+from geometry_kernel import polyline_lengths_km
+from highway_store import convert
+
+# Constants
+OUTPUT_DIR = "data_extraction/osm"
+NH_NETWORK = "IN:NH"
+NH_REF_PATTERN = re.compile(r'^NH')
+NH_HIGHWAY_TYPES = {"trunk", "primary"}
+
+
+def is_nh_way(tags) -> bool:
+    """
+    The way filter of fetch_state_highways.js: network=IN:NH, or a trunk/primary road with an NH ref.
+    """
+    if tags.get('network') == NH_NETWORK:
+        return True
+    return tags.get('highway') in NH_HIGHWAY_TYPES and bool(NH_REF_PATTERN.match(tags.get('ref', '')))
+
+def nh_relation_members(pbf_path: str) -> Dict[int, Optional[str]]:
+    """
+    Way id -> ref of the network=IN:NH relation it belongs to. Only relations are decoded.
+    """
+    members = {}
+    processor = osmium.FileProcessor(pbf_path, osmium.osm.RELATION).with_filter(osmium.filter.TagFilter(('network', NH_NETWORK)))
+    for relation in processor:
+        for member in relation.members:
+            if member.type == 'w':
+                members.setdefault(member.ref, relation.tags.get('ref'))
+    return members
+
+def extract_highways(pbf_path: str) -> List[Dict]:
+    """
+    Reads one .pbf extract and returns its NH ways as segment records (id, type, ref, name,
+    geometry), in the schema fetch_state_highways.js writes. Node locations are resolved by
+    libosmium, and only ways tagged highway reach Python.
+    """
+    members = nh_relation_members(pbf_path)
+    records = []
+    processor = (osmium.FileProcessor(pbf_path, osmium.osm.NODE | osmium.osm.WAY)
+                 .with_locations()
+                 .with_filter(osmium.filter.EntityFilter(osmium.osm.WAY))
+                 .with_filter(osmium.filter.KeyFilter('highway')))
+    for way in processor:
+        tags = way.tags
+        if not (is_nh_way(tags) or way.id in members):
+            continue
+        coords = [[node.lon, node.lat] for node in way.nodes if node.location.valid()]
+        if len(coords) < 2:
+            continue
+        records.append({
+            "id": way.id,
+            "type": "way",
+            "ref": tags.get('ref') or members.get(way.id) or "Unknown",
+            "name": tags.get('name'),
+            "geometry": {"type": "LineString", "coordinates": coords}
+        })
+    return records
+
+def _extract_worker(pbf_path: str) -> Tuple[str, List[Dict], float]:
+    start = time.perf_counter()
+    records = extract_highways(pbf_path)
+    return pbf_path, records, time.perf_counter() - start
+
+def add_lengths(records: List[Dict]):
+    """
+    Fills length_km for every record in one vectorized pass.
+    """
+    if not records:
+        return
+    lines = [r['geometry']['coordinates'] for r in records]
+    offsets = np.concatenate([[0], np.cumsum([len(line) for line in lines])])
+    lengths = polyline_lengths_km(np.array([c for line in lines for c in line], dtype=np.float64), offsets)
+    for record, length in zip(records, lengths):
+        record['length_km'] = round(float(length), 3)
+
+def load_boundaries(file_path: str, name_property: str) -> Tuple[List[str], List]:
+    """
+    State polygons from a GeoJSON FeatureCollection, named by `name_property`.
+    """
+    with open(file_path, 'r') as f:
+        features = json.load(f)['features']
+    names = [str(feat['properties'].get(name_property)) for feat in features]
+    return names, [shape(feat['geometry']) for feat in features]
+
+def assign_states(records: List[Dict], names: List[str], polygons: List) -> Dict[str, List[Dict]]:
+    """
+    Groups records by the state polygon containing the middle vertex of each way, in one
+    bulk spatial query. Ways outside every polygon go to "unassigned".
+    """
+    tree = shapely.STRtree(polygons)
+    mids = shapely.points([r['geometry']['coordinates'][len(r['geometry']['coordinates']) // 2] for r in records])
+    record_idx, polygon_idx = tree.query(mids, predicate='within')
+    state_of = {}
+    for r, p in zip(record_idx, polygon_idx):
+        state_of.setdefault(int(r), names[int(p)])
+    layers: Dict[str, List[Dict]] = {}
+    for i, record in enumerate(records):
+        layers.setdefault(state_of.get(i, "unassigned"), []).append(record)
+    return layers
+
+def slugify(name: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+def write_layer(out_dir: str, layer: str, records: List[Dict], build_store: bool = False) -> Tuple[str, int]:
+    """
+    Writes one layer as <layer>_highways.json (and its store), with length_km filled in.
+    """
+    add_lengths(records)
+    output_file = os.path.join(out_dir, f"{slugify(layer)}_highways.json")
+    with open(output_file, 'w') as f:
+        json.dump(records, f, indent=2)
+    if build_store:
+        convert(output_file)
+    return output_file, len(records)
+
+def _write_worker(job: Tuple[str, str, List[Dict], bool]) -> Tuple[str, int]:
+    return write_layer(*job)
+
+def ingest(pbf_paths: List[str], out_dir: str = OUTPUT_DIR, workers: int = 1, boundaries: Optional[str] = None, name_property: str = "name", build_store: bool = False) -> Dict[str, int]:
+    """
+    Extracts NH ways from one or more .pbf files and writes one <layer>_highways.json per
+    state (with `boundaries`) or per input file.
+
+    Several inputs (e.g. per-zone extracts cut with `osmium extract`) are read one process
+    each, and ways shared by neighbouring extracts are kept once. A single country file is
+    read in one pass, where libosmium decodes blocks on its own threads and only NH ways
+    reach Python; its state layers are then measured and written across the pool.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    layers: Dict[str, List[Dict]] = {}
+    seen = set()
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        results = executor.map(_extract_worker, pbf_paths) if executor and len(pbf_paths) > 1 else map(_extract_worker, pbf_paths)
+        for pbf_path, records, elapsed in results:
+            fresh = [r for r in records if r['id'] not in seen]
+            seen.update(r['id'] for r in fresh)
+            print(f"{pbf_path}: {len(records)} NH ways in {elapsed:.1f}s")
+            layers.setdefault(os.path.basename(pbf_path).split('.')[0], []).extend(fresh)
+
+        if boundaries:
+            names, polygons = load_boundaries(boundaries, name_property)
+            layers = assign_states([r for records in layers.values() for r in records], names, polygons)
+
+        jobs = [(out_dir, layer, records, build_store) for layer, records in sorted(layers.items())]
+        written = executor.map(_write_worker, jobs) if executor and len(jobs) > 1 else map(_write_worker, jobs)
+        counts = {}
+        for (_, layer, _, _), (output_file, count) in zip(jobs, written):
+            counts[layer] = count
+            print(f"Saved {count} highway segments to {output_file}")
+    finally:
+        if executor:
+            executor.shutdown()
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract National Highway ways from local OSM .pbf extracts.")
+    parser.add_argument("input", nargs="+", help=".pbf extracts, e.g. one per state or zone")
+    parser.add_argument("--out-dir", default=OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Extracts read in parallel")
+    parser.add_argument("--boundaries", help="GeoJSON of state polygons; output is split per state instead of per extract")
+    parser.add_argument("--name-property", default="name", help="Feature property holding the state name")
+    parser.add_argument("--store", action="store_true", help="Also build the columnar store of each layer")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = ingest(args.input, args.out_dir, args.workers, args.boundaries, args.name_property, args.store)
+    print(f"Extracted {sum(counts.values())} segments into {len(counts)} layers in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,17 @@
+import collections
+from concurrent.futures import Executor
+from typing import Iterable, Iterator
+
+
+def ordered_map(executor: Executor, func, items: Iterable, window: int) -> Iterator:
+    """
+    Like executor.map, but keeps at most `window` tasks in flight so the input is consumed lazily.
+    Results are yielded in input order.
+    """
+    pending = collections.deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
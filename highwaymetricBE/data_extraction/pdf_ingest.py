@@ -0,0 +1,286 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Check for required libraries
+try:
+    import pdfplumber
+except ImportError as e:
+    print(f"Missing required library: {e}")
+    print("Please install them using: pip install pdfplumber")
+    sys.exit(1)
+
+from field_extractor import FieldExtractor, STATES
+from parallel import ordered_map
+
+# Constants
+OUTPUT_FILE = "data_extraction/projects_metadata.json"
+PAGES_PER_TASK = 8
+# States and UTs the reports list beyond the extractor's gazetteer
+OTHER_STATES = ["Arunachal Pradesh", "Assam", "Chandigarh", "Chhattisgarh", "Delhi", "Goa", "Jammu and Kashmir",
+                "Ladakh", "Manipur", "Mizoram", "Nagaland", "Puducherry", "Sikkim", "Tripura"]
+# The State column is narrow enough that names wrap mid-word ("Maharash tra"), so match them without spaces
+STATE_KEYS = {name.replace(" ", "").lower(): name for name in STATES + OTHER_STATES}
+
+# The four monthly NHAI reports. Each is recognised by its file name or the title row of its
+# table, and its header cells are mapped to the project schema by the first pattern that matches
+# (so "Appointed Date/Start Date- Contractor" is a date, not the concessionaire).
+REPORTS = {
+    "awarded_not_appointed": {
+        "file": r'awarded[_\s-]*not[_\s-]*appointed',
+        "title": r'awarded\s+but\s+not\s+start',
+        "status": "Awarded But Not Started",
+        "columns": [
+            (r'^sr', "sr_no"), (r'project|name of work', "project_name"), (r'^nh', "nh_number"),
+            (r'length', "total_length"), (r'loa', "loa_date"), (r'lane', "lanes"),
+            (r'concessionaire|contractor', "concessionaire"), (r'mode', "mode"), (r'state', "state")
+        ]
+    },
+    "balance_for_award": {
+        "file": r'balance[_\s-]*for[_\s-]*award',
+        "title": r'balance\s+for\s+award',
+        "status": "Balance For Award",
+        "columns": [
+            (r'^sr', "sr_no"), (r'project|name of work', "project_name"), (r'^nh', "nh_number"),
+            (r'length', "total_length"), (r'dpr', "dpr_name"), (r'mode', "mode"), (r'state', "state")
+        ]
+    },
+    "completed": {
+        "file": r'completed',
+        "title": r'completed',
+        "status": "Completed",
+        "columns": [
+            (r'^sr', "sr_no"), (r'project', "project_name"), (r'^nh', "nh_number"),
+            (r'length', "total_length"), (r'loa', "loa_date"), (r'appointed|start date', "appointed_date"),
+            (r'lane', "lanes"), (r'concessionaire|contractor', "concessionaire"), (r'state', "state")
+        ]
+    },
+    "under_implementation": {
+        "file": r'under[_\s-]*implementation',
+        "title": r'under\s+implementation',
+        "status": "Under Implementation",
+        "columns": [
+            (r'^sr', "sr_no"), (r'project', "project_name"), (r'^nh', "nh_number"),
+            (r'length', "total_length"), (r'loa', "loa_date"), (r'appointed|start date', "appointed_date"),
+            (r'lane', "lanes"), (r'progress', "physical_progress"), (r'concessionaire|contractor', "concessionaire"),
+            (r'mode', "mode"), (r'state', "state")
+        ]
+    }
+}
+
+
+def clean_cell(value: Optional[str]) -> str:
+    """
+    Joins a table cell's wrapped lines and collapses whitespace.
+    """
+    return re.sub(r'\s+', ' ', value or "").strip()
+
+def normalize_states(value: Optional[str]) -> Optional[str]:
+    """
+    Repairs wrapped state names and normalizes separators, e.g. "Tamil Nadu,Pud ucherry" -> "Tamil Nadu, Puducherry".
+    """
+    if not value:
+        return value
+    names = []
+    for part in value.split(","):
+        part = part.strip()
+        if part:
+            names.append(STATE_KEYS.get(part.replace(" ", "").lower(), part))
+    return ", ".join(names)
+
+def detect_report(pdf_path: str, first_rows: Optional[List[str]] = None) -> Optional[str]:
+    """
+    The report type of a PDF, from its file name or, failing that, the title rows of its first table.
+    """
+    name = os.path.basename(pdf_path).lower()
+    for report, spec in REPORTS.items():
+        if re.search(spec['file'], name):
+            return report
+    title = " ".join(first_rows or []).lower()
+    for report, spec in REPORTS.items():
+        if re.search(spec['title'], title):
+            return report
+    return None
+
+def map_header(header: List[str], report: str) -> List[Optional[str]]:
+    """
+    Schema field for each header cell of a report table (None for columns the schema does not use).
+    """
+    fields = []
+    for cell in header:
+        cell = cell.lower()
+        field = next((f for pattern, f in REPORTS[report]['columns'] if re.search(pattern, cell)), None)
+        fields.append(field if field not in fields else None)
+    return fields
+
+def first_table_rows(pdf_path: str) -> List[str]:
+    with pdfplumber.open(pdf_path) as pdf:
+        if not pdf.pages:
+            return []
+        tables = pdf.pages[0].extract_tables()
+    return [clean_cell(" ".join(c for c in row if c)) for row in (tables[0] if tables else [])[:6]]
+
+def extract_pages(pdf_path: str, report: str, page_numbers: List[int]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Reads the table rows of some pages of one report.
+
+    Returns (continuation cells, records): rows before the first numbered row of the
+    first page continue the last record of the previous chunk and are returned as cell
+    dicts for the caller to merge; every numbered row becomes one record.
+    """
+    leading: List[Dict] = []
+    records: List[Dict] = []
+    fields: Optional[List[Optional[str]]] = None
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_number in page_numbers:
+            page = pdf.pages[page_number]
+            for table in page.extract_tables():
+                for raw_row in table:
+                    row = [clean_cell(c) for c in raw_row]
+                    if not any(row):
+                        continue
+                    if row[0].lower().startswith("sr"):
+                        # Every page repeats the header row, so each page maps its own columns
+                        fields = map_header(row, report)
+                        continue
+                    # A numbered row starts a record and a row with an empty Sr. No. continues one;
+                    # anything else (report titles, "Status as on ...") is not table data
+                    if fields is None or len(row) != len(fields) or (row[0] and not row[0].isdigit()):
+                        continue
+                    cells = {f: v for f, v in zip(fields, row) if f and v}
+                    if row[0]:
+                        records.append(cells)
+                    elif records:
+                        merge_cells(records[-1], cells)
+                    else:
+                        leading.append(cells)
+            page.close()
+    return leading, records
+
+def merge_cells(record: Dict, cells: Dict):
+    """
+    Appends the cells of a row that continues `record` (a row split across pages).
+    """
+    for field, value in cells.items():
+        record[field] = f"{record[field]} {value}" if record.get(field) else value
+
+def _extract_worker(task: Tuple[str, str, List[int]]) -> Tuple[List[Dict], List[Dict]]:
+    return extract_pages(*task)
+
+def to_project(cells: Dict, report: str, extractor: FieldExtractor) -> Dict:
+    """
+    Maps the cells of one report row to the projects_metadata.json schema.
+    """
+    project = {
+        "sr_no": cells.get("sr_no"),
+        "project_name": cells.get("project_name"),
+        "nh_number": cells.get("nh_number"),
+        "total_length": cells.get("total_length"),
+        "state": normalize_states(cells.get("state")),
+        "status": REPORTS[report]['status']
+    }
+    for field in ("concessionaire", "loa_date", "appointed_date", "dpr_name", "mode", "lanes", "physical_progress"):
+        if field in cells:
+            project[field] = cells[field]
+
+    fields = extractor.extract(project['project_name'] or "")
+    if fields['start_chainage']:
+        project['start_chainage'] = fields['start_chainage']
+        project['end_chainage'] = fields['end_chainage']
+    return project
+
+def ingest_pdfs(pdf_paths: List[str], workers: int = 1, report: Optional[str] = None, pages_per_task: int = PAGES_PER_TASK) -> Iterator[Tuple[str, Dict]]:
+    """
+    Extracts every project row of the given reports, yielding (report, project) in report order.
+
+    Pages are parsed in chunks of `pages_per_task` across a process pool (parsing the page
+    layout is nearly all of the cost); rows that a page break split in two are rejoined.
+    Only a few chunks per worker are in flight at a time, so a caller that stops reading
+    early (--limit) does not wait for the whole report to be parsed.
+    """
+    tasks = []
+    for pdf_path in pdf_paths:
+        kind = report or detect_report(pdf_path) or detect_report(pdf_path, first_table_rows(pdf_path))
+        if kind is None:
+            print(f"Skipping {pdf_path}: not one of the known NHAI reports ({', '.join(REPORTS)})")
+            continue
+        with pdfplumber.open(pdf_path) as pdf:
+            num_pages = len(pdf.pages)
+        print(f"{pdf_path}: {num_pages} pages of {kind}")
+        for start in range(0, num_pages, pages_per_task):
+            tasks.append((pdf_path, kind, list(range(start, min(start + pages_per_task, num_pages)))))
+
+    extractor = FieldExtractor()
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(tasks) > 1 else None
+    try:
+        results = ordered_map(executor, _extract_worker, tasks, window=workers * 2) if executor else map(_extract_worker, tasks)
+        previous = None # Last record of the previous chunk of the same file, held back for continuations
+        previous_path = None
+        for (pdf_path, kind, _), (leading, records) in zip(tasks, results):
+            if previous is not None and pdf_path == previous_path:
+                for cells in leading:
+                    merge_cells(previous[1], cells)
+            if previous is not None:
+                yield previous[0], to_project(previous[1], previous[0], extractor)
+                previous = None
+            if records:
+                for cells in records[:-1]:
+                    yield kind, to_project(cells, kind, extractor)
+                previous = (kind, records[-1])
+                previous_path = pdf_path
+        if previous is not None:
+            yield previous[0], to_project(previous[1], previous[0], extractor)
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+def row_text(project: Dict) -> str:
+    """
+    The row's cells as one line of text, in table order, for FieldExtractor.
+    """
+    nh_number = project.get("nh_number")
+    if nh_number and nh_number[0].isdigit():
+        nh_number = f"NH-{nh_number}" # So the NH pattern finds a bare "16" column
+    parts = [project.get("project_name"), nh_number] + [project.get(f) for f in ("total_length", "loa_date", "appointed_date", "lanes", "concessionaire", "dpr_name", "mode", "state")]
+    return " ".join(p for p in parts if p)
+
+def to_report_text(project: Dict) -> str:
+    """
+    One line of the text process_highway_data.py reads: the serial number, then the row's text.
+    """
+    return f"{project['sr_no']} {row_text(project)}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract project tables from NHAI monthly report PDFs.")
+    parser.add_argument("input", nargs="+", help="Report PDFs (Awarded_not_appointed, Balance_for_award, Completed_PCOD_PCC_Issued, Under_implementation)")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="Project JSON in the projects_metadata.json schema")
+    parser.add_argument("--text-output", help="Also write one line per project for process_highway_data.py --input")
+    parser.add_argument("--report", choices=list(REPORTS), help="Report type, when it cannot be told from the file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processes parsing pages")
+    parser.add_argument("--states", nargs="+", help="Only keep projects in these states")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    projects = []
+    counts: Dict[str, int] = {}
+    states = {s.lower() for s in args.states} if args.states else None
+    for kind, project in ingest_pdfs(args.input, args.workers, args.report):
+        if states and not any(s.strip().lower() in states for s in (project['state'] or "").split(",")):
+            continue
+        projects.append(project)
+        counts[kind] = counts.get(kind, 0) + 1
+
+    with open(args.output, 'w') as f:
+        json.dump(projects, f, indent=4)
+    if args.text_output:
+        with open(args.text_output, 'w') as f:
+            for project in projects:
+                f.write(to_report_text(project) + "\n")
+
+    summary = ", ".join(f"{n} {kind}" for kind, n in counts.items())
+    print(f"Saved {len(projects)} projects ({summary}) to {args.output} in {time.perf_counter() - start:.1f}s")
@@ -1,198 +1,154 @@
+import argparse
+import collections
+import filecmp
 import re
 import json
-import subprocess
+import itertools
+import os
 import sys
-import time
-from typing import List, Dict, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator, Union
 
 # Check for required libraries
 try:
-    from geopy.geocoders import Nominatim
-    from geopy.exc import GeocoderTimedOut
-    from shapely.geometry import LineString, Point, shape
+    from shapely.geometry import LineString, Point
     from shapely.ops import substring
 except ImportError as e:
     print(f"Missing required library: {e}")
-    print("Please install them using: pip install geopy shapely")
+    print("Please install them using: pip install shapely")
     sys.exit(1)
 
-# Constants
+from highway_index import HighwayIndex
+from nh_refs import canonical_refs, find_refs
+from highway_store import HighwayStore, open_highways
+from route_graph import RouteGraph
+from linear_reference import LinearReferenceIndex, load_km_posts
+from field_extractor import FieldExtractor
+from simplify import compact_geometry
+from geocode_cache import BatchGeocoder, GeocodeCache, NominatimGeocoder, StubGeocoder, GEOCODE_CACHE_FILE
+from metrics import METRICS, PROFILE_MODES, profiled
+from parallel import ordered_map
+from stage_cache import StageCache, STAGE_CACHE_FILE, cached_in_order, highway_fingerprints, km_post_fingerprints
+
 # Constants
 PDF_TEXT_FILE = "Awarded_not_appointed_nov-2025.txt"
 STATE_HIGHWAYS_FILE = "state_highways.json"
 OUTPUT_FILE = "highway_data.json"
+GEOCODE_BATCH_SIZE = 100
+# Project fields a match depends on, besides the NH's segments and km-posts
+MATCH_INPUT_FIELDS = ["nh_number", "state", "start_location", "end_location", "start_chainage", "end_chainage"]
 
-def load_state_highways(file_path: str) -> List[Dict]:
+def load_state_highways(file_path: str) -> Union[List[Dict], HighwayStore]:
     """
-    Loads the pre-fetched state highway data.
+    Loads the pre-fetched state highway data, from its columnar store when one has been built.
     """
     try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
+        return open_highways(file_path)
     except FileNotFoundError:
         print(f"Error: {file_path} not found. Please run fetch_state_highways.js first.")
         sys.exit(1)
 
-def parse_pdf_text(file_path: str) -> List[Dict]:
+def read_pdf_lines(file_path: str) -> Iterator[str]:
+    """
+    Yields the non-empty content lines of the extracted PDF text, one at a time.
+    """
+    with open(file_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+
+            # Skip headers/footers
+            if "Awarded But not Start" in line or "Status as on" in line or "Page" in line:
+                continue
+
+            yield line
+
+def read_report_pdf(file_path: str, workers: int = 1) -> Iterator[Dict]:
+    """
+    Raw project records straight from an NHAI report PDF, in the shape parse_pdf_text yields.
     """
-    Parses the text file extracted from the PDF to find project details.
+    from pdf_ingest import ingest_pdfs, row_text # Only PDF input needs pdfplumber
+    records = ingest_pdfs([file_path], workers)
+    try:
+        for _, project in records:
+            yield {"sr_no": project['sr_no'], "raw_text": row_text(project) + " "}
+    finally:
+        records.close() # Cancels the chunks not yet parsed when the caller stops early
+
+def parse_pdf_text(lines: Iterable[str]) -> Iterator[Dict]:
+    """
+    Assembles content lines into raw project records, yielding each one as soon as the next begins.
     """
-    projects = []
     current_project = {}
+    buffer_parts = []
     
     # Regex patterns
     sr_no_pattern = re.compile(r'^\s*(\d+)\s+(.*)')
     
-    with open(file_path, 'r') as f:
-        lines = f.readlines()
-        
-    buffer_text = ""
-    
     for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        # Skip headers/footers
-        if "Awarded But not Start" in line or "Status as on" in line or "Page" in line:
-            continue
-            
         match = sr_no_pattern.match(line)
         if match:
             if current_project:
-                current_project['raw_text'] = buffer_text
-                projects.append(current_project)
+                current_project['raw_text'] = " ".join(buffer_parts) + " "
+                yield current_project
                 current_project = {}
-                buffer_text = ""
+                buffer_parts = []
             
             current_project['sr_no'] = match.group(1)
-            buffer_text += match.group(2) + " "
+            buffer_parts.append(match.group(2))
         else:
-            buffer_text += line + " "
+            buffer_parts.append(line)
             
     if current_project:
-        current_project['raw_text'] = buffer_text
-        projects.append(current_project)
-        
-    return projects
+        current_project['raw_text'] = " ".join(buffer_parts) + " "
+        yield current_project
 
-def extract_project_details(projects: List[Dict]) -> List[Dict]:
+def extract_project_details(projects: Iterable[Dict], extractor: Optional[FieldExtractor] = None) -> Iterator[Dict]:
     """
     Refines the raw text to extract NH number, State, and Description.
     """
-    cleaned_projects = []
-    
+    extractor = extractor or FieldExtractor()
     for p in projects:
         text = p['raw_text']
-        
-        # Extract NH Number (Heuristic: "NH-XX" or "NH XX")
-        nh_match = re.search(r'NH[-\s]?(\d+[A-Z]?)', text, re.IGNORECASE)
-        nh_number = nh_match.group(1) if nh_match else None
-        
-        # Extract State
-        states = ["Andhra Pradesh", "Bihar", "Gujarat", "Haryana", "Himachal Pradesh", "Jharkhand", "Karnataka", 
-                  "Kerala", "Madhya Pradesh", "Maharashtra", "Meghalaya", "Odisha", "Punjab", "Rajasthan", 
-                  "Tamil Nadu", "Telangana", "Uttar Pradesh", "Uttarakhand", "West Bengal"]
-        
-        found_state = "Unknown"
-        for state in states:
-            if state in text:
-                found_state = state
-                break
-                
-        # Extract potential start/end points
-        start_loc = None
-        end_loc = None
-        
-        from_to_match = re.search(r'from\s+([A-Z][a-zA-Z\s]+?)\s+to\s+([A-Z][a-zA-Z\s]+)', text)
-        if from_to_match:
-            start_loc = from_to_match.group(1).strip()
-            end_loc = from_to_match.group(2).strip()
-        else:
-            dash_match = re.search(r'([A-Z][a-zA-Z\s]+)\s?-\s?([A-Z][a-zA-Z\s]+)\s+section', text)
-            if dash_match:
-                start_loc = dash_match.group(1).strip()
-                end_loc = dash_match.group(2).strip()
-
-        # Extract Total Length (looking for number followed by km)
-        length_match = re.search(r'(\d+\.?\d*)\s*km', text, re.IGNORECASE)
-        total_length = length_match.group(1) if length_match else None
+        fields = extractor.extract(text)
+        refs = find_refs(text) # Canonical IDs, the same keys the highway index and import use
 
-        cleaned_projects.append({
+        yield {
             "sr_no": p['sr_no'],
-            "nh_number": f"NH {nh_number}" if nh_number else "Unknown",
-            "state": found_state,
+            "nh_number": refs[0] if refs else "Unknown",
+            "state": fields['state'] or "Unknown",
             "project_name": text[:100] + "..." if len(text) > 100 else text, # Use first 100 chars as name
             "description": text,
-            "start_location": start_loc,
-            "end_location": end_loc,
-            "total_length": total_length,
+            "start_location": fields['start_location'],
+            "end_location": fields['end_location'],
+            "total_length": fields['total_length'],
+            "start_chainage": fields['start_chainage'],
+            "end_chainage": fields['end_chainage'],
             "status": "AWARDED", # Default status based on file
-            "concessionaire": "Unknown" # Placeholder
-        })
-        
-    return cleaned_projects
+            "concessionaire": fields['contractor'] or "Unknown"
+        }
 
-def get_coordinates(place_name: str) -> Optional[Tuple[float, float]]:
+def extract_cached(projects: Iterable[Dict], cache: StageCache, extractor: Optional[FieldExtractor] = None) -> Iterator[Dict]:
     """
-    Geocodes a place name to (lat, lon).
+    extract_project_details through the stage cache, keyed by the raw record.
     """
-    if not place_name:
-        return None
-        
-    geolocator = Nominatim(user_agent="highway_metric_explorer")
-    try:
-        location = geolocator.geocode(f"{place_name}, India", timeout=10)
-        if location:
-            return (location.latitude, location.longitude)
-    except Exception as e:
-        print(f"Geocoding error for {place_name}: {e}")
-        
-    return None
+    extractor = extractor or FieldExtractor()
+    for p in projects:
+        key = cache.key("extract", p)
+        project = cache.get("extract", key)
+        if project is None:
+            project = next(extract_project_details([p], extractor))
+            cache.put("extract", key, project)
+        yield project
 
-def find_matching_highway_segments(state_highways: List[Dict], nh_ref: str) -> List[Dict]:
+def build_geocoder(stub_file: Optional[str] = None, cache_file: str = GEOCODE_CACHE_FILE) -> BatchGeocoder:
     """
-    Finds all segments in the state highway data that match the NH number.
+    Creates the batch geocoder: cached Nominatim lookups, or a local stub table for offline runs.
     """
-    matches = []
-    target_ref = nh_ref.replace(" ", "").lower() # e.g. "nh16"
-    
-    for hw in state_highways:
-        hw_ref = hw.get('ref', '').replace(" ", "").lower()
-        if target_ref in hw_ref or hw_ref in target_ref:
-             matches.append(hw['geometry'])
-             
-    return matches
-
-def find_best_segment(geometries: List[Dict], start_coords: Tuple[float, float], end_coords: Tuple[float, float]) -> Optional[Dict]:
-    """
-    Finds the geometry segment that is closest to the start and end coordinates.
-    """
-    if not geometries:
-        return None
-        
-    best_geom = None
-    min_score = float('inf')
-    
-    p1 = Point(start_coords[1], start_coords[0])
-    p2 = Point(end_coords[1], end_coords[0])
-    
-    for geom in geometries:
-        if geom['type'] != 'LineString':
-            continue
-            
-        line = LineString(geom['coordinates'])
-        
-        dist1 = line.distance(p1)
-        dist2 = line.distance(p2)
-        
-        score = dist1 + dist2
-        
-        if score < min_score:
-            min_score = score
-            best_geom = geom
-            
-    return best_geom
+    if stub_file:
+        return BatchGeocoder(StubGeocoder.from_file(stub_file), GeocodeCache(":memory:"), min_delay_seconds=0)
+    return BatchGeocoder(NominatimGeocoder(), GeocodeCache(cache_file))
 
 def slice_geometry(geometry_json: Dict, start_coords: Tuple[float, float], end_coords: Tuple[float, float]) -> Optional[Dict]:
     """
@@ -208,61 +164,317 @@ def slice_geometry(geometry_json: Dict, start_coords: Tuple[float, float], end_c
     
     dist1 = line.project(p1)
     dist2 = line.project(p2)
+    METRICS.count("shapely.project", 2)
     
     if dist1 > dist2:
         dist1, dist2 = dist2, dist1
         
     sliced_line = substring(line, dist1, dist2)
+    METRICS.count("shapely.substring")
     
     return {
         "type": "LineString",
         "coordinates": list(sliced_line.coords)
     }
 
-def main():
+def geocode_projects(projects: Iterable[Dict], geocoder: BatchGeocoder, matcher: "ProjectMatcher", batch_size: int = GEOCODE_BATCH_SIZE) -> Iterator[Tuple[Dict, Optional[Tuple[float, float]], Optional[Tuple[float, float]]]]:
+    """
+    Geocodes start/end locations a batch at a time, yielding (project, start_coords, end_coords).
+    Projects the matcher can place from their chainage are passed through without geocoding.
+    """
+    projects = iter(projects)
+    while True:
+        batch = list(itertools.islice(projects, batch_size))
+        if not batch:
+            return
+        to_geocode = [proj for proj in batch if matcher.needs_geocoding(proj)]
+        geocoder.resolve((proj[loc], proj['state']) for proj in to_geocode for loc in ('start_location', 'end_location'))
+        for proj in batch:
+            if not matcher.needs_geocoding(proj):
+                yield (proj, None, None)
+                continue
+            yield (proj,
+                   geocoder.lookup(proj['start_location'], proj['state']),
+                   geocoder.lookup(proj['end_location'], proj['state']))
+
+class ProjectMatcher:
+    """
+    The lookup structures built once from the state highways that place a project on the map:
+    chainage via calibrated linear referencing, else geocoded endpoints routed along the NH,
+    else the single closest segment sliced between them.
+    """
+
+    def __init__(self, state_highways: List[Dict], km_posts: Optional[List[Dict]] = None):
+        self.highway_index = HighwayIndex(state_highways)
+        self.route_graph = RouteGraph(self.highway_index)
+        self.linear_ref = LinearReferenceIndex(self.route_graph)
+        self.km_posts_used = self.linear_ref.calibrate(km_posts or [])
+
+    def needs_geocoding(self, proj: Dict) -> bool:
+        return not (proj.get('start_chainage') and self.linear_ref.can_place(proj['nh_number'], proj['start_chainage'], proj.get('end_chainage')))
+
+    def match(self, proj: Dict, start_coords: Optional[Tuple[float, float]], end_coords: Optional[Tuple[float, float]]) -> Tuple[Dict, str]:
+        """
+        Attaches the project's highway geometry, returning the project with a status line.
+        """
+        if proj.get('start_chainage'):
+            with METRICS.stage("match.chainage"):
+                placed = self.linear_ref.place(proj['nh_number'], proj['start_chainage'], proj['end_chainage'])
+            if placed:
+                proj['geometry'] = compact_geometry(placed)
+                METRICS.count("placement.chainage")
+                return proj, f"Placed by chainage km {proj['start_chainage']} - {proj['end_chainage']}."
+
+        if not (start_coords and end_coords):
+            METRICS.count("placement.not_geocoded")
+            return proj, "Could not geocode start/end locations."
+
+        # Route along the stitched NH first; fall back to slicing the single closest segment
+        with METRICS.stage("match.route"):
+            routed = self.route_graph.route(proj['nh_number'], start_coords, end_coords)
+        if routed:
+            proj['geometry'] = compact_geometry(routed)
+            METRICS.count("placement.routed")
+            return proj, "Routed along stitched NH ways."
+
+        with METRICS.stage("match.segment"):
+            best_geom = self.highway_index.find_best_segment(proj['nh_number'], start_coords, end_coords)
+        if not best_geom:
+            METRICS.count("placement.unmatched")
+            return proj, "No suitable geometry found in state data."
+
+        with METRICS.stage("match.slice"):
+            proj['geometry'] = compact_geometry(slice_geometry(best_geom, start_coords, end_coords))
+        METRICS.count("placement.sliced")
+        return proj, "Sliced best geometry."
+
+class LazyMatcher:
+    """
+    Stands in for the ProjectMatcher and builds it on first use, so a run whose
+    projects all come from the stage cache never builds the index.
+    """
+
+    def __init__(self, state_highways: List[Dict], km_posts: Optional[List[Dict]] = None):
+        self.state_highways = state_highways
+        self.km_posts = km_posts
+        self._matcher: Optional[ProjectMatcher] = None
+
+    @property
+    def matcher(self) -> ProjectMatcher:
+        if self._matcher is None:
+            with METRICS.stage("build_matcher"):
+                self._matcher = ProjectMatcher(self.state_highways, self.km_posts)
+            print(f"Indexed {len(self._matcher.highway_index.ref_map)} distinct refs.")
+            if self.km_posts:
+                print(f"Calibrated chainage from {self._matcher.km_posts_used}/{len(self.km_posts)} km-posts.")
+        return self._matcher
+
+    def needs_geocoding(self, proj: Dict) -> bool:
+        return self.matcher.needs_geocoding(proj)
+
+    def match(self, proj: Dict, start_coords: Optional[Tuple[float, float]], end_coords: Optional[Tuple[float, float]]) -> Tuple[Dict, str]:
+        return self.matcher.match(proj, start_coords, end_coords)
+
+# Per-process matcher for pool workers, built once by _init_worker
+_WORKER_MATCHER: Optional[ProjectMatcher] = None
+
+def _init_worker(state_highways: List[Dict], km_posts: Optional[List[Dict]]):
+    global _WORKER_MATCHER
+    _WORKER_MATCHER = ProjectMatcher(state_highways, km_posts)
+    METRICS.drain() # Forked workers start with a copy of the parent's metrics
+
+def _match_in_worker(item: Tuple[Dict, Optional[Tuple[float, float]], Optional[Tuple[float, float]]]) -> Tuple[Dict, str, Dict]:
+    # The worker's metrics travel back with each result so the parent's report covers them
+    proj, status = _WORKER_MATCHER.match(*item)
+    return proj, status, METRICS.drain()
+
+def _merge_worker_metrics(results: Iterable[Tuple[Dict, str, Dict]]) -> Iterator[Tuple[Dict, str]]:
+    for proj, status, snapshot in results:
+        METRICS.merge(snapshot)
+        yield proj, status
+
+def match_and_slice(geocoded: Iterable[Tuple[Dict, Optional[Tuple[float, float]], Optional[Tuple[float, float]]]], matcher: ProjectMatcher, state_highways: Optional[List[Dict]] = None, km_posts: Optional[List[Dict]] = None, workers: int = 1) -> Iterator[Dict]:
+    """
+    Matches and slices each geocoded project, on a process pool when workers > 1.
+
+    Pool workers build their own ProjectMatcher once from `state_highways` at start-up;
+    tasks only carry the project and its coordinates. Output keeps input (sr_no) order.
+    """
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(state_highways, km_posts))
+        results = _merge_worker_metrics(ordered_map(executor, _match_in_worker, geocoded, window=workers * 4))
+    else:
+        executor = None
+        results = (matcher.match(*item) for item in geocoded)
+
+    try:
+        for proj, status in METRICS.timed_iter("match", results):
+            print(f"\nProcessing Project {proj['sr_no']}: {proj['nh_number']}")
+            print(f"  Route: {proj['start_location']} -> {proj['end_location']}")
+            print(f"  {status}")
+            yield proj
+    finally:
+        if executor:
+            executor.shutdown()
+
+def match_cached(projects: Iterable[Dict], cache: StageCache, geocoder: BatchGeocoder, matcher: LazyMatcher, workers: int = 1) -> Iterator[Dict]:
+    """
+    Geocodes, matches and slices only the projects the stage cache cannot answer.
+
+    A match is keyed by the project's own fields and the content hashes of its NH's
+    segments and km-posts, so changing one state's OSM file only invalidates projects on
+    the NHs it touches. A placement made from geocoded endpoints is only reused while the
+    places still geocode to the same points (a geocode cache lookup, not a request).
+    """
+    with METRICS.stage("fingerprint"):
+        fingerprints = highway_fingerprints(matcher.state_highways)
+        post_fingerprints = km_post_fingerprints(matcher.km_posts)
+    used_coords = collections.deque() # Geocoded endpoints of each miss, in pipeline order
+
+    def endpoints(proj: Dict) -> Optional[List]:
+        """
+        The project's geocoded endpoints as far as they are known without a request, or None
+        when one is not cached (or has expired) and has to go through the batched geocoder.
+        """
+        coords = []
+        for location in ('start_location', 'end_location'):
+            hit, c = geocoder.cached(proj[location], proj['state'])
+            if not hit:
+                return None
+            coords.append(list(c) if c else None)
+        return coords
+
+    def lookup(proj: Dict) -> Tuple[str, Optional[Dict]]:
+        keys = canonical_refs(proj['nh_number'])
+        key = cache.key("match", {f: proj.get(f) for f in MATCH_INPUT_FIELDS}, [fingerprints.get(k) for k in keys], [post_fingerprints.get(k) for k in keys])
+        entry = cache.get("match", key)
+        if entry and entry['geocoded']:
+            current = endpoints(proj)
+            if current is None:
+                METRICS.count("stage_cache.match.expired_geocodes")
+                entry = None
+            elif current != entry['coords']:
+                METRICS.count("stage_cache.match.stale_geocodes")
+                entry = None
+        return key, entry
+
+    def record_coords(geocoded):
+        for proj, start_coords, end_coords in geocoded:
+            used_coords.append((start_coords, end_coords))
+            yield proj, start_coords, end_coords
+
+    def compute(misses: Iterator[Dict]) -> Iterator[Dict]:
+        geocoded = METRICS.timed_iter("geocode", geocode_projects(misses, geocoder, matcher))
+        return match_and_slice(record_coords(geocoded), matcher, matcher.state_highways, matcher.km_posts, workers=workers)
+
+    def store(key: str, proj: Dict):
+        start_coords, end_coords = used_coords.popleft()
+        geocoded = matcher.needs_geocoding(proj)
+        entry = {"geocoded": geocoded, "coords": [list(c) if c else None for c in (start_coords, end_coords)] if geocoded else None}
+        if 'geometry' in proj:
+            entry['geometry'] = proj['geometry']
+        cache.put("match", key, entry)
+
+    def restore(proj: Dict, entry: Dict) -> Dict:
+        if 'geometry' in entry:
+            proj['geometry'] = entry['geometry']
+        print(f"\nProcessing Project {proj['sr_no']}: {proj['nh_number']} (cached)")
+        return proj
+
+    return METRICS.timed_iter("stage_cache", cached_in_order(projects, lookup, compute, store, restore))
+
+def write_json_array(records: Iterable[Dict], file_path: str) -> int:
+    """
+    Writes records to a JSON array as they arrive, in the same layout as json.dump(..., indent=4).
+    """
+    count = 0
+    with open(file_path, 'w') as f:
+        f.write("[")
+        for record in records:
+            body = json.dumps(record, indent=4).replace("\n", "\n    ")
+            f.write(("," if count else "") + "\n    " + body)
+            f.flush()
+            count += 1
+        f.write("\n]" if count else "]")
+    return count
+
+def run(args):
     print("Step 1: Loading State Highways...")
-    state_highways = load_state_highways(STATE_HIGHWAYS_FILE)
+    with METRICS.stage("load_highways"):
+        state_highways = load_state_highways(STATE_HIGHWAYS_FILE)
+        km_posts = load_km_posts(args.km_posts) if args.km_posts else None
+    matcher = LazyMatcher(state_highways, km_posts)
     print(f"Loaded {len(state_highways)} highway segments.")
 
-    print("Step 2: Parsing PDF text...")
-    raw_projects = parse_pdf_text(PDF_TEXT_FILE)
-    projects = extract_project_details(raw_projects)
-    print(f"Found {len(projects)} projects.")
-    
-    final_data = []
-    
-    # Limit to first 5 for testing
-    for proj in projects[:5]: 
-        print(f"\nProcessing Project {proj['sr_no']}: {proj['nh_number']}")
-        print(f"  Route: {proj['start_location']} -> {proj['end_location']}")
-        
-        start_coords = get_coordinates(proj['start_location'])
-        end_coords = get_coordinates(proj['end_location'])
-        
-        if start_coords and end_coords:
-            print(f"  Coords: {start_coords} -> {end_coords}")
-            
-            # Find matching segments in loaded data
-            matching_geoms = find_matching_highway_segments(state_highways, proj['nh_number'])
-            print(f"  Found {len(matching_geoms)} matching segments in state data.")
-            
-            best_geom = find_best_segment(matching_geoms, start_coords, end_coords)
-            
-            if best_geom:
-                print("  Slicing best geometry...")
-                sliced_geom = slice_geometry(best_geom, start_coords, end_coords)
-                proj['geometry'] = sliced_geom
-            else:
-                print("  No suitable geometry found in state data.")
-        else:
-            print("  Could not geocode start/end locations.")
-            
-        final_data.append(proj)
-        time.sleep(1) # Be nice to Nominatim
-        
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(final_data, f, indent=4)
-    print(f"\nSaved processed data to {OUTPUT_FILE}")
+    print("Step 2: Streaming projects from PDF text...")
+    geocoder = build_geocoder(args.stub_geocoder, args.geocode_cache)
+    geocoder.workers = args.geocode_workers
+
+    cache = StageCache(args.stage_cache) if args.stage_cache else None
+
+    # Each stage pulls one record at a time from the previous one
+    pdf_records = None
+    if args.input.lower().endswith(".pdf"):
+        pdf_records = read_report_pdf(args.input, args.pdf_workers)
+        raw_projects = METRICS.timed_iter("parse", pdf_records)
+    else:
+        lines = METRICS.timed_iter("read_pdf", read_pdf_lines(args.input))
+        raw_projects = METRICS.timed_iter("parse", parse_pdf_text(lines))
+    projects = METRICS.timed_iter("extract_fields", extract_cached(raw_projects, cache) if cache else extract_project_details(raw_projects))
+    if args.limit:
+        projects = itertools.islice(projects, args.limit)
+    if cache:
+        processed = match_cached(projects, cache, geocoder, matcher, workers=args.workers)
+    else:
+        geocoded = METRICS.timed_iter("geocode", geocode_projects(projects, geocoder, matcher))
+        processed = match_and_slice(geocoded, matcher, state_highways, km_posts, workers=args.workers)
+
+    # Write next to the output and only replace it if something changed, so its mtime means "new data"
+    temp_file = args.output + ".tmp"
+    try:
+        with METRICS.stage("write"):
+            count = write_json_array(processed, temp_file)
+    finally:
+        if pdf_records is not None:
+            pdf_records.close() # With --limit, stops the page parsers still running
+        if cache:
+            cache.close()
+    print(f"\nResolved {len(geocoder.results)} distinct places ({geocoder.hits} cached, {geocoder.misses} geocoded).")
+    if os.path.exists(args.output) and filecmp.cmp(temp_file, args.output, shallow=False):
+        os.remove(temp_file)
+        print(f"{args.output} is unchanged ({count} projects)")
+    else:
+        os.replace(temp_file, args.output)
+        print(f"Saved {count} processed projects to {args.output}")
+
+    METRICS.gauge("segments", len(state_highways))
+    METRICS.gauge("projects", count)
+    METRICS.gauge("geocode.cache_hit_rate", round(geocoder.hits / (geocoder.hits + geocoder.misses), 4) if geocoder.hits + geocoder.misses else 0.0)
+
+def main():
+    parser = argparse.ArgumentParser(description="Match NHAI projects to OSM highway geometry.")
+    parser.add_argument("--input", default=PDF_TEXT_FILE, help="Text extracted from the NHAI PDF, or the report PDF itself")
+    parser.add_argument("--pdf-workers", type=int, default=os.cpu_count(), help="Processes parsing PDF pages when --input is a .pdf")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="Processed GeoJSON-enriched project file")
+    parser.add_argument("--limit", type=int, default=0, help="Only process the first N projects (0 for all)")
+    parser.add_argument("--workers", type=int, default=1, help="Processes for segment matching and slicing")
+    parser.add_argument("--geocode-workers", type=int, default=1, help="Threads for geocoding cache misses (rate limit still applies)")
+    parser.add_argument("--km-posts", help="JSON list of known km-posts ({nh_number, km, lat, lon}) to place projects by chainage")
+    parser.add_argument("--stub-geocoder", help="JSON file of place -> [lat, lon] to geocode offline")
+    parser.add_argument("--geocode-cache", default=GEOCODE_CACHE_FILE, help="SQLite geocode cache file")
+    parser.add_argument("--stage-cache", default=STAGE_CACHE_FILE, help="SQLite cache of extracted and matched projects ('' to disable)")
+    parser.add_argument("--metrics-report", help="Write per-stage timings, counters and histograms to this JSON file")
+    parser.add_argument("--profile", choices=PROFILE_MODES, help="Profile the run with cProfile or the low-overhead stack sampler")
+    parser.add_argument("--profile-output", help="Where to save the profile (default profile.prof / profile.folded)")
+    args = parser.parse_args()
+
+    with profiled(args.profile, args.profile_output):
+        run(args)
+
+    METRICS.print_summary()
+    if args.metrics_report:
+        METRICS.write_report(args.metrics_report)
+        print(f"Metrics report written to {args.metrics_report}")
 
 if __name__ == "__main__":
     main()
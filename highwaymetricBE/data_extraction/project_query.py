@@ -0,0 +1,297 @@
+import argparse
+import datetime
+import json
+import re
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+# Check for required libraries
+try:
+    import numpy as np
+    import shapely
+    from shapely.strtree import STRtree
+except ImportError as e:
+    print(f"Missing required library: {e}")
+    print("Please install them using: pip install shapely")
+    sys.exit(1)
+
+from json_stream import iter_json_array
+from nh_refs import canonical_refs
+
+# Constants
+DATE_FIELDS = ["loa_date", "appointed_date"]
+SORT_FIELDS = DATE_FIELDS + ["total_length"]
+EXPORT_FORMATS = ["json", "ndjson", "geojson"]
+DATE_PATTERN = re.compile(r'^(\d{1,2})[/.-](\d{1,2})[/.-](\d{2,4})$')
+
+Filter = Union[None, str, Sequence[str]]
+
+
+def parse_date(value: Optional[str]) -> Optional[int]:
+    """
+    Day number of a report date (dd/mm/yyyy, also with - or . and two-digit years), or None.
+    """
+    match = DATE_PATTERN.match((value or "").strip())
+    if not match:
+        return None
+    day, month, year = (int(g) for g in match.groups())
+    if year < 100:
+        year += 2000
+    try:
+        return datetime.date(year, month, day).toordinal()
+    except ValueError:
+        return None
+
+def _day(value: str) -> int:
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(f"Unrecognized date: {value!r} (expected dd/mm/yyyy)")
+    return day
+
+def parse_number(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def state_keys(value: Optional[str]) -> List[str]:
+    """
+    Lookup keys of a state cell; projects spanning states list them comma-separated.
+    """
+    return [s.strip().lower() for s in (value or "").split(",") if s.strip()]
+
+def _as_list(value: Filter) -> List[str]:
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+class QueryResult:
+    """
+    One page of a query: `total` matches, of which `items` are the records from `offset` on.
+    """
+
+    def __init__(self, total: int, offset: int, items: List[Dict], positions: np.ndarray):
+        self.total = total
+        self.offset = offset
+        self.items = items
+        self.positions = positions
+
+    def to_dict(self) -> Dict:
+        return {"total": self.total, "offset": self.offset, "count": len(self.items), "items": self.items}
+
+
+class ProjectQuery:
+    """
+    Secondary indexes over a list of processed projects, built once:
+
+    - hash indexes of state, status and canonical NH ID -> sorted record positions
+    - an STRtree over the bounding boxes of the project geometries
+    - per date field, the positions sorted by date, for range queries by binary search
+
+    A query intersects the position arrays of its hash filters, smallest first, checks
+    its bbox and date filters against what is left, and only materializes the records
+    of the requested page.
+    """
+
+    def __init__(self, projects: Iterable[Dict]):
+        self.projects: List[Dict] = list(projects)
+        by_state: Dict[str, List[int]] = {}
+        by_status: Dict[str, List[int]] = {}
+        by_nh: Dict[str, List[int]] = {}
+        boxes, box_positions = [], []
+        for pos, proj in enumerate(self.projects):
+            for key in state_keys(proj.get('state')):
+                by_state.setdefault(key, []).append(pos)
+            if proj.get('status'):
+                by_status.setdefault(proj['status'].strip().lower(), []).append(pos)
+            for ref_id in canonical_refs(proj.get('nh_number')):
+                by_nh.setdefault(ref_id, []).append(pos)
+            coords = (proj.get('geometry') or {}).get('coordinates')
+            if coords:
+                points = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+                boxes.append((*points.min(axis=0), *points.max(axis=0)))
+                box_positions.append(pos)
+
+        self.states = {k: np.asarray(v, dtype=np.int64) for k, v in by_state.items()}
+        self.statuses = {k: np.asarray(v, dtype=np.int64) for k, v in by_status.items()}
+        self.nh_numbers = {k: np.asarray(v, dtype=np.int64) for k, v in by_nh.items()}
+        self.box_positions = np.asarray(box_positions, dtype=np.int64)
+        self.bounds = np.full((len(self.projects), 4), np.nan)
+        if boxes:
+            self.bounds[self.box_positions] = boxes
+        self.tree = STRtree(shapely.box(*self.bounds[self.box_positions].T)) if boxes else None
+
+        # Per field: the value of every record (NaN when missing), and the records that have one sorted by it
+        self.values: Dict[str, np.ndarray] = {}
+        self.sorted: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.ranks: Dict[str, np.ndarray] = {}
+        for field in SORT_FIELDS:
+            parse = parse_number if field == "total_length" else parse_date
+            values = np.array([parse(p.get(field)) for p in self.projects], dtype=np.float64)
+            order = np.argsort(values, kind='stable') # NaN (missing) sorts last
+            valid = order[~np.isnan(values[order])]
+            self.values[field] = values
+            self.sorted[field] = (values[valid], valid)
+            rank = np.full(len(self.projects), len(self.projects), dtype=np.int64)
+            rank[valid] = np.arange(len(valid))
+            self.ranks[field] = rank
+
+    def __len__(self) -> int:
+        return len(self.projects)
+
+    def _lookup(self, index: Dict[str, np.ndarray], keys: List[str]) -> np.ndarray:
+        arrays = [index[k] for k in keys if k in index]
+        if len(arrays) == 1:
+            return arrays[0]
+        return np.unique(np.concatenate(arrays)) if arrays else np.zeros(0, dtype=np.int64)
+
+    def bbox_positions(self, bbox: Sequence[float]) -> np.ndarray:
+        """
+        Positions of the projects whose bounding box meets (min_lon, min_lat, max_lon, max_lat).
+        """
+        if self.tree is None:
+            return np.zeros(0, dtype=np.int64)
+        return np.sort(self.box_positions[self.tree.query(shapely.box(*bbox))])
+
+    def date_positions(self, field: str, date_from: Optional[str] = None, date_to: Optional[str] = None) -> np.ndarray:
+        """
+        Positions of the projects whose `field` falls in [date_from, date_to] (either end open).
+        """
+        values, positions = self.sorted[field]
+        lo = np.searchsorted(values, _day(date_from), 'left') if date_from else 0
+        hi = np.searchsorted(values, _day(date_to), 'right') if date_to else len(values)
+        return np.sort(positions[lo:hi])
+
+    def select(self, state: Filter = None, status: Filter = None, nh: Filter = None, bbox: Optional[Sequence[float]] = None,
+               date_field: str = "loa_date", date_from: Optional[str] = None, date_to: Optional[str] = None) -> np.ndarray:
+        """
+        Sorted positions of the projects matching every given filter. A list of values
+        for state, status or NH matches any of them.
+        """
+        candidates = []
+        if state is not None:
+            candidates.append(self._lookup(self.states, [s.strip().lower() for s in _as_list(state)]))
+        if status is not None:
+            candidates.append(self._lookup(self.statuses, [s.strip().lower() for s in _as_list(status)]))
+        if nh is not None:
+            candidates.append(self._lookup(self.nh_numbers, [r for n in _as_list(nh) for r in canonical_refs(n)]))
+        has_dates = bool(date_from or date_to)
+
+        # The hash lookups cost nothing, so start from them; the tree or date index only
+        # seeds the result when there are none, and otherwise their filters are checked
+        # against the few candidates left
+        if candidates:
+            candidates.sort(key=len)
+            result = candidates[0]
+            for other in candidates[1:]:
+                if not len(result):
+                    break
+                result = np.intersect1d(result, other, assume_unique=True)
+        elif bbox is not None:
+            result, bbox = self.bbox_positions(bbox), None
+        elif has_dates:
+            result, has_dates = self.date_positions(date_field, date_from, date_to), False
+        else:
+            return np.arange(len(self.projects), dtype=np.int64)
+
+        if bbox is not None and len(result):
+            b = self.bounds[result] # NaN (no geometry) fails every comparison
+            result = result[(b[:, 2] >= bbox[0]) & (b[:, 0] <= bbox[2]) & (b[:, 3] >= bbox[1]) & (b[:, 1] <= bbox[3])]
+        if has_dates and len(result):
+            days = self.values[date_field][result]
+            keep = ~np.isnan(days)
+            if date_from:
+                keep &= days >= _day(date_from)
+            if date_to:
+                keep &= days <= _day(date_to)
+            result = result[keep]
+        return result
+
+    def query(self, offset: int = 0, limit: Optional[int] = None, order_by: Optional[str] = None, descending: bool = False,
+              fields: Optional[List[str]] = None, **filters) -> QueryResult:
+        """
+        One page of the matches of select(**filters), in file order or ordered by a date
+        field or total_length (records missing it come last either way).
+        """
+        positions = self.select(**filters)
+        if order_by:
+            ranks = self.ranks[order_by][positions]
+            if descending:
+                missing = ranks == len(self.projects)
+                ranks = np.where(missing, len(self.projects), -ranks)
+            positions = positions[np.argsort(ranks, kind='stable')]
+        page = positions[offset:offset + limit if limit is not None else None]
+        items = [self.projects[i] for i in page]
+        if fields:
+            items = [{f: proj.get(f) for f in fields} for proj in items]
+        return QueryResult(len(positions), offset, items, page)
+
+
+def load_projects(file_paths: List[str]) -> List[Dict]:
+    """
+    Every record of one or more project JSON arrays (highway_data.json, projects_metadata.json), in order.
+    """
+    projects = []
+    for file_path in file_paths:
+        projects.extend(iter_json_array(file_path))
+    return projects
+
+def export(items: List[Dict], file_path: str, fmt: str = "json"):
+    """
+    Writes a result slice as a JSON array, NDJSON, or a GeoJSON FeatureCollection of the
+    records that have a geometry (the other fields become its properties).
+    """
+    with open(file_path, 'w') as f:
+        if fmt == "ndjson":
+            for item in items:
+                f.write(json.dumps(item) + "\n")
+        elif fmt == "geojson":
+            features = [
+                {"type": "Feature", "geometry": item['geometry'], "properties": {k: v for k, v in item.items() if k != 'geometry'}}
+                for item in items if item.get('geometry')
+            ]
+            json.dump({"type": "FeatureCollection", "features": features}, f)
+        else:
+            json.dump(items, f, indent=4)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Filter, page and export processed projects through in-memory indexes.")
+    parser.add_argument("input", nargs="+", help="Project JSON arrays (highway_data.json, data_extraction/projects_metadata.json)")
+    parser.add_argument("--state", nargs="+")
+    parser.add_argument("--status", nargs="+")
+    parser.add_argument("--nh", nargs="+", help="NH numbers in any spelling (16, NH-16, NH16)")
+    parser.add_argument("--bbox", nargs=4, type=float, metavar=("MIN_LON", "MIN_LAT", "MAX_LON", "MAX_LAT"))
+    parser.add_argument("--date-field", choices=DATE_FIELDS, default="loa_date")
+    parser.add_argument("--from", dest="date_from", help="Earliest date, dd/mm/yyyy")
+    parser.add_argument("--to", dest="date_to", help="Latest date, dd/mm/yyyy")
+    parser.add_argument("--order-by", choices=SORT_FIELDS)
+    parser.add_argument("--descending", action="store_true")
+    parser.add_argument("--offset", type=int, default=0)
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--fields", nargs="+", help="Only keep these fields of each record")
+    parser.add_argument("--output", help="Write the page here instead of printing it")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="json")
+    parser.add_argument("--map", help="Also render the page's projects to this Leaflet map")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    engine = ProjectQuery(load_projects(args.input))
+    built = time.perf_counter()
+    result = engine.query(offset=args.offset, limit=args.limit, order_by=args.order_by, descending=args.descending, fields=args.fields,
+                          state=args.state, status=args.status, nh=args.nh, bbox=args.bbox,
+                          date_field=args.date_field, date_from=args.date_from, date_to=args.date_to)
+    queried = time.perf_counter()
+    print(f"Indexed {len(engine)} projects in {built - start:.2f}s; {result.total} match, "
+          f"returning {len(result.items)} from {result.offset} ({(queried - built) * 1000:.3f} ms)", file=sys.stderr)
+
+    if args.output:
+        export(result.items, args.output, args.format)
+        print(f"Saved {len(result.items)} projects to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(result.to_dict(), indent=4))
+    if args.map:
+        from map_renderer import render_map
+        render_map(args.map, "Highway Projects", [{"kind": "projects", "records": [engine.projects[i] for i in result.positions]}])
+        print(f"Generated {args.map}", file=sys.stderr)
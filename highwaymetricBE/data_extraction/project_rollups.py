@@ -0,0 +1,379 @@
+import argparse
+import json
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Check for required libraries
+try:
+    import numpy as np
+except ImportError as e:
+    print(f"Missing required library: {e}")
+    print("Please install them using: pip install numpy")
+    sys.exit(1)
+
+from chainage_index import chainage_range, union_km
+from entity_resolution import contractor_of
+from geometry_kernel import cumulative_km
+from highway_store import HighwayStore, open_highways
+from nh_refs import canonical_refs
+from project_query import load_projects, parse_number
+
+# Constants
+DIMENSIONS = ["state", "nh", "status", "contractor"]
+ACTIVE_STATUSES = ["Under Implementation"] # Projects whose km count as covered
+ROLLUP_FILE = "data_extraction/project_rollups.npz"
+UNKNOWN = "Unknown"
+MIN_CAPACITY = 16
+IDENTITY_FIELDS = ["UPC", "Prj_Code", "PKG_Code", "id"] # Source project codes, as fetch_nhai_data.RECORD_KEY_FIELDS
+
+Span = Optional[Tuple[float, float]]
+Entry = Tuple[int, float, Tuple[Tuple[int, ...], ...], Span] # (status column, km, rollup rows per dimension, chainage range) of one record
+
+
+def dimension_keys(project: Dict, dimension: str) -> List[str]:
+    """
+    The groups a project falls in along one dimension. A project listing several states
+    or NHs ("Telangana, Andhra Pradesh", "NH-16/65") counts in full under each.
+    """
+    if dimension == "state":
+        keys = [s.strip() for s in (project.get("state") or "").split(",") if s.strip()]
+    elif dimension == "nh":
+        keys = canonical_refs(project.get("nh_number"))
+    elif dimension == "status":
+        keys = [project["status"].strip()] if project.get("status") and project["status"].strip() else []
+    else:
+        contractor = project.get("contractor_name") or contractor_of(project) # Canonical name when resolved
+        keys = [contractor] if contractor else []
+    return keys or [UNKNOWN]
+
+def project_key(project: Dict) -> str:
+    """
+    Identity of a project across reports: its source code when it has one, else its name,
+    NHs and state, none of which change when its status does; sr_no as a last resort.
+    """
+    for field in IDENTITY_FIELDS:
+        if project.get(field) not in (None, ""):
+            return f"{field}:{project[field]}"
+    name = " ".join((project.get("project_name") or "").lower().split())
+    if name:
+        return f"name:{name}|{'/'.join(canonical_refs(project.get('nh_number')))}|{(project.get('state') or '').strip().lower()}"
+    return f"sr_no:{project.get('sr_no')}"
+
+def project_km(project: Dict) -> float:
+    km = parse_number(project.get("total_length"))
+    return km if km is not None and km == km else 0.0
+
+
+class Rollup:
+    """
+    Materialized count and km per (group, status) along one dimension.
+
+    Groups get a row the first time they are seen; the arrays double when full, so adding
+    a group is amortized O(1) and reading one is a dict lookup and a row slice.
+    """
+
+    def __init__(self, num_statuses: int, keys: Sequence[str] = (), count: Optional[np.ndarray] = None, km: Optional[np.ndarray] = None):
+        self.keys: List[str] = list(keys)
+        self.rows: Dict[str, int] = {key: i for i, key in enumerate(self.keys)}
+        capacity = max(MIN_CAPACITY, len(self.keys))
+        self.count = np.zeros((capacity, num_statuses), dtype=np.int64)
+        self.km = np.zeros((capacity, num_statuses), dtype=np.float64)
+        if count is not None:
+            self.count[:len(self.keys), :count.shape[1]] = count
+            self.km[:len(self.keys), :km.shape[1]] = km
+
+    def row(self, key: str) -> int:
+        row = self.rows.get(key)
+        if row is None:
+            row = self.rows[key] = len(self.keys)
+            self.keys.append(key)
+            if row >= len(self.count):
+                self.count = np.vstack([self.count, np.zeros_like(self.count)])
+                self.km = np.vstack([self.km, np.zeros_like(self.km)])
+        return row
+
+    def add_status(self):
+        self.count = np.hstack([self.count, np.zeros((len(self.count), 1), dtype=np.int64)])
+        self.km = np.hstack([self.km, np.zeros((len(self.km), 1))])
+
+
+class ProjectRollups:
+    """
+    Precomputed totals of projects and km by state, NH, status and contractor, with each
+    group's split by status, plus the OSM network km per NH for coverage.
+
+    `build` does one vectorized group-by (np.bincount) per dimension; after that `add`,
+    `remove` and `set_status` adjust only the rows a record falls in, so totals stay current
+    without a rescan and every read costs the same however many records went in.
+
+    Each record's status, km and rows are kept by project_key (and saved with the totals),
+    so adding a project again replaces it instead of counting it twice, and a record can be
+    moved or taken back knowing only its identity.
+    """
+
+    def __init__(self, statuses: Sequence[str] = ()):
+        self.statuses: List[str] = list(statuses)
+        self.status_index: Dict[str, int] = {s: i for i, s in enumerate(self.statuses)}
+        self.rollups: Dict[str, Rollup] = {d: Rollup(len(self.statuses)) for d in DIMENSIONS}
+        self.network_km: Dict[str, float] = {}
+        self.entries: Dict[str, Entry] = {}
+
+    @property
+    def records(self) -> int:
+        return len(self.entries)
+
+    def _status(self, project: Dict) -> int:
+        status = dimension_keys(project, "status")[0]
+        index = self.status_index.get(status)
+        if index is None:
+            index = self.status_index[status] = len(self.statuses)
+            self.statuses.append(status)
+            for rollup in self.rollups.values():
+                rollup.add_status()
+        return index
+
+    def _entry(self, project: Dict) -> Entry:
+        rows = tuple(tuple(self.rollups[d].row(key) for key in dimension_keys(project, d)) for d in DIMENSIONS)
+        return self._status(project), project_km(project), rows, chainage_range(project)
+
+    @classmethod
+    def build(cls, projects: Iterable[Dict]) -> "ProjectRollups":
+        """
+        Rollups of a batch of projects, grouped with one bincount per dimension. A project
+        listed more than once (by project_key) counts once, as its last record.
+        """
+        rollups = cls()
+        for project in projects:
+            key = project_key(project)
+            rollups.entries.pop(key, None) # Re-inserted, so entries keep the order of last appearance
+            rollups.entries[key] = rollups._entry(project)
+        entries = list(rollups.entries.values())
+        statuses = np.array([status for status, _, _, _ in entries], dtype=np.int64)
+        km = np.array([km for _, km, _, _ in entries], dtype=np.float64)
+        num_statuses = len(rollups.statuses)
+        for d, dimension in enumerate(DIMENSIONS):
+            rollup = rollups.rollups[dimension]
+            records = [i for i, (_, _, rows, _) in enumerate(entries) for _ in rows[d]]
+            if not records:
+                continue
+            rows = np.fromiter((row for _, _, rows, _ in entries for row in rows[d]), dtype=np.int64, count=len(records))
+            records = np.array(records, dtype=np.int64)
+            cells = rows * num_statuses + statuses[records]
+            size = len(rollup.count) * num_statuses
+            rollup.count += np.bincount(cells, minlength=size).reshape(rollup.count.shape)
+            rollup.km += np.bincount(cells, weights=km[records], minlength=size).reshape(rollup.km.shape)
+        return rollups
+
+    def _apply(self, entry: Entry, sign: int):
+        status, km, rows, _ = entry
+        for dimension, dimension_rows in zip(DIMENSIONS, rows):
+            rollup = self.rollups[dimension]
+            for row in dimension_rows:
+                rollup.count[row, status] += sign
+                rollup.km[row, status] += sign * km
+
+    def add(self, project: Dict):
+        """
+        Adds a project, or replaces the record of the same project_key added before (a new
+        status in the next report, a corrected length), so adding a record twice is harmless.
+        """
+        key = project_key(project)
+        entry = self._entry(project)
+        old = self.entries.get(key)
+        if old is not None:
+            self._apply(old, -1)
+        self._apply(entry, 1)
+        self.entries[key] = entry
+
+    def remove(self, project: Dict) -> bool:
+        """
+        Takes back the project with this record's project_key; False when there is none.
+        """
+        old = self.entries.pop(project_key(project), None)
+        if old is None:
+            return False
+        self._apply(old, -1)
+        return True
+
+    def replace(self, old: Dict, new: Dict):
+        """
+        Swaps a record for a changed one, also when the change moves its project_key (a renamed project).
+        """
+        self.remove(old)
+        self.add(new)
+
+    def set_status(self, project: Dict, status: str) -> bool:
+        """
+        Moves a project added earlier to another status, keeping its km, groups and chainage; only
+        its identity fields are needed. False when the project is not in the rollups.
+        """
+        key = project_key(project)
+        old = self.entries.get(key)
+        if old is None:
+            return False
+        record = {"status": status}
+        status_rows = tuple(self.rollups["status"].row(key) for key in dimension_keys(record, "status"))
+        rows = tuple(status_rows if dimension == "status" else old[2][d] for d, dimension in enumerate(DIMENSIONS))
+        entry = (self._status(record), old[1], rows, old[3])
+        self._apply(old, -1)
+        self._apply(entry, 1)
+        self.entries[key] = entry
+        return True
+
+    def total(self, dimension: str, key: str) -> Dict:
+        """
+        Count and km of one group, overall and by status.
+        """
+        rollup = self.rollups[dimension]
+        if dimension == "nh":
+            key = (canonical_refs(key) or [key])[0]
+        row = rollup.rows.get(key)
+        count = rollup.count[row] if row is not None else np.zeros(len(self.statuses), dtype=np.int64)
+        km = rollup.km[row] if row is not None else np.zeros(len(self.statuses))
+        return {
+            "key": key,
+            "count": int(count.sum()),
+            "km": round(float(km.sum()), 3),
+            "by_status": {s: {"count": int(count[i]), "km": round(float(km[i]), 3)} for i, s in enumerate(self.statuses) if count[i]}
+        }
+
+    def table(self, dimension: str, top: Optional[int] = None) -> List[Dict]:
+        """
+        Every group of a dimension with its count and km, largest km first.
+        """
+        rollup = self.rollups[dimension]
+        n = len(rollup.keys)
+        km = rollup.km[:n].sum(axis=1)
+        count = rollup.count[:n].sum(axis=1)
+        order = [i for i in np.argsort(-km, kind='stable') if count[i]]
+        return [{"key": rollup.keys[i], "count": int(count[i]), "km": round(float(km[i]), 3)} for i in order[:top]]
+
+    def set_network(self, highways: Iterable[Dict]):
+        """
+        OSM network km per NH from highway segments (length_km, or the geometry when it is missing).
+        """
+        network: Dict[str, float] = {}
+        if isinstance(highways, HighwayStore):
+            lengths = np.asarray(highways.length_km)
+            refs = highways.strings["ref"]
+            segments = ((refs[i], lengths[i], i) for i in range(len(highways)))
+        else:
+            segments = ((h.get("ref"), h.get("length_km"), h) for h in highways)
+        ids_by_ref: Dict[Optional[str], List[str]] = {}
+        for ref, length, segment in segments:
+            if length is None or length != length:
+                coords = highways.coords_of(segment) if isinstance(highways, HighwayStore) else ((segment.get("geometry") or {}).get("coordinates") or [])
+                length = float(cumulative_km(np.asarray(coords, dtype=np.float64))[-1]) if len(coords) > 1 else 0.0
+            if ref not in ids_by_ref:
+                ids_by_ref[ref] = canonical_refs(ref)
+            for nh in ids_by_ref[ref]:
+                network[nh] = network.get(nh, 0.0) + float(length)
+        self.network_km = network
+
+    def coverage(self, nh: Optional[str] = None, active: Sequence[str] = ACTIVE_STATUSES) -> List[Dict]:
+        """
+        Share of each NH's network km under active projects (of one NH when given).
+
+        Projects with a chainage range count as the union of their ranges on the NH, so
+        overlapping projects cover a stretch once; projects without one fall back to their
+        summed length. "method" says which went in: "chainage", "length" or "chainage+length".
+        """
+        rollup = self.rollups["nh"]
+        columns = {self.status_index[s] for s in active if s in self.status_index}
+        spans: Dict[str, List[Tuple[float, float]]] = {}
+        lengths: Dict[str, float] = {}
+        for status, km, rows, span in self.entries.values():
+            if status not in columns:
+                continue
+            for row in rows[DIMENSIONS.index("nh")]:
+                ref = rollup.keys[row]
+                if span is None:
+                    lengths[ref] = lengths.get(ref, 0.0) + km
+                else:
+                    spans.setdefault(ref, []).append(span)
+        refs = [(canonical_refs(nh) or [nh])[0]] if nh else sorted(self.network_km)
+        result = []
+        for ref in refs:
+            chainage_km = union_km(spans.get(ref, []))
+            length_km = lengths.get(ref, 0.0)
+            active_km = chainage_km + length_km
+            network_km = self.network_km.get(ref, 0.0)
+            result.append({
+                "nh": ref,
+                "network_km": round(network_km, 3),
+                "active_km": round(active_km, 3),
+                "share": round(min(1.0, active_km / network_km), 4) if network_km else None,
+                "method": "+".join(name for name, used in (("chainage", ref in spans), ("length", ref in lengths)) if used) or None
+            })
+        return result
+
+    def save(self, path: str):
+        """
+        Writes the aggregates and each record's entry as one compressed .npz. An entry is
+        its key, status column, km and chainage range (NaN without one), plus its rows per
+        dimension as one flat array with offsets.
+        """
+        entries = list(self.entries.values())
+        arrays = {"statuses": np.array(self.statuses, dtype=str),
+                  "network_refs": np.array(sorted(self.network_km), dtype=str),
+                  "network_km": np.array([self.network_km[r] for r in sorted(self.network_km)]),
+                  "record_keys": np.array(list(self.entries), dtype=str),
+                  "record_status": np.array([status for status, _, _, _ in entries], dtype=np.int32),
+                  "record_km": np.array([km for _, km, _, _ in entries], dtype=np.float64),
+                  "record_span": np.array([span or (np.nan, np.nan) for _, _, _, span in entries], dtype=np.float64).reshape(-1, 2)}
+        for d, (dimension, rollup) in enumerate(self.rollups.items()):
+            n = len(rollup.keys)
+            arrays[f"{dimension}_keys"] = np.array(rollup.keys, dtype=str)
+            arrays[f"{dimension}_count"] = rollup.count[:n]
+            arrays[f"{dimension}_km"] = rollup.km[:n]
+            arrays[f"{dimension}_record_rows"] = np.array([row for _, _, rows, _ in entries for row in rows[d]], dtype=np.int32)
+            arrays[f"{dimension}_record_offsets"] = np.cumsum([0] + [len(rows[d]) for _, _, rows, _ in entries], dtype=np.int64)
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "ProjectRollups":
+        with np.load(path) as data:
+            if "record_span" not in data:
+                raise ValueError(f"{path} was saved by an older version without full per-record state; rebuild it from the project files")
+            rollups = cls(data["statuses"].tolist())
+            rollups.network_km = dict(zip(data["network_refs"].tolist(), data["network_km"].tolist()))
+            per_dimension = []
+            for dimension in DIMENSIONS:
+                rollups.rollups[dimension] = Rollup(len(rollups.statuses), data[f"{dimension}_keys"].tolist(),
+                                                    data[f"{dimension}_count"], data[f"{dimension}_km"])
+                rows, offsets = data[f"{dimension}_record_rows"].tolist(), data[f"{dimension}_record_offsets"].tolist()
+                per_dimension.append([tuple(rows[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1)])
+            spans = [None if lo != lo else (lo, hi) for lo, hi in data["record_span"].tolist()]
+            for i, (key, status, km) in enumerate(zip(data["record_keys"].tolist(), data["record_status"].tolist(), data["record_km"].tolist())):
+                rollups.entries[key] = (status, km, tuple(rows[i] for rows in per_dimension), spans[i])
+        return rollups
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build, update and read the km/count rollups of processed projects.")
+    parser.add_argument("input", nargs="*", help="Project JSON arrays to build the rollups from (highway_data.json, data_extraction/projects_metadata.json)")
+    parser.add_argument("--rollups", default=ROLLUP_FILE, help="The saved rollups")
+    parser.add_argument("--add", nargs="+", help="Project JSON arrays to add to the saved rollups instead of rebuilding; a project already in them is updated")
+    parser.add_argument("--network", help="Highway segments (state_highways.json or its store) for NH coverage")
+    parser.add_argument("--show", choices=DIMENSIONS + ["coverage"], help="Print one dimension's table, or NH coverage")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.input:
+        rollups = ProjectRollups.build(load_projects(args.input))
+    else:
+        rollups = ProjectRollups.load(args.rollups)
+    if args.add:
+        for project in load_projects(args.add):
+            rollups.add(project)
+    if args.network:
+        rollups.set_network(open_highways(args.network))
+    rollups.save(args.rollups)
+    print(f"Rollups of {rollups.records} projects saved to {args.rollups} in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+    if args.show == "coverage":
+        print(json.dumps(sorted(rollups.coverage(), key=lambda c: -(c["share"] or 0))[:args.top], indent=4))
+    elif args.show:
+        print(json.dumps(rollups.table(args.show, args.top), indent=4))
@@ -0,0 +1,178 @@
+import heapq
+import sys
+from typing import List, Dict, Tuple, Optional
+
+# Check for required libraries
+try:
+    import numpy as np
+    from shapely.geometry import Point
+    from shapely.ops import substring
+except ImportError as e:
+    print(f"Missing required library: {e}")
+    print("Please install them using: pip install numpy shapely")
+    sys.exit(1)
+
+from highway_index import HighwayIndex
+from nh_refs import canonical_refs
+from metrics import METRICS
+
+# Constants
+NODE_PRECISION = 7 # Decimal places used to decide that two way endpoints are the same node
+
+
+class RefGraph:
+    """
+    Compact (CSR) adjacency of the ways of one NH ref, stitched at shared endpoints.
+
+    Node i's outgoing edges are edge_to/edge_way/edge_forward[indptr[i]:indptr[i + 1]].
+    Every way contributes one edge in each direction, weighted by its length.
+    """
+
+    def __init__(self, positions: List[int], lines: List):
+        node_ids: Dict[Tuple[float, float], int] = {}
+
+        def node_for(coord):
+            key = (round(coord[0], NODE_PRECISION), round(coord[1], NODE_PRECISION))
+            return node_ids.setdefault(key, len(node_ids))
+
+        self.positions = positions
+        self.lines = lines
+        self.way_nodes = np.empty((len(lines), 2), dtype=np.int32)
+        self.way_length = np.empty(len(lines), dtype=np.float64)
+        for i, line in enumerate(lines):
+            coords = line.coords
+            self.way_nodes[i] = (node_for(coords[0]), node_for(coords[-1]))
+            self.way_length[i] = line.length
+        self.num_nodes = len(node_ids)
+
+        # Edge arrays, sorted by source node
+        src = np.concatenate([self.way_nodes[:, 0], self.way_nodes[:, 1]])
+        dst = np.concatenate([self.way_nodes[:, 1], self.way_nodes[:, 0]])
+        way = np.concatenate([np.arange(len(lines)), np.arange(len(lines))]).astype(np.int32)
+        forward = np.concatenate([np.ones(len(lines), dtype=bool), np.zeros(len(lines), dtype=bool)])
+        order = np.argsort(src, kind='stable')
+        self.edge_to = dst[order]
+        self.edge_way = way[order]
+        self.edge_forward = forward[order]
+        self.indptr = np.zeros(self.num_nodes + 1, dtype=np.int64)
+        np.add.at(self.indptr, src + 1, 1)
+        np.cumsum(self.indptr, out=self.indptr)
+
+    def shortest_path(self, sources: Dict[int, float], targets: Dict[int, float]) -> Optional[Tuple[int, List[Tuple[int, bool]]]]:
+        """
+        Multi-source Dijkstra. Returns (target node, [(way, forward), ...]) minimizing
+        source offset + path length + target offset, or None if no target is reachable.
+        """
+        dist = {node: cost for node, cost in sources.items()}
+        prev: Dict[int, Tuple[int, int, bool]] = {}
+        heap = [(cost, node) for node, cost in sources.items()]
+        heapq.heapify(heap)
+
+        best_cost = float('inf')
+        best_target = None
+        while heap:
+            cost, node = heapq.heappop(heap)
+            if cost > dist.get(node, float('inf')) or cost >= best_cost:
+                continue
+            if node in targets and cost + targets[node] < best_cost:
+                best_cost = cost + targets[node]
+                best_target = node
+            for e in range(self.indptr[node], self.indptr[node + 1]):
+                nxt = int(self.edge_to[e])
+                way = int(self.edge_way[e])
+                new_cost = cost + self.way_length[way]
+                if new_cost < dist.get(nxt, float('inf')):
+                    dist[nxt] = new_cost
+                    prev[nxt] = (node, way, bool(self.edge_forward[e]))
+                    heapq.heappush(heap, (new_cost, nxt))
+
+        if best_target is None:
+            return None
+
+        # Source nodes only get a predecessor if another route reached them more cheaply
+        path = []
+        node = best_target
+        while node in prev:
+            parent, way, forward = prev[node]
+            path.append((way, forward))
+            node = parent
+        path.reverse()
+        return best_target, path
+
+
+class RouteGraph:
+    """
+    Routing graphs over the highway index, one per canonical NH ref, built once per run.
+
+    A project's start and end snap to the nearest way of its NH; the polyline is
+    the partial start way, the shortest chain of whole ways, and the partial end way.
+    """
+
+    def __init__(self, highway_index: HighwayIndex):
+        self.index = highway_index
+        self.graphs: Dict[str, RefGraph] = {
+            key: RefGraph(positions, [highway_index.lines[i] for i in positions])
+            for key, positions in highway_index.ref_map.items()
+        }
+
+    def route(self, nh_ref: str, start_coords: Tuple[float, float], end_coords: Tuple[float, float]) -> Optional[Dict]:
+        """
+        Returns the GeoJSON LineString along the NH between two (lat, lon) points, or None
+        if the NH is unknown or the two points snap to disconnected parts of it.
+        """
+        p1 = Point(start_coords[1], start_coords[0])
+        p2 = Point(end_coords[1], end_coords[0])
+
+        for key in canonical_refs(nh_ref):
+            graph = self.graphs.get(key)
+            if graph is None:
+                continue
+            tree = self.index.trees[key]
+            start_way = int(tree.query_nearest(p1)[0])
+            end_way = int(tree.query_nearest(p2)[0])
+            coords = self._route_in(graph, start_way, graph.lines[start_way].project(p1), end_way, graph.lines[end_way].project(p2))
+            METRICS.count("shapely.strtree_query", 2)
+            METRICS.count("shapely.project", 2)
+            if coords:
+                return {"type": "LineString", "coordinates": coords}
+        return None
+
+    def _route_in(self, graph: RefGraph, start_way: int, d_start: float, end_way: int, d_end: float) -> Optional[List]:
+        start_line = graph.lines[start_way]
+        end_line = graph.lines[end_way]
+        if start_way == end_way:
+            METRICS.count("shapely.substring")
+            return [list(c) for c in substring(start_line, d_start, d_end).coords]
+
+        s_from, s_to = graph.way_nodes[start_way]
+        e_from, e_to = graph.way_nodes[end_way]
+        start_len = graph.way_length[start_way]
+        end_len = graph.way_length[end_way]
+
+        # Leave the start way through either endpoint, enter the end way through either endpoint
+        sources = {}
+        for node, cost in ((int(s_from), d_start), (int(s_to), start_len - d_start)):
+            sources[node] = min(cost, sources.get(node, float('inf')))
+        targets = {}
+        for node, cost in ((int(e_from), d_end), (int(e_to), end_len - d_end)):
+            targets[node] = min(cost, targets.get(node, float('inf')))
+
+        found = graph.shortest_path(sources, targets)
+        if found is None:
+            return None
+        target, path = found
+
+        first_node = graph.way_nodes[path[0][0]][0 if path[0][1] else 1] if path else target
+        pieces = [substring(start_line, d_start, 0 if first_node == s_from else start_len)]
+        for way, forward in path:
+            line = graph.lines[way]
+            pieces.append(line if forward else substring(line, line.length, 0))
+        pieces.append(substring(end_line, 0 if target == e_from else end_len, d_end))
+
+        METRICS.count("shapely.substring", len(pieces))
+        coords = []
+        for piece in pieces:
+            for c in piece.coords:
+                if not coords or coords[-1] != list(c):
+                    coords.append(list(c))
+        return coords if len(coords) >= 2 else None
@@ -0,0 +1,269 @@
+import heapq
+import sys
+from typing import Dict, List, Optional, Sequence
+
+# Check for required libraries
+try:
+    import numpy as np
+except ImportError as e:
+    print(f"Missing required library: {e}")
+    print("Please install them using: pip install numpy")
+    sys.exit(1)
+
+# Constants
+TILE_SIZE = 256
+SIMPLIFY_PIXELS = 1.0 # Tolerance in screen pixels at the zoom a level of detail is drawn at
+QUANT_SCALE = 10 ** 6 # Fixed-point scale: 1e-6 degrees is ~0.1 m
+OUTPUT_TOLERANCE = 1e-5 # ~1 m; what processed geometries are simplified to before they are written
+LOD_BANDS = [6, 9, 12, 16] # Highest zoom of each band; the last band is drawn at every zoom above it
+
+
+def tolerance_for_zoom(z: int) -> float:
+    """
+    Degrees covered by SIMPLIFY_PIXELS at the equator for zoom z.
+    """
+    return SIMPLIFY_PIXELS * 360.0 / (TILE_SIZE * 2 ** z)
+
+def douglas_peucker(coords: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Ramer-Douglas-Peucker: keeps the vertices that deviate more than `tolerance` from the
+    chord of their span.
+    """
+    if len(coords) < 3 or tolerance <= 0:
+        return coords
+    return coords[_douglas_peucker_mask(coords, tolerance, np.zeros(1, dtype=np.int64))]
+
+def _douglas_peucker_mask(coords: np.ndarray, tolerance: float, starts: np.ndarray) -> np.ndarray:
+    """
+    Keep-mask of Douglas-Peucker over one or more polylines laid end to end, `starts` being
+    the index each one begins at. Every open span of a pass is split at once, so the work is
+    a few vectorized passes over all the lines rather than one numpy call per span.
+    """
+    n = len(coords)
+    keep = np.zeros(n, dtype=bool)
+    keep[starts] = True
+    keep[starts[1:] - 1] = True
+    keep[-1] = True
+    positions = np.arange(n)
+    while not keep.all():
+        kept = np.flatnonzero(keep)
+        span = np.minimum(np.searchsorted(kept, positions, side='right') - 1, len(kept) - 2)
+        a = coords[kept[span]]
+        ab = coords[kept[span + 1]] - a
+        ap = coords - a
+        seg_len2 = np.einsum('ij,ij->i', ab, ab)
+        # Distance to the chord as a segment, not an infinite line, so hairpins keep their tips
+        t = np.clip(np.einsum('ij,ij->i', ap, ab) / np.where(seg_len2 > 0, seg_len2, 1), 0, 1)
+        dists = np.hypot(*(ap - t[:, None] * ab).T)
+        dists[keep] = 0
+
+        span_max = np.maximum.reduceat(dists, kept[:-1])
+        candidates = np.flatnonzero((dists == span_max[span]) & (dists > tolerance))
+        if len(candidates) == 0:
+            return keep
+        # First vertex at the maximum of each span, as the recursive version picks
+        _, first = np.unique(span[candidates], return_index=True)
+        keep[candidates[first]] = True
+    return keep
+
+def visvalingam(coords: np.ndarray, min_area: float) -> np.ndarray:
+    """
+    Visvalingam-Whyatt: repeatedly drops the vertex whose triangle with its neighbours
+    has the smallest area, until every remaining triangle is at least `min_area`.
+    """
+    n = len(coords)
+    if n < 3 or min_area <= 0:
+        return coords
+
+    def area(i: int, j: int, k: int) -> float:
+        (x1, y1), (x2, y2), (x3, y3) = coords[i], coords[j], coords[k]
+        return abs((x2 - x1) * (y3 - y1) - (x3 - x1) * (y2 - y1)) / 2.0
+
+    prev = list(range(-1, n - 1))
+    nxt = list(range(1, n + 1))
+    areas = [float('inf')] * n
+    heap = []
+    for i in range(1, n - 1):
+        areas[i] = area(i - 1, i, i + 1)
+        heap.append((areas[i], i))
+    heapq.heapify(heap)
+
+    removed = np.zeros(n, dtype=bool)
+    while heap:
+        a, i = heapq.heappop(heap)
+        if removed[i] or a != areas[i]:
+            continue # Stale entry, the vertex's area changed after it was pushed
+        if a >= min_area:
+            break
+        removed[i] = True
+        p, q = prev[i], nxt[i]
+        nxt[p], prev[q] = q, p
+        for j in (p, q):
+            if 0 < j < n - 1:
+                # A neighbour's area never drops below the one just removed, so the order stays monotone
+                areas[j] = max(area(prev[j], j, nxt[j]), a)
+                heapq.heappush(heap, (areas[j], j))
+    return coords[~removed]
+
+def simplify_coords(coords: Sequence[Sequence[float]], tolerance: float, method: str = "dp") -> np.ndarray:
+    """
+    Simplifies a [lon, lat] polyline with Douglas-Peucker ("dp") or Visvalingam ("vw").
+    For "vw" the tolerance is turned into the area of a triangle of that height.
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    if method == "vw":
+        return visvalingam(coords, tolerance * tolerance / 2.0)
+    return douglas_peucker(coords, tolerance)
+
+def simplify_many(lines: List[np.ndarray], tolerance: float, method: str = "dp") -> List[np.ndarray]:
+    """
+    simplify_coords over a batch of polylines. Douglas-Peucker runs on all of them together.
+    """
+    if method != "dp" or tolerance <= 0 or not lines:
+        return [simplify_coords(line, tolerance, method) for line in lines]
+    lengths = np.array([len(line) for line in lines])
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    coords = np.concatenate(lines)
+    keep = _douglas_peucker_mask(coords, tolerance, starts)
+    return _split(coords[keep], np.repeat(np.arange(len(lines)), lengths)[keep], len(lines))
+
+def _split(values: np.ndarray, line_ids: np.ndarray, num_lines: int) -> List[np.ndarray]:
+    counts = np.bincount(line_ids, minlength=num_lines)
+    return np.split(values, np.cumsum(counts)[:-1])
+
+def quantize(coords: np.ndarray, scale: int = QUANT_SCALE) -> np.ndarray:
+    """
+    Fixed-point integer coordinates; consecutive duplicates produced by rounding are dropped.
+    """
+    q = np.round(np.asarray(coords, dtype=np.float64) * scale).astype(np.int64)
+    if len(q) > 1:
+        q = q[np.concatenate([[True], np.any(q[1:] != q[:-1], axis=1)])]
+    return q
+
+def delta_encode(q: np.ndarray) -> List[int]:
+    """
+    Flattens quantized coordinates to [x0, y0, dx1, dy1, ...], which keeps the numbers short.
+    """
+    if len(q) == 0:
+        return []
+    return np.diff(q, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel().tolist()
+
+def delta_decode(flat: Sequence[int], scale: int = QUANT_SCALE) -> List[List[float]]:
+    q = np.cumsum(np.asarray(flat, dtype=np.int64).reshape(-1, 2), axis=0)
+    return (q / scale).tolist()
+
+def compact_geometry(geometry: Optional[Dict], tolerance: float = OUTPUT_TOLERANCE, method: str = "dp") -> Optional[Dict]:
+    """
+    Simplifies a GeoJSON LineString to `tolerance` and rounds it to the quantization grid.
+    Other geometry types are returned unchanged.
+    """
+    if not geometry or geometry.get('type') != 'LineString' or len(geometry.get('coordinates', [])) < 2:
+        return geometry
+    q = quantize(simplify_coords(geometry['coordinates'], tolerance, method))
+    if len(q) < 2:
+        q = quantize(np.asarray(geometry['coordinates'])[[0, -1]])
+    return {"type": "LineString", "coordinates": (q / QUANT_SCALE).tolist()}
+
+def encode_lods(coords: Sequence[Sequence[float]], bands: List[int] = LOD_BANDS, method: str = "dp", delta: bool = True) -> List[list]:
+    """
+    Precomputes one level of detail per zoom band: [[max_zoom, coords], ...] from coarse to fine.
+    Each level is simplified for the highest zoom of its band and quantized; with `delta`
+    its coordinates are a flat delta-encoded integer list (see delta_encode), otherwise
+    [[x, y], ...] fixed-point pairs.
+    """
+    return encode_lods_many([coords], bands, method, delta)[0]
+
+def encode_lods_many(coords_list: List[Sequence[Sequence[float]]], bands: List[int] = LOD_BANDS, method: str = "dp", delta: bool = True) -> List[List[list]]:
+    """
+    encode_lods for a batch of polylines, simplified and quantized together.
+    """
+    lines = [np.asarray(coords, dtype=np.float64).reshape(-1, 2) for coords in coords_list]
+    lods = [[] for _ in lines]
+    if not lines:
+        return lods
+    # Finest first, each coarser level simplified from the previous one, which is much shorter than the input
+    for max_zoom in sorted(bands, reverse=True):
+        lines = simplify_many(lines, tolerance_for_zoom(max_zoom), method)
+        for line_lods, encoded in zip(lods, _quantize_many(lines, delta)):
+            line_lods.append([max_zoom, encoded])
+    return [line_lods[::-1] for line_lods in lods]
+
+def _quantize_many(lines: List[np.ndarray], delta: bool) -> List[list]:
+    """
+    quantize (and delta_encode) over a batch of polylines in single numpy passes.
+    """
+    lengths = np.array([len(line) for line in lines])
+    line_ids = np.repeat(np.arange(len(lines)), lengths)
+    q = np.round(np.concatenate(lines) * QUANT_SCALE).astype(np.int64)
+    first = np.ones(len(q), dtype=bool)
+    first[1:] = line_ids[1:] != line_ids[:-1]
+    keep = first.copy()
+    keep[1:] |= np.any(q[1:] != q[:-1], axis=1)
+    q, line_ids, first = q[keep], line_ids[keep], first[keep]
+    if delta:
+        d = q.copy()
+        d[1:] -= q[:-1]
+        d[first] = q[first]
+        return [part.ravel().tolist() for part in _split(d, line_ids, len(lines))]
+    return [part.tolist() for part in _split(q, line_ids, len(lines))]
+
+def encode_record(record: Dict, bands: List[int] = LOD_BANDS, method: str = "dp") -> Dict:
+    """
+    Replaces a record's LineString geometry with delta-encoded levels of detail under 'lods',
+    and a Point geometry (a project at one chainage) with its [lon, lat] under 'point'.
+    """
+    return encode_records([record], bands, method)[0]
+
+def encode_records(records: List[Dict], bands: List[int] = LOD_BANDS, method: str = "dp") -> List[Dict]:
+    """
+    encode_record for a batch of records, sharing the simplification passes.
+    """
+    out = []
+    lines = []
+    for record in records:
+        geometry = record.get('geometry')
+        slim = {k: v for k, v in record.items() if k != 'geometry'}
+        if geometry and geometry.get('type') == 'LineString' and geometry.get('coordinates'):
+            lines.append((slim, geometry['coordinates']))
+        elif geometry and geometry.get('type') == 'Point' and geometry.get('coordinates'):
+            slim['point'] = (quantize([geometry['coordinates']])[0] / QUANT_SCALE).tolist()
+        out.append(slim)
+    for (slim, _), lods in zip(lines, encode_lods_many([coords for _, coords in lines], bands, method)):
+        slim['lods'] = lods
+    return out
+
+# Browser side of encode_record: decodes a level lazily and swaps it in when the zoom band changes
+LOD_DECODER_JS = f"""
+        var LOD_SCALE = {QUANT_SCALE};
+        function decodeLod(flat) {{
+            var latlngs = new Array(flat.length / 2), x = 0, y = 0;
+            for (var i = 0; i < flat.length; i += 2) {{
+                x += flat[i]; y += flat[i + 1];
+                latlngs[i / 2] = [y / LOD_SCALE, x / LOD_SCALE];
+            }}
+            return latlngs;
+        }}
+        function lodIndex(lods, zoom) {{
+            for (var i = 0; i < lods.length; i++) {{
+                if (zoom <= lods[i][0]) return i;
+            }}
+            return lods.length - 1;
+        }}
+        function lodLatLngs(record, zoom) {{
+            var i = lodIndex(record.lods, zoom);
+            record._decoded = record._decoded || [];
+            if (!record._decoded[i]) record._decoded[i] = decodeLod(record.lods[i][1]);
+            record._lod = i;
+            return record._decoded[i];
+        }}
+        function trackLods(map, entries) {{
+            map.on('zoomend', function() {{
+                var zoom = map.getZoom();
+                entries.forEach(function(entry) {{
+                    if (lodIndex(entry.record.lods, zoom) !== entry.record._lod) {{
+                        entry.polyline.setLatLngs(lodLatLngs(entry.record, zoom));
+                    }}
+                }});
+            }});
+        }}
+"""
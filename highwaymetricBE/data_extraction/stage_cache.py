@@ -0,0 +1,170 @@
+import collections
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Check for required libraries
+try:
+    import numpy as np
+except ImportError as e:
+    print(f"Missing required library: {e}")
+    print("Please install them using: pip install numpy")
+    sys.exit(1)
+
+from nh_refs import canonical_refs
+from highway_store import HighwayStore
+from metrics import METRICS
+
+# Constants
+STAGE_CACHE_FILE = "stage_cache.sqlite"
+COMMIT_EVERY = 500
+MAX_PENDING = 1000 # Items a read-ahead pipeline may pull past the first unanswered miss
+# Bump a stage's version whenever its code changes what it produces; old entries then stop matching
+STAGE_VERSIONS = {"extract": 4, "match": 5}
+
+
+def content_key(*parts) -> str:
+    """
+    SHA-256 of the canonical JSON of `parts`; equal content always gives the same key.
+    """
+    body = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+class StageCache:
+    """
+    Persistent SQLite store of stage artifacts, addressed by (stage, content key).
+
+    Keys hash everything a stage's output depends on (its input record, the data it reads
+    and the stage version), so an entry is valid for as long as its key can be recomputed;
+    nothing is ever invalidated explicitly. Writes are committed in batches.
+    """
+
+    def __init__(self, path: str = STAGE_CACHE_FILE):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.uncommitted = 0
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS artifacts (
+                stage TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (stage, key)
+            )
+        """)
+        self.conn.commit()
+
+    def key(self, stage: str, *parts) -> str:
+        return content_key(stage, STAGE_VERSIONS.get(stage, 0), *parts)
+
+    def get(self, stage: str, key: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM artifacts WHERE stage = ? AND key = ?", (stage, key)).fetchone()
+        METRICS.count(f"stage_cache.{stage}.{'hits' if row else 'misses'}")
+        return json.loads(row[0]) if row else None
+
+    def put(self, stage: str, key: str, value: Dict):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO artifacts (stage, key, value, created_at) VALUES (?, ?, ?, ?)",
+                (stage, key, json.dumps(value), time.time())
+            )
+            self.uncommitted += 1
+            if self.uncommitted >= COMMIT_EVERY:
+                self.conn.commit()
+                self.uncommitted = 0
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+
+
+def highway_fingerprints(state_highways: Union[List[Dict], HighwayStore]) -> Dict[str, str]:
+    """
+    Content hash of the segments of every canonical ref ID (ids and coordinates, in file order).
+    A project's match only reads the segments of its own NH, so a change to one state's
+    OSM data only changes the fingerprints of the refs it touches.
+    """
+    hashes = {}
+    if isinstance(state_highways, HighwayStore):
+        rows = ((int(state_highways.ids[i]), state_highways.ref(i), state_highways.coords_of(i)) for i in range(len(state_highways)))
+    else:
+        rows = ((hw.get('id') or 0, hw.get('ref'), ((hw.get('geometry') or {}).get('coordinates')) or []) for hw in state_highways)
+    for segment_id, ref, coords in rows:
+        data = str(segment_id).encode('utf-8') + np.ascontiguousarray(coords, dtype=np.float64).tobytes()
+        for key in canonical_refs(ref or ''):
+            hashes.setdefault(key, hashlib.sha256()).update(data)
+    return {key: h.hexdigest() for key, h in hashes.items()}
+
+def km_post_fingerprints(km_posts: Optional[List[Dict]]) -> Dict[str, str]:
+    """
+    Content hash of the km-posts of every canonical ref ID.
+    """
+    by_key: Dict[str, List[Dict]] = {}
+    for post in km_posts or []:
+        for key in canonical_refs(str(post.get('nh_number', ''))):
+            by_key.setdefault(key, []).append(post)
+    return {key: content_key(posts) for key, posts in by_key.items()}
+
+def cached_in_order(items: Iterable, lookup: Callable[[object], Tuple[str, Optional[Dict]]], compute: Callable[[Iterator], Iterator], store: Callable[[str, object], None], restore: Callable[[object, Dict], object], max_pending: int = MAX_PENDING) -> Iterator:
+    """
+    Streams `items` through a cache without changing their order.
+
+    lookup(item) gives (key, cached value or None). Misses are fed lazily to the
+    `compute` pipeline, which must yield one result per miss in order; each result is
+    saved with store(key, result). Hits skip the pipeline and come out as restore(item, value),
+    straight away while no miss is waiting on the pipeline.
+
+    A pipeline that reads ahead (ordered_map) stops being fed once `max_pending` items wait
+    behind its first result, and is started again on the next miss, so a long run of hits
+    after a miss is not all held in memory.
+    """
+    source = iter(items)
+    pending = collections.deque() # (item, key, cached value) read but not yet yielded, in input order
+    queued = collections.deque() # Misses read here, for the pipeline to take next
+
+    def read() -> Optional[Tuple]:
+        for item in source:
+            key, value = lookup(item)
+            pending.append((item, key, value))
+            return pending[-1]
+        return None
+
+    def misses():
+        while True:
+            if queued:
+                yield queued.popleft()
+                continue
+            if len(pending) >= max_pending:
+                return
+            entry = read()
+            if entry is None:
+                return
+            if entry[2] is None:
+                yield entry[0]
+
+    results = iter(())
+    while True:
+        while pending and pending[0][2] is not None:
+            item, _, value = pending.popleft()
+            yield restore(item, value)
+        if not pending:
+            entry = read()
+            if entry is None:
+                break
+            if entry[2] is not None:
+                continue
+            queued.append(entry[0])
+        result = next(results, None)
+        if result is None: # The pipeline ran dry after a stop; the first waiting miss is still queued
+            results = compute(misses())
+            result = next(results)
+        _, key, _ = pending.popleft()
+        store(key, result)
+        yield result
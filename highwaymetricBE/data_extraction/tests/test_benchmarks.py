@@ -0,0 +1,119 @@
+"""
+The equivalence checks of the benchmark scripts, on datasets small enough to run with the tests:
+each fast path must give what the baseline it is timed against gives.
+"""
+import json
+import random
+import threading
+
+import numpy as np
+import pytest
+
+from benchmark_chainage_index import all_pairs as all_range_pairs, linear_at
+from benchmark_entity_resolution import all_pairs as all_name_pairs, pairwise_scores
+from benchmark_field_extraction import gazetteer_names, large_extractor, legacy_extract, nh_mismatches
+from benchmark_geometry_kernel import calculate_length, kernel_lengths
+from benchmark_nhai_stream import legacy_fetch
+from benchmark_project_query import QUERIES, linear_query
+from benchmark_project_rollups import QUERIES as ROLLUP_QUERIES, apply_updates, generate_rollup_projects, rescan, rollups_agree
+from benchmark_segment_matching import exact_ref_agreement, linear_scan_match
+from benchmark_simplification import check_round_trip, round_trip_bound
+from benchmark_suite import (generate_chainage_projects, generate_contractor_names, generate_project_records, generate_ref_highways,
+                             generate_report_texts, generate_segment_queries, generate_segments, generate_state_highways)
+from chainage_index import ChainageIndex
+from entity_resolution import ContractorResolver, MATCH_THRESHOLD
+from fetch_nhai_data import stream_highway_data, write_records
+from field_extractor import FieldExtractor
+from highway_index import HighwayIndex
+from highway_store import HighwayStore, convert, store_path_for
+from nhai_stub_server import generate_records, serve
+from project_query import ProjectQuery
+from project_rollups import ProjectRollups
+from simplify import LOD_BANDS, encode_records
+
+
+def test_project_query_matches_linear_scan():
+    projects = generate_project_records(3000)
+    engine = ProjectQuery(projects)
+    for label, filters in QUERIES + [("nh 1", {"nh": "NH-1"})]:
+        assert engine.select(**filters).tolist() == linear_query(projects, **filters), label
+
+def test_chainage_tree_and_sweep_match_brute_force():
+    projects = generate_chainage_projects(2000, highways=20)
+    index = ChainageIndex(projects)
+    rng = random.Random(3)
+    for _ in range(50):
+        nh, km = str(rng.randint(1, 20)), rng.uniform(0, 1500)
+        assert index.at(nh, km) == linear_at(projects, nh, km)
+    sample = ChainageIndex(generate_chainage_projects(300, highways=1))
+    assert len(sample.conflicts()) == all_range_pairs(sample)
+
+def test_entity_resolution_precision():
+    names = generate_contractor_names(300)
+    resolver = ContractorResolver()
+    precision, recall = pairwise_scores(names, resolver.resolve(n for n, _ in names))
+    assert precision >= 0.99 and recall >= 0.95
+    # LSH only skips comparisons: every pair it merges is one all-pairs comparison merges too
+    assert resolver.stats["merged_pairs"] <= all_name_pairs([n for n, _ in names], MATCH_THRESHOLD)
+
+def test_rollups_incremental_match_rebuild_and_rescan():
+    projects = generate_rollup_projects(3000, seed=7)
+    rollups = ProjectRollups.build(projects[:-300])
+    apply_updates(rollups, projects, projects[-300:], 300, seed=8)
+    assert rollups_agree(rollups, ProjectRollups.build(projects))
+    for dimension, key in ROLLUP_QUERIES:
+        expected = rescan(projects, dimension, key)
+        assert rollups.total(dimension, key)["km"] == pytest.approx(expected, abs=1e-3 * max(1.0, expected))
+
+def test_streamed_fetch_writes_the_legacy_file(tmp_path):
+    server = serve(generate_records(1200), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    try:
+        assert legacy_fetch(url, str(tmp_path / "legacy.json")) == 1200
+        assert write_records(stream_highway_data(url), str(tmp_path / "stream.json")) == 1200
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert (tmp_path / "legacy.json").read_bytes() == (tmp_path / "stream.json").read_bytes()
+
+def test_simplification_round_trip_within_bounds():
+    segments = generate_segments(30, 400)
+    worst = check_round_trip(segments, encode_records(segments), sample=30)
+    assert all(worst[band] <= round_trip_bound(band) for band in range(len(LOD_BANDS)))
+
+def test_field_extractor_agrees_with_legacy():
+    records = generate_report_texts(1000)
+    extractor = FieldExtractor()
+    assert nh_mismatches(records, extractor) == 0
+    for text in records[:200]:
+        legacy, fields = legacy_extract(text), extractor.extract(text)
+        assert fields["state"] == legacy["state"]
+    # A large gazetteer still finds the states
+    big = large_extractor(gazetteer_names(300, seed=43))
+    assert [big.extract(t)["state"] for t in records[:200]] == [extractor.extract(t)["state"] for t in records[:200]]
+
+def test_geometry_kernel_matches_scalar_loops():
+    highways = generate_state_highways(300, 30)
+    index = HighwayIndex(highways)
+    scalar = [calculate_length(hw['geometry']['coordinates']) for hw in highways]
+    assert np.max(np.abs(kernel_lengths(index) - scalar)) < 1e-6
+    projects = generate_segment_queries(highways, 100, jitter=0.01, seed=5)
+    assert index.find_best_segments(projects) == [index.find_best_segment(ref, s, e) for ref, s, e in projects]
+
+def test_highway_store_rows_match_json(tmp_path):
+    highways = generate_state_highways(200, 20)
+    json_path = str(tmp_path / "state_highways.json")
+    with open(json_path, 'w') as f:
+        json.dump(highways, f)
+    convert(json_path)
+    store = HighwayStore(store_path_for(json_path))
+    assert len(store) == len(highways)
+    assert all(store[i] == highways[i] for i in range(len(highways)))
+
+def test_segment_index_matches_exact_ref_scan():
+    highways = generate_ref_highways(10, 20, 20)
+    projects = generate_segment_queries(highways, 40)
+    index = HighwayIndex(highways)
+    assert exact_ref_agreement(index, projects) == len(projects)
+    assert all(linear_scan_match(highways, *p) is not None for p in projects)
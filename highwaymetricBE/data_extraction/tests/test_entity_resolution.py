@@ -0,0 +1,43 @@
+import entity_resolution
+from entity_resolution import ContractorResolver, annotate_projects, load_registry
+from import_data import resolve_contractors
+
+
+def projects_of(names):
+    return [{"concessionaire": name} for name in names]
+
+def test_ids_survive_an_earlier_sorting_misspelling():
+    first = annotate_projects(projects_of(["Jaabilli Constructions Pvt Ltd"] * 3 + ["Sri Balaji Infrastructure Ltd"]))
+    ids = {e["name"]: e["id"] for e in first}
+
+    # The typo sorts before the registered spelling and is now the most frequent one
+    later = projects_of(["Jaabili Constructions Pvt Ltd"] * 5 + ["Jaabilli Constructions Pvt Ltd", "Sri Balaji Infrastructure Ltd"])
+    second = annotate_projects(later, registry=first)
+    assert later[0]["contractor_id"] == later[5]["contractor_id"] == ids["Jaabilli Constructions Pvt Ltd"]
+    assert later[6]["contractor_id"] == ids["Sri Balaji Infrastructure Ltd"]
+    assert len(second) == 2
+    # The registered name is kept too, though the typo is now the most frequent spelling
+    assert later[0]["contractor_name"] == "Jaabilli Constructions Pvt Ltd"
+    assert {e["name"] for e in second} == set(ids)
+
+def test_new_ids_come_from_the_most_frequent_spelling():
+    one = ContractorResolver().resolve(["Jaabilli Constructions Pvt Ltd"] * 3)
+    both = ContractorResolver().resolve(["Jaabilli Constructions Pvt Ltd"] * 3 + ["Jaabili Constructions Ltd"])
+    assert both["Jaabili Constructions Ltd"]["id"] == one["Jaabilli Constructions Pvt Ltd"]["id"]
+
+def test_entities_missing_from_a_run_keep_their_ids():
+    first = annotate_projects(projects_of(["Sri Balaji Infrastructure Ltd"]))
+    second = annotate_projects(projects_of(["Jaabilli Constructions Pvt Ltd"]), registry=first)
+    assert [e["count"] for e in second] == [1, 0]
+    third = projects_of(["Sri Balaji Infrastructure Ltd"])
+    annotate_projects(third, registry=second)
+    assert third[0]["contractor_id"] == first[0]["id"]
+
+def test_import_saves_the_registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(entity_resolution, "REGISTRY_FILE", str(tmp_path / "contractors.json"))
+    first = projects_of(["Sri Balaji Infrastructure Ltd"])
+    resolve_contractors(first)
+    second = projects_of(["Jaabilli Constructions Pvt Ltd", "Sri Balaji Infrastructure Ltd"])
+    resolve_contractors(second)
+    assert second[1]["contractor_id"] == first[0]["contractor_id"]
+    assert len(load_registry(str(tmp_path / "contractors.json"))) == 2
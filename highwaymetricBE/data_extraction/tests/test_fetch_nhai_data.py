@@ -0,0 +1,103 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+
+import fetch_nhai_data
+from fetch_nhai_data import SyncState, sync_highway_data
+from nhai_stub_server import generate_records, serve
+
+
+@pytest.fixture
+def stub():
+    """
+    A stand-in datalake on a free port; tests edit `server.records` in place between syncs.
+    """
+    records = generate_records(50)
+    server = serve(records, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.records = records
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def read_changes(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+def sync(stub, tmp_path, states=None):
+    changes_file = tmp_path / "changes.ndjson"
+    before = len(read_changes(changes_file)) if changes_file.exists() else 0
+    totals = sync_highway_data(stub.url, states, str(tmp_path / "state.sqlite"), str(changes_file))
+    return totals, read_changes(changes_file)[before:]
+
+def test_first_sync_inserts_everything(stub, tmp_path):
+    totals, changes = sync(stub, tmp_path)
+    assert totals["insert"] == 50 and totals["update"] == 0 and totals["delete"] == 0
+    assert {c["key"] for c in changes} == {f"UPC:{r['UPC']}" for r in stub.records}
+
+def test_unchanged_data_is_not_modified(stub, tmp_path):
+    sync(stub, tmp_path)
+    totals, changes = sync(stub, tmp_path)
+    assert totals["unchanged_partitions"] == 1
+    assert changes == []
+
+def test_changed_added_and_deleted_records(stub, tmp_path):
+    sync(stub, tmp_path)
+    stub.records[0]["Length"] += 1
+    deleted = stub.records.pop(1)
+    added = dict(stub.records[2], UPC="UPC9999999")
+    stub.records.append(added)
+
+    totals, changes = sync(stub, tmp_path)
+    assert (totals["insert"], totals["update"], totals["delete"]) == (1, 1, 1)
+    by_op = {c["op"]: c for c in changes}
+    assert by_op["update"]["key"] == f"UPC:{stub.records[0]['UPC']}"
+    assert by_op["update"]["record"]["Length"] == stub.records[0]["Length"]
+    assert by_op["insert"]["key"] == "UPC:UPC9999999"
+    assert by_op["delete"]["key"] == f"UPC:{deleted['UPC']}"
+
+    totals, changes = sync(stub, tmp_path)
+    assert changes == [] and totals["unchanged_partitions"] == 1
+
+def test_failure_mid_stream_leaves_no_partial_changes(stub, tmp_path, monkeypatch):
+    decode = fetch_nhai_data.iter_nested_array
+
+    def truncated(chunks, key, source):
+        for i, record in enumerate(decode(chunks, key, source)):
+            if i == 10:
+                raise ValueError("truncated body")
+            yield record
+
+    monkeypatch.setattr(fetch_nhai_data, "iter_nested_array", truncated)
+    totals, changes = sync(stub, tmp_path)
+    assert changes == [] and totals["insert"] == 0
+    monkeypatch.undo()
+    totals, changes = sync(stub, tmp_path)
+    assert totals["insert"] == 50 and len(changes) == 50
+
+def test_record_moving_between_partitions_is_kept(stub, tmp_path):
+    # The new partition is synced before the old one, so the old one's delete runs last
+    states = ["36", "28"]
+    sync(stub, tmp_path, states)
+    moved = next(r for r in stub.records if r["St_Code"] == "28")
+    moved["St_Code"], moved["St_Name"] = "36", "Telangana"
+
+    totals, changes = sync(stub, tmp_path, states)
+    key = f"UPC:{moved['UPC']}"
+    assert [(c["op"], c["partition"]) for c in changes if c["key"] == key] == [("insert", "36"), ("delete", "28")]
+    state = SyncState(str(tmp_path / "state.sqlite"))
+    assert key in state.hashes("36") and key not in state.hashes("28")
+    state.close()
+
+def test_old_state_file_is_migrated(stub, tmp_path):
+    conn = sqlite3.connect(tmp_path / "state.sqlite")
+    conn.execute("CREATE TABLE records (key TEXT PRIMARY KEY, partition TEXT NOT NULL, hash TEXT NOT NULL)")
+    conn.execute("INSERT INTO records VALUES ('UPC:X', '0', 'abc')")
+    conn.commit()
+    conn.close()
+    totals, changes = sync(stub, tmp_path)
+    assert totals["insert"] == 50 and [c["key"] for c in changes if c["op"] == "delete"] == ["UPC:X"]
@@ -0,0 +1,24 @@
+from field_extractor import FieldExtractor, Gazetteer
+
+
+def test_terms_ending_in_a_period_match():
+    gazetteer = Gazetteer(["Sudharma InfraTech Pvt. Ltd.", "Jaabilli Constructions Limited."], ignore_case=True)
+    assert gazetteer.find_all("awarded to Sudharma InfraTech Pvt. Ltd. on 28/03") == ["Sudharma InfraTech Pvt. Ltd."]
+    assert gazetteer.find_all("awarded to sudharma infratech pvt. ltd.") == ["Sudharma InfraTech Pvt. Ltd."]
+    assert gazetteer.find_first("Jaabilli Constructions Limited., Hyderabad") == "Jaabilli Constructions Limited."
+
+def test_terms_stay_whole_words():
+    gazetteer = Gazetteer(["Goa", "Tata Projects Ltd."], ignore_case=True)
+    assert gazetteer.find_all("Goalpara bypass") == []
+    assert gazetteer.find_all("XTata Projects Ltd.") == []
+    assert Gazetteer(["Kerala"]).find_all("Keralan coast, Kerala_x, Kerala") == ["Kerala"]
+
+def test_longest_term_wins():
+    gazetteer = Gazetteer(["Tata Projects Ltd", "Tata Projects Ltd."], ignore_case=True)
+    assert gazetteer.find_first("by Tata Projects Ltd. in 2024") == "Tata Projects Ltd."
+
+def test_extractor_finds_contractor_ending_in_period():
+    extractor = FieldExtractor(contractors=["Sudharma InfraTech Pvt. Ltd."])
+    fields = extractor.extract("4L of Kadapa section of NH-716 awarded to Sudharma InfraTech Pvt. Ltd. on 28/03/2024")
+    assert fields["contractor"] == "Sudharma InfraTech Pvt. Ltd."
+    assert fields["nh_number"] == "716"
@@ -0,0 +1,48 @@
+from geocode_cache import BatchGeocoder, GeocodeCache, GeocodingError, normalize_place
+
+
+class FlakyGeocoder:
+    remote = True
+
+    def __init__(self, fail: bool):
+        self.fail = fail
+        self.calls = 0
+
+    def geocode(self, place_name, state=None):
+        self.calls += 1
+        if self.fail:
+            raise GeocodingError(f"timeout for {place_name}")
+        return (17.4, 78.5) if place_name == "Hyderabad" else None
+
+
+def test_failed_request_is_not_cached(tmp_path):
+    cache = GeocodeCache(str(tmp_path / "gc.sqlite"))
+    batch = BatchGeocoder(FlakyGeocoder(fail=True), cache, min_delay_seconds=0)
+    assert batch.resolve([("Hyderabad", "Telangana")])[normalize_place("Hyderabad", "Telangana")] is None
+    assert cache.get(normalize_place("Hyderabad", "Telangana")) == (False, None)
+
+    retry = BatchGeocoder(FlakyGeocoder(fail=False), cache, min_delay_seconds=0)
+    assert retry.lookup("Hyderabad", "Telangana") == (17.4, 78.5)
+    assert cache.get(normalize_place("Hyderabad", "Telangana")) == (True, (17.4, 78.5))
+
+def test_empty_result_is_cached_as_negative(tmp_path):
+    cache = GeocodeCache(str(tmp_path / "gc.sqlite"))
+    geocoder = FlakyGeocoder(fail=False)
+    BatchGeocoder(geocoder, cache, min_delay_seconds=0).resolve([("Nowhere", "Telangana")])
+    assert cache.get(normalize_place("Nowhere", "Telangana")) == (True, None)
+    BatchGeocoder(geocoder, cache, min_delay_seconds=0).resolve([("Nowhere", "Telangana")])
+    assert geocoder.calls == 1
+
+def test_cached_never_sends_a_request(tmp_path):
+    cache = GeocodeCache(str(tmp_path / "gc.sqlite"), ttl_seconds=3600)
+    cache.put(normalize_place("Hyderabad", "Telangana"), (17.4, 78.5))
+    cache.conn.execute("UPDATE geocodes SET fetched_at = fetched_at - 7200")
+    geocoder = FlakyGeocoder(fail=False)
+    batch = BatchGeocoder(geocoder, cache, min_delay_seconds=0)
+    assert batch.cached("Hyderabad", "Telangana") == (False, None) # Expired
+    assert batch.cached(None, "Telangana") == (True, None)
+    assert geocoder.calls == 0
+
+    batch.resolve([("Hyderabad", "Telangana")])
+    assert batch.cached("Hyderabad", "Telangana") == (True, (17.4, 78.5))
+    assert geocoder.calls == 1
@@ -0,0 +1,20 @@
+import json
+
+from json_stream import iter_array_chunks, iter_nested_array
+
+
+def chunked(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+def test_numbers_split_across_chunks_decode_whole():
+    body = json.dumps({"d": "[12345,67890]"}).encode()
+    assert list(iter_nested_array(chunked(body, 2))) == [12345, 67890]
+
+def test_any_chunking_gives_the_same_elements():
+    records = [{"id": 1, "name": "NH-44 \\u00e9 \"quoted\""}, 123456789, -1.5e3, True, None, "x" * 50, [1, 22, 333]]
+    body = json.dumps({"total": 1234567, "d": json.dumps(records)}).encode()
+    for size in (1, 2, 3, 7, 64):
+        assert list(iter_nested_array(chunked(body, size))) == records
+    text = json.dumps(records)
+    for size in (1, 2, 5):
+        assert list(iter_array_chunks(text[i:i + size] for i in range(0, len(text), size))) == records
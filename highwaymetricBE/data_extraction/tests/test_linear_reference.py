@@ -0,0 +1,46 @@
+import io
+import json
+
+from map_renderer import write_layer_data
+from process_highway_data import ProjectMatcher
+
+# A straight NH 716 of two ways, about 11 km per 0.1 degree of longitude
+HIGHWAYS = [
+    {"id": 1, "type": "trunk", "ref": "NH716", "name": None, "geometry": {"type": "LineString", "coordinates": [[78.0, 14.0], [78.1, 14.0]]}},
+    {"id": 2, "type": "trunk", "ref": "NH716", "name": None, "geometry": {"type": "LineString", "coordinates": [[78.1, 14.0], [78.2, 14.0]]}},
+]
+KM_POSTS = [{"nh_number": "716", "km": 100, "lat": 14.0, "lon": 78.0}, {"nh_number": "716", "km": 110, "lat": 14.0, "lon": 78.1}]
+
+
+def project(start, end):
+    return {"nh_number": "716", "start_chainage": start, "end_chainage": end}
+
+def test_range_inside_km_posts_is_placed():
+    matcher = ProjectMatcher(HIGHWAYS, KM_POSTS)
+    assert not matcher.needs_geocoding(project("102", "108"))
+    placed = matcher.linear_ref.place("NH716", "102", "108")
+    assert placed["type"] == "LineString"
+    lons = [c[0] for c in placed["coordinates"]]
+    assert abs(min(lons) - 78.02) < 0.002 and abs(max(lons) - 78.08) < 0.002
+
+def test_range_outside_km_posts_is_not_placed():
+    matcher = ProjectMatcher(HIGHWAYS, KM_POSTS)
+    assert matcher.linear_ref.place("NH716", "150", "160") is None
+    assert matcher.linear_ref.place("NH716", "105", "140") is None
+    assert matcher.needs_geocoding(project("150", "160"))
+    proj, status = matcher.match(project("150", "160"), None, None)
+    assert "geometry" not in proj and status == "Could not geocode start/end locations."
+
+def test_point_just_past_last_post_is_placed():
+    matcher = ProjectMatcher(HIGHWAYS, KM_POSTS)
+    assert matcher.linear_ref.place("NH716", "110.2", "110.2")["type"] == "Point"
+
+def test_point_placement_is_rendered_as_a_marker():
+    matcher = ProjectMatcher(HIGHWAYS, KM_POSTS)
+    records = [dict(project("105", "105"), geometry=matcher.linear_ref.place("NH716", "105", "105")),
+               dict(project("102", "108"), geometry=matcher.linear_ref.place("NH716", "102", "108"))]
+    out = io.StringIO()
+    write_layer_data(out, [{"kind": "projects", "records": records}])
+    point, line = json.loads(out.getvalue())["layers"][0]["records"]
+    assert abs(point["point"][0] - 78.05) < 0.002 and point["point"][1] == 14.0 and "lods" not in point
+    assert "lods" in line and "point" not in line
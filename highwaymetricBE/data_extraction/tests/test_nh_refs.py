@@ -0,0 +1,23 @@
+from nh_refs import canonical_refs, find_refs
+
+
+def test_text_and_token_refs_take_the_same_suffixes():
+    for ref in ["NH-44AB", "NH 1A", "NE-7", "NH16"]:
+        assert find_refs(f"Widening of {ref} near Hyderabad") == canonical_refs(ref)
+
+def test_text_suffix_must_end_the_word():
+    assert find_refs("NH16in Telangana") == ["NH16"]
+    assert find_refs("NH16ABC") == ["NH16"]
+
+def test_cell_with_trailing_words_keeps_the_leading_ref():
+    assert canonical_refs("NH-71(Package-II)") == ["NH71"]
+    assert canonical_refs("NH 16 Km 25") == ["NH16"]
+    assert canonical_refs("NH-16 & 65") == ["NH16", "NH65"]
+    assert canonical_refs("Package II") == []
+
+def test_detached_words_are_not_suffixes():
+    assert canonical_refs("NH 44 km") == ["NH44"]
+    assert canonical_refs("NH16 to NH65")[0] == "NH16"
+    assert canonical_refs("NH 30 of") == ["NH30"]
+    assert canonical_refs("NH 7 in") == ["NH7"]
+    assert canonical_refs("NH 44A") == ["NH44A"]
@@ -0,0 +1,22 @@
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+from parallel import ordered_map
+
+
+def test_results_keep_input_order():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert list(ordered_map(executor, lambda x: x * x, range(50), window=3)) == [x * x for x in range(50)]
+
+def test_input_is_consumed_only_a_window_ahead():
+    consumed = []
+
+    def items():
+        for i in range(1000):
+            consumed.append(i)
+            yield i
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = list(itertools.islice(ordered_map(executor, str, items(), window=4), 5))
+    assert first == ["0", "1", "2", "3", "4"]
+    assert len(consumed) <= 5 + 4
@@ -0,0 +1,54 @@
+from project_rollups import DIMENSIONS, ProjectRollups
+
+PROJECTS = [
+    {"project_name": "Four laning of Hyderabad - Vijayawada section", "nh_number": "NH-65", "state": "Telangana, Andhra Pradesh",
+     "status": "Under Implementation", "total_length": "181.5", "concessionaire": "GMR Infra Ltd"},
+    {"project_name": "Rectification of blackspots", "nh_number": "NH 44", "state": "Telangana", "status": "Completed", "total_length": "12"},
+    {"project_name": "Rectification of blackspots", "nh_number": "NH 16", "state": "Odisha", "status": "Completed", "total_length": "8.25"}
+]
+
+
+def tables(rollups):
+    return {d: rollups.table(d) for d in DIMENSIONS}
+
+def test_adding_a_project_again_does_not_count_it_twice():
+    rollups = ProjectRollups.build(PROJECTS)
+    for project in PROJECTS:
+        rollups.add(dict(project))
+    assert rollups.records == 3
+    assert tables(rollups) == tables(ProjectRollups.build(PROJECTS))
+
+def test_status_change_applies_to_saved_rollups(tmp_path):
+    path = str(tmp_path / "rollups.npz")
+    ProjectRollups.build(PROJECTS).save(path)
+    completed = dict(PROJECTS[0], status="Completed")
+
+    upserted = ProjectRollups.load(path)
+    upserted.add(completed)
+    moved = ProjectRollups.load(path)
+    assert moved.set_status({"project_name": PROJECTS[0]["project_name"], "nh_number": "NH65", "state": PROJECTS[0]["state"]}, "Completed")
+
+    expected = tables(ProjectRollups.build([completed] + PROJECTS[1:]))
+    assert tables(upserted) == tables(moved) == expected
+    assert moved.total("state", "Telangana")["by_status"] == {"Completed": {"count": 2, "km": 193.5}}
+
+def test_saved_entries_round_trip(tmp_path):
+    path = str(tmp_path / "rollups.npz")
+    rollups = ProjectRollups.build(PROJECTS)
+    rollups.save(path)
+    loaded = ProjectRollups.load(path)
+    assert loaded.entries == rollups.entries
+    assert loaded.remove(PROJECTS[2]) and not loaded.remove(PROJECTS[2])
+    assert loaded.total("state", "Odisha")["count"] == 0
+
+def test_coverage_counts_overlapping_chainage_once():
+    active = {"nh_number": "NH-16", "state": "Odisha", "status": "Under Implementation"}
+    rollups = ProjectRollups.build([
+        dict(active, project_name="Package I", start_chainage="10.000", end_chainage="60.000", total_length="50"),
+        dict(active, project_name="Package I (revised)", start_chainage="40.000", end_chainage="80.000", total_length="40"),
+        dict(active, project_name="Widening of bridges", nh_number="NH 44", total_length="5")
+    ])
+    rollups.network_km = {"NH16": 200.0, "NH44": 100.0}
+    by_nh = {c["nh"]: c for c in rollups.coverage()}
+    assert (by_nh["NH16"]["active_km"], by_nh["NH16"]["share"], by_nh["NH16"]["method"]) == (70.0, 0.35, "chainage")
+    assert (by_nh["NH44"]["active_km"], by_nh["NH44"]["method"]) == (5.0, "length")
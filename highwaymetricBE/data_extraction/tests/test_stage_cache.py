@@ -0,0 +1,39 @@
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+from parallel import ordered_map
+from stage_cache import cached_in_order
+
+
+def run(items, cached, looked_up, compute=None, max_pending=10):
+    def lookup(item):
+        looked_up.append(item)
+        return str(item), ("hit", item) if item in cached else None
+
+    def default_compute(misses):
+        return (("miss", item) for item in misses)
+
+    return cached_in_order(items, lookup, compute or default_compute, lambda key, result: None, lambda item, value: value, max_pending=max_pending)
+
+def test_fully_cached_input_streams():
+    looked_up = []
+    stream = run(range(1000), set(range(1000)), looked_up)
+    assert next(stream) == ("hit", 0)
+    assert len(looked_up) < 1000
+
+def test_hits_and_misses_keep_input_order():
+    cached = {i for i in range(200) if i % 3}
+    expected = [("hit", i) if i in cached else ("miss", i) for i in range(200)]
+    assert list(run(range(200), cached, [])) == expected
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        windowed = lambda misses: ordered_map(executor, lambda item: ("miss", item), misses, window=8)
+        assert list(run(range(200), cached, [], windowed)) == expected
+
+def test_read_ahead_after_a_miss_is_bounded():
+    looked_up = []
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        windowed = lambda misses: ordered_map(executor, lambda item: ("miss", item), misses, window=8)
+        stream = run(range(1000), set(range(1, 1000)), looked_up, windowed)
+        assert list(itertools.islice(stream, 2)) == [("miss", 0), ("hit", 1)]
+        assert len(looked_up) <= 10 + 1
+        assert len(list(stream)) == 998
@@ -0,0 +1,217 @@
+import argparse
+import json
+import math
+import os
+import sys
+from typing import Dict, Iterable, List, Tuple
+
+# Check for required libraries
+try:
+    import shapely
+    from shapely.geometry import LineString, shape, mapping
+except ImportError as e:
+    print(f"Missing required library: {e}")
+    print("Please install them using: pip install shapely")
+    sys.exit(1)
+
+from simplify import simplify_coords, tolerance_for_zoom, QUANT_SCALE
+
+# Constants
+TILE_DIR = "data_extraction/tiles"
+MIN_ZOOM = 5
+MAX_ZOOM = 12
+CLIP_BUFFER = 8 / 256 # Clip a little outside each tile so lines join up across tile edges
+LAYER_PROPERTIES = {
+    "highways": ["id", "ref", "name", "length_km"],
+    "projects": ["sr_no", "nh_number", "project_name", "start_location", "end_location", "total_length", "state", "status"]
+}
+
+def lonlat_to_tile(lon: float, lat: float, z: int) -> Tuple[int, int]:
+    """
+    Web Mercator tile containing a point.
+    """
+    n = 2 ** z
+    lat = max(min(lat, 85.0511), -85.0511)
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+def tile_bounds(x: int, y: int, z: int) -> Tuple[float, float, float, float]:
+    """
+    (min_lon, min_lat, max_lon, max_lat) of a tile.
+    """
+    n = 2 ** z
+    def lat_at(ty):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+    return (x / n * 360.0 - 180.0, lat_at(y + 1), (x + 1) / n * 360.0 - 180.0, lat_at(y))
+
+def simplify_for_zoom(geom, z: int):
+    """
+    Simplifies a geometry to about a pixel at zoom z, lines through the shared simplify module.
+    """
+    tolerance = tolerance_for_zoom(z)
+    if geom.geom_type == 'LineString':
+        return LineString(simplify_coords(geom.coords, tolerance))
+    return geom.simplify(tolerance, preserve_topology=False)
+
+def load_features(file_path: str, layer: str) -> List[Dict]:
+    """
+    Loads a layer file (segment or project records with a GeoJSON 'geometry') as GeoJSON features.
+    """
+    with open(file_path, 'r') as f:
+        records = json.load(f)
+    keys = LAYER_PROPERTIES.get(layer)
+    features = []
+    for record in records:
+        if not record.get('geometry') or not record['geometry'].get('coordinates'):
+            continue
+        props = {k: record.get(k) for k in keys} if keys else {k: v for k, v in record.items() if k != 'geometry'}
+        features.append({"geometry": shape(record['geometry']), "properties": props})
+    return features
+
+def tile_layer(features: List[Dict], layer: str, out_dir: str, min_zoom: int, max_zoom: int) -> int:
+    """
+    Writes {out_dir}/{layer}/{z}/{x}/{y}.geojson for every tile a feature touches,
+    with geometries simplified for the zoom and clipped to the tile. Returns tiles written.
+    """
+    written = 0
+    for z in range(min_zoom, max_zoom + 1):
+        tiles: Dict[Tuple[int, int], List[Dict]] = {}
+
+        for feature in features:
+            geom = simplify_for_zoom(feature['geometry'], z)
+            if geom.is_empty:
+                continue
+            min_lon, min_lat, max_lon, max_lat = geom.bounds
+            x0, y0 = lonlat_to_tile(min_lon, max_lat, z)
+            x1, y1 = lonlat_to_tile(max_lon, min_lat, z)
+            for x in range(x0, x1 + 1):
+                for y in range(y0, y1 + 1):
+                    w, s, e, n = tile_bounds(x, y, z)
+                    pad_x, pad_y = (e - w) * CLIP_BUFFER, (n - s) * CLIP_BUFFER
+                    clipped = shapely.clip_by_rect(geom, w - pad_x, s - pad_y, e + pad_x, n + pad_y)
+                    if clipped.is_empty:
+                        continue
+                    tiles.setdefault((x, y), []).append({
+                        "type": "Feature",
+                        "geometry": mapping(shapely.set_precision(clipped, 1 / QUANT_SCALE)),
+                        "properties": feature['properties']
+                    })
+
+        for (x, y), tile_features in tiles.items():
+            tile_dir = os.path.join(out_dir, layer, str(z), str(x))
+            os.makedirs(tile_dir, exist_ok=True)
+            with open(os.path.join(tile_dir, f"{y}.geojson"), 'w') as f:
+                json.dump({"type": "FeatureCollection", "features": tile_features}, f, separators=(',', ':'))
+        written += len(tiles)
+        print(f"  {layer} z{z}: {len(tiles)} tiles")
+    return written
+
+def layer_bounds(features: Iterable[Dict]) -> List[float]:
+    bounds = shapely.total_bounds([f['geometry'] for f in features])
+    return [float(b) for b in bounds]
+
+def write_viewer(out_dir: str, layers: List[str], bounds: List[float], min_zoom: int, max_zoom: int):
+    """
+    Writes index.html next to the tiles: a Leaflet page that fetches only the tiles in view.
+    Serve the directory over HTTP (e.g. python -m http.server) since browsers block fetch() from file://.
+    """
+    html_content = f"""<!DOCTYPE html>
+<html>
+<head>
+    <title>Highway Visualization (Tiled)</title>
+    <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" />
+    <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
+    <style>
+        #map {{ height: 100vh; width: 100%; }}
+    </style>
+</head>
+<body>
+    <div id="map"></div>
+    <script>
+        var map = L.map('map', {{ minZoom: {min_zoom} }});
+        L.tileLayer('https://{{s}}.tile.openstreetmap.org/{{z}}/{{x}}/{{y}}.png', {{
+            attribution: '© OpenStreetMap contributors'
+        }}).addTo(map);
+        map.fitBounds([[{bounds[1]}, {bounds[0]}], [{bounds[3]}, {bounds[2]}]]);
+
+        var layerStyles = {{
+            highways: {{ color: '#555555', weight: 3, opacity: 0.8 }},
+            projects: {{ color: '#FF0000', weight: 5, opacity: 0.8 }}
+        }};
+
+        function popupFor(props) {{
+            return Object.keys(props).filter(function(k) {{ return props[k] !== null; }})
+                .map(function(k) {{ return "<b>" + k + ":</b> " + props[k]; }}).join("<br>");
+        }}
+
+        // A grid layer whose tiles are GeoJSON files drawn as vector layers on the map
+        var GeoJSONTiles = L.GridLayer.extend({{
+            createTile: function(coords, done) {{
+                var tile = document.createElement('div');
+                var layer = this.options.layer;
+                var self = this;
+                fetch(layer + '/' + coords.z + '/' + coords.x + '/' + coords.y + '.geojson')
+                    .then(function(res) {{ return res.ok ? res.json() : null; }})
+                    .then(function(data) {{
+                        if (data) {{
+                            tile._vector = L.geoJSON(data, {{
+                                style: layerStyles[layer],
+                                onEachFeature: function(f, l) {{ l.bindPopup(popupFor(f.properties)); }}
+                            }}).addTo(self._map);
+                        }}
+                        done(null, tile);
+                    }})
+                    .catch(function(err) {{ done(err, tile); }});
+                return tile;
+            }}
+        }});
+
+        {json.dumps(layers)}.forEach(function(layer) {{
+            var grid = new GeoJSONTiles({{ layer: layer, minNativeZoom: {min_zoom}, maxNativeZoom: {max_zoom} }});
+            grid.on('tileunload', function(e) {{
+                if (e.tile._vector) {{ map.removeLayer(e.tile._vector); }}
+            }});
+            grid.addTo(map);
+        }});
+    </script>
+</body>
+</html>"""
+    with open(os.path.join(out_dir, "index.html"), 'w') as f:
+        f.write(html_content)
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate z/x/y GeoJSON tiles for the map pages.")
+    parser.add_argument("--highways", nargs="*", default=["state_highways.json"], help="Highway segment files")
+    parser.add_argument("--projects", nargs="*", default=[], help="Processed project files (e.g. highway_data.json)")
+    parser.add_argument("--out", default=TILE_DIR)
+    parser.add_argument("--min-zoom", type=int, default=MIN_ZOOM)
+    parser.add_argument("--max-zoom", type=int, default=MAX_ZOOM)
+    args = parser.parse_args()
+
+    layers = []
+    all_features = []
+    for layer, files in (("highways", args.highways), ("projects", args.projects)):
+        features = []
+        for file_path in files:
+            try:
+                features.extend(load_features(file_path, layer))
+            except FileNotFoundError:
+                print(f"Error: {file_path} not found.")
+        if not features:
+            continue
+        print(f"Tiling {len(features)} {layer} features, zoom {args.min_zoom}-{args.max_zoom}...")
+        count = tile_layer(features, layer, args.out, args.min_zoom, args.max_zoom)
+        print(f"Wrote {count} {layer} tiles.")
+        layers.append(layer)
+        all_features.extend(features)
+
+    if not layers:
+        print("Nothing to tile.")
+        return
+
+    write_viewer(args.out, layers, layer_bounds(all_features), args.min_zoom, args.max_zoom)
+    print(f"Generated {args.out}/index.html (serve {args.out} over HTTP to view)")
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ package com.extron.highwaymetric.Controller;
 import org.springframework.web.bind.annotation.RequestMapping;
 import org.springframework.web.bind.annotation.RestController;
 
+import com.extron.highwaymetric.DTO.BulkImportResultDTO;
 import com.extron.highwaymetric.DTO.ProjectDTO;
 import com.extron.highwaymetric.Service.ProjectService;
 
@@ -12,6 +13,7 @@ import org.springframework.http.HttpStatus;
 import org.springframework.http.ResponseEntity;
 import org.springframework.web.bind.annotation.PostMapping;
 import org.springframework.web.bind.annotation.RequestBody;
+import org.springframework.web.bind.annotation.RequestHeader;
 import org.springframework.web.bind.annotation.DeleteMapping;
 import org.springframework.web.bind.annotation.GetMapping;
 import org.springframework.web.bind.annotation.PathVariable;
@@ -40,6 +42,11 @@ public class ProjectController {
         }
     }
 
+    @PostMapping("/bulk")
+    public ResponseEntity<BulkImportResultDTO> addNewProjects(@RequestBody List<ProjectDTO> projectDTOs, @RequestHeader(value = "Idempotency-Key", required = false) String idempotencyKey) {
+        return new ResponseEntity<>(projectService.addNewProjects(projectDTOs, idempotencyKey), HttpStatus.OK);
+    }
+
     @GetMapping
     public ResponseEntity<List<ProjectDTO>> getAllProjects() {
         return new ResponseEntity<>(projectService.getAllProjects(), HttpStatus.OK);
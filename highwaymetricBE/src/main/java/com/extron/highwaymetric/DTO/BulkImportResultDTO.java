@@ -0,0 +1,14 @@
+package com.extron.highwaymetric.DTO;
+
+import java.util.ArrayList;
+import java.util.List;
+
+import lombok.Data;
+
+@Data
+public class BulkImportResultDTO {
+
+    private int created;
+    private int skipped;
+    private List<String> errors = new ArrayList<>();
+}
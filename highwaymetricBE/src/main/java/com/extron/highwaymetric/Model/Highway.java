@@ -13,6 +13,7 @@ public class Highway {
   @GeneratedValue(strategy = GenerationType.UUID)
   private String id;
 
+  @Column(unique = true)
   private String highwayNum;
 
   @ManyToMany(fetch = FetchType.LAZY)
@@ -2,10 +2,13 @@ package com.extron.highwaymetric.Repository;
 
 import org.springframework.data.jpa.repository.JpaRepository;
 import com.extron.highwaymetric.Model.Contractor;
+import java.util.Collection;
+import java.util.List;
 import java.util.Optional;
 
 
 
 public interface ContractorRepository extends JpaRepository<Contractor, String>{
     Optional<Contractor> findByName(String name);
+    List<Contractor> findByNameIn(Collection<String> names);
 }
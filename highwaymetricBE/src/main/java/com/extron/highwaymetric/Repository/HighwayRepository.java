@@ -1,5 +1,7 @@
 package com.extron.highwaymetric.Repository;
 
+import java.util.Collection;
+import java.util.List;
 import java.util.Optional;
 
 import org.springframework.data.jpa.repository.JpaRepository;
@@ -10,4 +12,5 @@ import com.extron.highwaymetric.Model.Highway;
 
 public interface HighwayRepository extends JpaRepository<Highway, String>{
     Optional<Highway> findByHighwayNum(String highwayNum);
+    List<Highway> findByHighwayNumIn(Collection<String> highwayNums);
 }
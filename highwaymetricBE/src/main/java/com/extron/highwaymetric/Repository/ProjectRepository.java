@@ -1,11 +1,16 @@
 package com.extron.highwaymetric.Repository;
 
 import com.extron.highwaymetric.Model.Project;
+
+import java.util.Collection;
+import java.util.List;
+
 import org.springframework.data.jpa.repository.JpaRepository;
 import org.springframework.stereotype.Repository;
 
 @Repository
 public interface ProjectRepository extends JpaRepository<Project, String> {
     Project findByProjectName(String projectName);
+    List<Project> findByProjectNameIn(Collection<String> projectNames);
 
 }
@@ -1,13 +1,29 @@
 package com.extron.highwaymetric.Service;
 
+import java.time.Duration;
+import java.time.Instant;
 import java.time.LocalDate;
 import java.time.format.DateTimeFormatter;
 import java.time.format.DateTimeParseException;
 import java.util.ArrayList;
+import java.util.Collections;
+import java.util.HashMap;
+import java.util.HashSet;
+import java.util.LinkedHashMap;
 import java.util.List;
+import java.util.Map;
+import java.util.Set;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.CompletionException;
+import java.util.function.Function;
 
+import org.springframework.dao.DataIntegrityViolationException;
 import org.springframework.stereotype.Service;
+import org.springframework.transaction.PlatformTransactionManager;
+import org.springframework.transaction.TransactionDefinition;
+import org.springframework.transaction.support.TransactionTemplate;
 
+import com.extron.highwaymetric.DTO.BulkImportResultDTO;
 import com.extron.highwaymetric.DTO.ProjectDTO;
 import com.extron.highwaymetric.Model.Contractor;
 import com.extron.highwaymetric.Model.Highway;
@@ -22,11 +38,37 @@ public class ProjectService {
     final private ProjectRepository projectRepo;
     final private ContractorRepository contractorRepo;
     final private HighwayRepository highwayRepo;
+    final private TransactionTemplate transaction;
+    // Commits on its own, so rows created here are visible to concurrent batches straight away
+    final private TransactionTemplate newTransaction;
 
-    public ProjectService(ProjectRepository projectRepository, ContractorRepository contractorRepository, HighwayRepository highwayRepository){
+    // Concurrent batches may race to create the same highway or contractor; the loser re-reads the winner's row
+    final private static int CREATE_ATTEMPTS = 3;
+
+    // A retry arrives within seconds to minutes of the original batch, so a day and the most recent batches are plenty
+    final private static int MAX_COMPLETED_BATCHES = 10_000;
+    final private static Duration COMPLETED_BATCH_TTL = Duration.ofHours(24);
+
+    private record BatchRun(CompletableFuture<BulkImportResultDTO> result, Instant startedAt) {}
+
+    // Bulk batches by idempotency key, registered before they run, so a retry arriving while the original is still
+    // running waits for its result and a retry after it is answered without touching the database.
+    // Bounded: least recently used keys are evicted past MAX_COMPLETED_BATCHES, and keys expire after COMPLETED_BATCH_TTL
+    final private Map<String, BatchRun> completedBatches = Collections.synchronizedMap(
+        new LinkedHashMap<String, BatchRun>(16, 0.75f, true) {
+            @Override
+            protected boolean removeEldestEntry(Map.Entry<String, BatchRun> eldest) {
+                return size() > MAX_COMPLETED_BATCHES;
+            }
+        });
+
+    public ProjectService(ProjectRepository projectRepository, ContractorRepository contractorRepository, HighwayRepository highwayRepository, PlatformTransactionManager transactionManager){
         this.projectRepo = projectRepository;
         this.contractorRepo = contractorRepository;
         this.highwayRepo = highwayRepository;
+        this.transaction = new TransactionTemplate(transactionManager);
+        this.newTransaction = new TransactionTemplate(transactionManager);
+        this.newTransaction.setPropagationBehavior(TransactionDefinition.PROPAGATION_REQUIRES_NEW);
     }
 
     public String addNewProject(ProjectDTO projectDTO) {
@@ -36,43 +78,190 @@ public class ProjectService {
             throw new RuntimeException("Project already exists with ID: " + proj.getId());
         }
 
-        Project newProject = new Project();
-
-        newProject.setProjectName(projectDTO.getProjectName());
-        newProject.setLanes(projectDTO.getLanes());
-        newProject.setTotalLength(projectDTO.getTotalLength());
-        newProject.setState(projectDTO.getState());
-        newProject.setStatus(projectDTO.getStatus());
-
-        Contractor contractor = contractorRepo.findByName(projectDTO.getContractor())
-        .orElseGet(() ->{
-            Contractor newC = new Contractor();
-            newC.setName(projectDTO.getContractor());
-            return contractorRepo.save(newC);
-        });
+        Project newProject = buildProject(projectDTO);
 
-        newProject.setContractor(contractor);
+        if (projectDTO.getContractor() != null) {
+            newProject.setContractor(findOrCreateContractors(Set.of(projectDTO.getContractor())).get(projectDTO.getContractor()));
+        }
 
         List<Highway> projectHighways = new ArrayList<>();
        
         List<String> highwayNums = projectDTO.getNhNumber();
 
         if (highwayNums != null) {
+            Map<String, Highway> highways = findOrCreateHighways(new HashSet<>(highwayNums.stream().filter(num -> num != null && !num.isBlank()).toList()));
             for(String num : highwayNums){
                 if(num != null && !num.isBlank()){
-                    Highway highway = highwayRepo.findByHighwayNum(num).
-                    orElseGet(() ->{
-                        Highway newH = new Highway();
-                        newH.setHighwayNum(num);
-                        return highwayRepo.save(newH);
-                    });
-                    projectHighways.add(highway);
+                    projectHighways.add(highways.get(num));
                 }
             }
         }
 
         newProject.setHighways(projectHighways);
 
+        projectRepo.save(newProject);
+        return "Project created successfully with ID: " + newProject.getId();
+
+    }
+
+    public BulkImportResultDTO addNewProjects(List<ProjectDTO> projectDTOs, String idempotencyKey) {
+
+        if (idempotencyKey == null) {
+            return transaction.execute(status -> importBatch(projectDTOs));
+        }
+
+        // Claim the key in one step, so of two concurrent requests with the same key only one runs the batch
+        BatchRun mine = new BatchRun(new CompletableFuture<>(), Instant.now());
+        BatchRun run = completedBatches.compute(idempotencyKey, (key, previous) ->
+            previous != null && previous.startedAt().plus(COMPLETED_BATCH_TTL).isAfter(Instant.now()) ? previous : mine);
+        if (run != mine) {
+            try {
+                return run.result().join();
+            } catch (CompletionException e) {
+                throw e.getCause() instanceof RuntimeException cause ? cause : e;
+            }
+        }
+
+        try {
+            BulkImportResultDTO result = transaction.execute(status -> importBatch(projectDTOs));
+            mine.result().complete(result);
+            return result;
+        } catch (RuntimeException e) {
+            // A failed batch is not remembered, so a retry runs it again
+            completedBatches.remove(idempotencyKey, mine);
+            mine.result().completeExceptionally(e);
+            throw e;
+        }
+    }
+
+    private BulkImportResultDTO importBatch(List<ProjectDTO> projectDTOs) {
+
+        BulkImportResultDTO result = new BulkImportResultDTO();
+
+        // Resolve existing projects, contractors and highways for the whole batch in three queries, and one more
+        // for contractors or highways that had to be created
+        Set<String> names = new HashSet<>();
+        Set<String> contractorNames = new HashSet<>();
+        Set<String> highwayNums = new HashSet<>();
+        for (ProjectDTO dto : projectDTOs) {
+            if (dto.getProjectName() != null) {
+                names.add(dto.getProjectName());
+            }
+            if (dto.getContractor() != null) {
+                contractorNames.add(dto.getContractor());
+            }
+            if (dto.getNhNumber() != null) {
+                for (String num : dto.getNhNumber()) {
+                    if (num != null && !num.isBlank()) {
+                        highwayNums.add(num);
+                    }
+                }
+            }
+        }
+
+        Set<String> existingNames = new HashSet<>();
+        for (Project p : projectRepo.findByProjectNameIn(names)) {
+            existingNames.add(p.getProjectName());
+        }
+
+        Map<String, Contractor> contractors = findOrCreateContractors(contractorNames);
+        Map<String, Highway> highways = findOrCreateHighways(highwayNums);
+
+        List<Project> newProjects = new ArrayList<>();
+        for (ProjectDTO dto : projectDTOs) {
+            if (dto.getProjectName() == null) {
+                result.getErrors().add("Missing project name");
+                continue;
+            }
+            if (existingNames.contains(dto.getProjectName())) {
+                result.setSkipped(result.getSkipped() + 1);
+                continue;
+            }
+            try {
+                Project newProject = buildProject(dto);
+                newProject.setContractor(dto.getContractor() != null ? contractors.get(dto.getContractor()) : null);
+
+                List<Highway> projectHighways = new ArrayList<>();
+                if (dto.getNhNumber() != null) {
+                    for (String num : dto.getNhNumber()) {
+                        if (num != null && !num.isBlank()) {
+                            projectHighways.add(highways.get(num));
+                        }
+                    }
+                }
+                newProject.setHighways(projectHighways);
+
+                newProjects.add(newProject);
+                existingNames.add(dto.getProjectName());
+            } catch (RuntimeException e) {
+                result.getErrors().add(e.getMessage());
+            }
+        }
+        projectRepo.saveAll(newProjects);
+        result.setCreated(newProjects.size());
+        return result;
+    }
+
+    private Map<String, Contractor> findOrCreateContractors(Set<String> names) {
+        return findOrCreate(names, contractorRepo::findByNameIn, Contractor::getName, name -> {
+            Contractor newC = new Contractor();
+            newC.setName(name);
+            return newC;
+        }, contractorRepo::saveAll);
+    }
+
+    private Map<String, Highway> findOrCreateHighways(Set<String> nums) {
+        return findOrCreate(nums, highwayRepo::findByHighwayNumIn, Highway::getHighwayNum, num -> {
+            Highway newH = new Highway();
+            newH.setHighwayNum(num);
+            return newH;
+        }, highwayRepo::saveAll);
+    }
+
+    /**
+     * Looks up the rows for `keys`, creating the missing ones in a transaction of their own. Contractor names and
+     * highway numbers are unique, so when a concurrent batch creates the same row first the insert fails; the rows are
+     * then read again, now including the other batch's, and only what is still missing is created.
+     */
+    private <T> Map<String, T> findOrCreate(Set<String> keys, Function<Set<String>, List<T>> find, Function<T, String> keyOf,
+                                            Function<String, T> create, Function<List<T>, List<T>> saveAll) {
+        if (keys.isEmpty()) {
+            return new HashMap<>();
+        }
+        for (int attempt = 1; ; attempt++) {
+            Map<String, T> found = new HashMap<>();
+            for (T row : find.apply(keys)) {
+                found.put(keyOf.apply(row), row);
+            }
+            List<T> missing = new ArrayList<>();
+            for (String key : keys) {
+                if (!found.containsKey(key)) {
+                    missing.add(create.apply(key));
+                }
+            }
+            if (missing.isEmpty()) {
+                return found;
+            }
+            try {
+                newTransaction.executeWithoutResult(status -> saveAll.apply(missing));
+            } catch (DataIntegrityViolationException e) {
+                if (attempt >= CREATE_ATTEMPTS) {
+                    throw e;
+                }
+            }
+        }
+    }
+
+    private Project buildProject(ProjectDTO projectDTO) {
+
+        Project newProject = new Project();
+
+        newProject.setProjectName(projectDTO.getProjectName());
+        newProject.setLanes(projectDTO.getLanes());
+        newProject.setTotalLength(projectDTO.getTotalLength());
+        newProject.setState(projectDTO.getState());
+        newProject.setStatus(projectDTO.getStatus());
+
         DateTimeFormatter formatter = DateTimeFormatter.ofPattern("dd/MM/yyyy");
 
         if(projectDTO.getLoaDate() != null && !projectDTO.getLoaDate().isEmpty()){
@@ -93,9 +282,7 @@ public class ProjectService {
             }
         }
         
-        projectRepo.save(newProject);
-        return "Project created successfully with ID: " + newProject.getId();
-
+        return newProject;
     }
 
     public List<ProjectDTO> getAllProjects() {
@@ -0,0 +1,160 @@
+package com.extron.highwaymetric.Service;
+
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.junit.jupiter.api.Assertions.assertTrue;
+import static org.mockito.ArgumentMatchers.any;
+import static org.mockito.ArgumentMatchers.anyCollection;
+import static org.mockito.Mockito.mock;
+import static org.mockito.Mockito.times;
+import static org.mockito.Mockito.verify;
+import static org.mockito.Mockito.when;
+
+import java.util.ArrayList;
+import java.util.Collection;
+import java.util.Collections;
+import java.util.List;
+import java.util.Map;
+import java.util.Set;
+import java.util.UUID;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.CountDownLatch;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.Future;
+import java.util.function.BiConsumer;
+import java.util.function.Function;
+import java.util.stream.Collectors;
+
+import org.junit.jupiter.api.BeforeEach;
+import org.junit.jupiter.api.Test;
+import org.springframework.dao.DataIntegrityViolationException;
+import org.springframework.transaction.PlatformTransactionManager;
+
+import com.extron.highwaymetric.DTO.BulkImportResultDTO;
+import com.extron.highwaymetric.DTO.ProjectDTO;
+import com.extron.highwaymetric.Model.Contractor;
+import com.extron.highwaymetric.Model.Highway;
+import com.extron.highwaymetric.Model.Project;
+import com.extron.highwaymetric.Repository.ContractorRepository;
+import com.extron.highwaymetric.Repository.HighwayRepository;
+import com.extron.highwaymetric.Repository.ProjectRepository;
+
+/**
+ * Bulk imports running concurrently, as import_data.bulk_import sends them, against repositories that keep their
+ * rows in memory and enforce the unique contractor name and highway number like the database does.
+ */
+class ProjectServiceTest {
+
+    final private static int CONCURRENCY = 4;
+
+    private ProjectRepository projectRepo;
+    private ProjectService service;
+    final private Map<String, Highway> highwayRows = new ConcurrentHashMap<>();
+    final private Map<String, Contractor> contractorRows = new ConcurrentHashMap<>();
+    final private List<Project> savedProjects = Collections.synchronizedList(new ArrayList<>());
+
+    @BeforeEach
+    void setUp() {
+        projectRepo = mock(ProjectRepository.class);
+        HighwayRepository highwayRepo = mock(HighwayRepository.class);
+        ContractorRepository contractorRepo = mock(ContractorRepository.class);
+
+        when(projectRepo.findByProjectNameIn(anyCollection())).thenReturn(List.of());
+        when(projectRepo.saveAll(any())).thenAnswer(call -> {
+            List<Project> projects = call.getArgument(0);
+            savedProjects.addAll(projects);
+            return projects;
+        });
+        when(highwayRepo.findByHighwayNumIn(anyCollection())).thenAnswer(call -> find(highwayRows, call.getArgument(0)));
+        when(highwayRepo.saveAll(any())).thenAnswer(call -> insert(highwayRows, call.getArgument(0), Highway::getHighwayNum, Highway::setId));
+        when(contractorRepo.findByNameIn(anyCollection())).thenAnswer(call -> find(contractorRows, call.getArgument(0)));
+        when(contractorRepo.saveAll(any())).thenAnswer(call -> insert(contractorRows, call.getArgument(0), Contractor::getName, Contractor::setId));
+
+        service = new ProjectService(projectRepo, contractorRepo, highwayRepo, mock(PlatformTransactionManager.class));
+    }
+
+    private static <T> List<T> find(Map<String, T> rows, Collection<String> keys) {
+        return keys.stream().filter(rows::containsKey).map(rows::get).collect(Collectors.toList());
+    }
+
+    private static <T> List<T> insert(Map<String, T> rows, List<T> newRows, Function<T, String> keyOf, BiConsumer<T, String> setId) {
+        List<T> inserted = new ArrayList<>();
+        for (T row : newRows) {
+            setId.accept(row, UUID.randomUUID().toString());
+            if (rows.putIfAbsent(keyOf.apply(row), row) != null) {
+                // The transaction rolls back: none of this call's rows are kept
+                inserted.forEach(done -> rows.remove(keyOf.apply(done), done));
+                throw new DataIntegrityViolationException("duplicate key " + keyOf.apply(row));
+            }
+            inserted.add(row);
+        }
+        return newRows;
+    }
+
+    private static List<ProjectDTO> batch(int index) {
+        List<ProjectDTO> dtos = new ArrayList<>();
+        for (int i = 0; i < 25; i++) {
+            ProjectDTO dto = new ProjectDTO();
+            dto.setProjectName("Project " + index + "-" + i);
+            dto.setNhNumber(List.of("NH" + (i % 5), "NH44"));
+            dto.setContractor("Contractor " + (i % 3));
+            dtos.add(dto);
+        }
+        return dtos;
+    }
+
+    private List<BulkImportResultDTO> runConcurrently(Function<Integer, BulkImportResultDTO> importBatch) throws Exception {
+        ExecutorService executor = Executors.newFixedThreadPool(CONCURRENCY);
+        CountDownLatch start = new CountDownLatch(1);
+        try {
+            List<Future<BulkImportResultDTO>> futures = new ArrayList<>();
+            for (int i = 0; i < CONCURRENCY; i++) {
+                int index = i;
+                futures.add(executor.submit(() -> {
+                    start.await();
+                    return importBatch.apply(index);
+                }));
+            }
+            start.countDown();
+            List<BulkImportResultDTO> results = new ArrayList<>();
+            for (Future<BulkImportResultDTO> future : futures) {
+                results.add(future.get());
+            }
+            return results;
+        } finally {
+            executor.shutdownNow();
+        }
+    }
+
+    @Test
+    void concurrentBatchesShareOneRowPerHighwayAndContractor() throws Exception {
+        for (int round = 0; round < 20; round++) {
+            highwayRows.clear();
+            contractorRows.clear();
+            savedProjects.clear();
+
+            List<BulkImportResultDTO> results = runConcurrently(index -> service.addNewProjects(batch(index), null));
+
+            assertEquals(List.of(25, 25, 25, 25), results.stream().map(BulkImportResultDTO::getCreated).toList());
+            assertEquals(6, highwayRows.size());
+            assertEquals(3, contractorRows.size());
+            Set<String> highwayIds = highwayRows.values().stream().map(Highway::getId).collect(Collectors.toSet());
+            Set<String> contractorIds = contractorRows.values().stream().map(Contractor::getId).collect(Collectors.toSet());
+            for (Project project : savedProjects) {
+                project.getHighways().forEach(highway -> assertTrue(highwayIds.contains(highway.getId())));
+                assertTrue(contractorIds.contains(project.getContractor().getId()));
+            }
+        }
+    }
+
+    @Test
+    void concurrentRetriesOfOneBatchRunItOnce() throws Exception {
+        List<ProjectDTO> dtos = batch(0);
+
+        List<BulkImportResultDTO> results = runConcurrently(index -> service.addNewProjects(dtos, "batch-0"));
+
+        results.forEach(result -> assertEquals(results.get(0), result));
+        assertEquals(25, savedProjects.size());
+        verify(projectRepo, times(1)).saveAll(any());
+    }
+}